@@ -0,0 +1,203 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = os.path.join(ROOT, "wwtp_design")
+# the modules read ../input_data.xlsx relative to the package directory,
+# the paths given on the command line are relative to the caller's one
+CALLER_DIR = os.getcwd()
+sys.path.insert(0, PACKAGE)
+os.chdir(PACKAGE)
+
+from main import *
+
+# Batch sizes of the scaling curves
+BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000, 1000000]
+# Relative slowdown of the median reported as a regression
+REGRESSION_TOLERANCE = 0.25
+# Shortest total time in s of the calls measured per repetition
+MIN_REPEAT_TIME = 0.2
+
+
+def time_call(fun, repeat=5):
+    """
+    Times a function with enough calls per repetition to reach
+    MIN_REPEAT_TIME
+    :param fun: function without arguments
+    :param repeat: INT number of repetitions
+    :return: DICT with the number of calls per repetition and the
+    minimum and median time per call in s
+    """
+    timer = timeit.Timer(fun)
+    # one calibration call, which also warms up caches and imports
+    number = max(1, int(MIN_REPEAT_TIME / max(timer.timeit(1), 1e-9)))
+    times = sorted(t / number for t in timer.repeat(repeat, number))
+    return {"number": number, "min_s": times[0],
+            "median_s": times[len(times) // 2]}
+
+
+def stage_benchmarks(snapshot, directory):
+    """
+    Functions timed for every design stage, the input parsing and the
+    output writing. Every call uses new objects, so the memoization of
+    the design graph only acts within one call
+    :param snapshot: ParamSnapshot object with the plant parameters
+    :param directory: STR of a directory for the output files
+    :return: DICT with benchmark names as keys and functions as values
+    """
+    results = design_results(snapshot, use_cache=False)
+    benchmarks = {
+        "input.parse_excel": lambda: parse_input(snapshot.file_path),
+        "input.load_snapshot": lambda: load_snapshot(),
+        "pri_sed.cross_volume": lambda: PriSed(snapshot).cross_volume(),
+        "sec_sed.a_st": lambda: SecSed(snapshot).a_st(),
+        "sec_sed.h_tot": lambda: SecSed(snapshot).h_tot(),
+        "act_sludge.act_sludge_df": lambda: act_sludge_df(snapshot),
+        "main.design_results": lambda: design_results(snapshot,
+                                                      use_cache=False)
+    }
+    for extension in RESULT_WRITERS:
+        path = os.path.join(directory, "results" + extension)
+        try:
+            result_writer(path).close()
+        except ImportError:
+            continue
+        benchmarks[f"output.{extension[1:]}"] = (
+            lambda path=path: write_results(results, path))
+    return benchmarks
+
+
+def random_scenarios(snapshot, size, seed=0):
+    """
+    Scenarios with the input parameters of the snapshot varied by up to
+    ±20 %
+    :param snapshot: ParamSnapshot object with the plant parameters
+    :param size: INT number of scenarios
+    :param seed: INT seed of the random numbers
+    :return: DICT with FLOAT arrays
+    """
+    rng = np.random.default_rng(seed)
+    return {name: value * rng.uniform(0.8, 1.2, size)
+            for name, value in snapshot.values.items()}
+
+
+def scaling_benchmarks(snapshot, sizes, repeat=3):
+    """
+    Scaling curves of the batch evaluation of every stage
+    :param snapshot: ParamSnapshot object with the plant parameters
+    :param sizes: LIST of INT batch sizes
+    :param repeat: INT number of repetitions per size
+    :return: DICT with the batch functions as keys and LISTS of DICTS
+    with the size, the median time in s and the scenarios per s
+    """
+    batches = {"pri_sed_batch": pri_sed_batch,
+               "sec_sed_batch": sec_sed_batch,
+               "act_sludge_batch": act_sludge_batch}
+    curves = {name: [] for name in batches}
+    for size in sizes:
+        scenarios = random_scenarios(snapshot, size)
+        for name, batch in batches.items():
+            timing = time_call(lambda: batch(scenarios), repeat)
+            curves[name].append({
+                "size": size, "min_s": timing["min_s"],
+                "median_s": timing["median_s"],
+                "scenarios_per_s": size / timing["median_s"]
+            })
+    return curves
+
+
+def compare(report, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compares the minimum times of a report with a baseline report (the
+    minimum is the timing least disturbed by other processes)
+    :param report: DICT returned by run_benchmarks
+    :param baseline: DICT returned by run_benchmarks on the reference
+    :param tolerance: FLOAT relative slowdown reported as a regression
+    :return: LIST of DICTS with the name, both minima, their ratio and
+    whether it is a regression, for the benchmarks found in both
+    """
+    def minima(data):
+        times = {name: result["min_s"]
+                 for name, result in data["stages"].items()}
+        for name, curve in data["scaling"].items():
+            for point in curve:
+                times[f"{name}[{point['size']}]"] = point["min_s"]
+        return times
+
+    current, reference = minima(report), minima(baseline)
+    rows = []
+    for name in current:
+        if name in reference:
+            ratio = current[name] / reference[name]
+            rows.append({"name": name, "min_s": current[name],
+                         "baseline_s": reference[name], "ratio": ratio,
+                         "regression": ratio > 1 + tolerance})
+    return rows
+
+
+def run_benchmarks(sizes=None, repeat=5):
+    """
+    Runs the stage and the scaling benchmarks
+    :param sizes: LIST of INT batch sizes (default BATCH_SIZES)
+    :param repeat: INT number of repetitions
+    :return: DICT with the environment, the stage timings and the
+    scaling curves
+    """
+    snapshot = load_snapshot()
+    with tempfile.TemporaryDirectory() as directory:
+        stages = {name: time_call(fun, repeat) for name, fun
+                  in stage_benchmarks(snapshot, directory).items()}
+    return {
+        "environment": {
+            "python": platform.python_version(), "numpy": np.__version__,
+            "pandas": pd.__version__, "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "stages": stages,
+        "scaling": scaling_benchmarks(snapshot, sizes or BATCH_SIZES,
+                                      min(repeat, 3))
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks of the wwtp_design stages and batches")
+    parser.add_argument("-o", "--output",
+                        help="JSON file for the report (default: stdout)")
+    parser.add_argument("-b", "--baseline",
+                        help="JSON report to compare the minima with")
+    parser.add_argument("-t", "--tolerance", type=float,
+                        default=REGRESSION_TOLERANCE,
+                        help="relative slowdown reported as a regression")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="repetitions per benchmark")
+    parser.add_argument("--max-size", type=float, default=1e6,
+                        help="largest batch size of the scaling curves")
+    args = parser.parse_args()
+    report = run_benchmarks([s for s in BATCH_SIZES if s <= args.max_size],
+                            args.repeat)
+    exit_code = 0
+    if args.baseline:
+        with open(os.path.join(CALLER_DIR, args.baseline)) as file:
+            report["comparison"] = compare(report, json.load(file),
+                                           args.tolerance)
+        for row in report["comparison"]:
+            flag = "REGRESSION" if row["regression"] else ""
+            print(f"{row['name']:40} {row['min_s']:.3e} s "
+                  f"{row['ratio']:6.2f}x {flag}", file=sys.stderr)
+        if any(row["regression"] for row in report["comparison"]):
+            exit_code = 1
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(os.path.join(CALLER_DIR, args.output), "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    sys.exit(exit_code)
@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Import time budgets in ms (median of fresh interpreters) and the
+# modules that must not be loaded by each import
+IMPORT_BUDGETS = {
+    "wwtp_design": {"budget_ms": 50, "forbidden": ["numpy", "pandas"]},
+    "wwtp_design.batch": {"budget_ms": 250,
+                          "forbidden": ["pandas", "openpyxl", "logging"]},
+    "wwtp_design.main": {"budget_ms": 1500, "forbidden": []}
+}
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure_import(module, repeat=5):
+    """
+    Measures the import time of a module in fresh interpreters
+    :param module: STRING with the dotted module name
+    :param repeat: INT number of interpreters
+    :return: TUPLE with the median import time in ms and the SET of
+    modules loaded by the import
+    """
+    times = []
+    modules = set()
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        probe = json.loads(output)
+        times.append(probe["ms"])
+        modules = set(probe["modules"])
+    return sorted(times)[len(times) // 2], modules
+
+
+def check_budgets(budgets=None, repeat=5, scale=1.0):
+    """
+    Checks the import time and the loaded modules against the budgets
+    :param budgets: DICT like IMPORT_BUDGETS (default IMPORT_BUDGETS)
+    :param repeat: INT number of interpreters per module
+    :param scale: FLOAT multiplying every budget (e.g. for slow runners)
+    :return: LIST of DICTS with one result per module
+    """
+    results = []
+    for module, budget in (budgets or IMPORT_BUDGETS).items():
+        median, modules = measure_import(module, repeat)
+        loaded = [name for name in budget["forbidden"] if name in modules]
+        results.append({
+            "module": module, "median_ms": round(median, 1),
+            "budget_ms": budget["budget_ms"] * scale,
+            "forbidden_loaded": loaded,
+            "ok": median <= budget["budget_ms"] * scale and not loaded
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Import time budget of the wwtp_design package")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="fresh interpreters per module")
+    parser.add_argument("-s", "--scale", type=float, default=1.0,
+                        help="factor applied to every budget")
+    parser.add_argument("-o", "--output",
+                        help="JSON file for the results (default: stdout)")
+    args = parser.parse_args()
+    report = check_budgets(repeat=args.repeat, scale=args.scale)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    sys.exit(0 if all(result["ok"] for result in report) else 1)
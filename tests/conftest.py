@@ -0,0 +1,24 @@
+import os
+import sys
+import tempfile
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = os.path.join(ROOT, "wwtp_design")
+# the modules import each other by their top-level names and read
+# ../input_data.xlsx relative to the package directory
+sys.path.insert(0, PACKAGE)
+os.chdir(PACKAGE)
+# keep the parameter sidecars and the results cache of the test run out
+# of the user's cache directory (read by cache.py on import)
+os.environ["WWTP_CACHE_DIR"] = tempfile.mkdtemp(prefix="wwtp_tests_")
+
+
+@pytest.fixture(scope="session")
+def snapshot():
+    """
+    Parameter snapshot of the input file of the repository
+    :return: ParamSnapshot object
+    """
+    from data import load_snapshot
+    return load_snapshot()
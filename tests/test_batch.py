@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+import pytest
+from main import *
+
+# Number of random plants compared with the scalar design chain
+SCENARIOS = 200
+
+
+def random_plants(snapshot, n=SCENARIOS, seed=1):
+    """
+    Random plants around the input file, within the size classes of
+    the tables (<= 20000 PE or >= 100000 PE)
+    :param snapshot: ParamSnapshot object of the input file
+    :param n: INT number of plants
+    :param seed: INT seed of the generator
+    :return: DATAFRAME with one row per plant
+    """
+    rng = np.random.default_rng(seed)
+    population = np.where(rng.random(n) < 0.5, rng.uniform(5000, 20000, n),
+                          rng.uniform(100000, 300000, n))
+    plants = pd.DataFrame({name: np.full(n, float(value)) for name, value
+                           in snapshot.values.items()})
+    plants["Population"] = population
+    plants["B d,BOD5"] = population * rng.uniform(0.03, 0.07, n)
+    plants["Q d,aM"] = population * rng.uniform(0.15, 0.35, n)
+    plants["Q comb"] = plants["Q d,aM"] * rng.uniform(1.5, 3, n)
+    plants["B d,Ntot"] = population * rng.uniform(0.009, 0.012, n)
+    plants["B d,Ptot"] = population * rng.uniform(0.0012, 0.0018, n)
+    plants["Tdim"] = rng.choice([10, 10.5, 11, 12], n)
+    return plants
+
+
+def scalar_value(method):
+    """
+    Result of a scalar design method, None if it is infeasible
+    :param method: bound design method without arguments
+    :return: FLOAT or None
+    """
+    try:
+        value = method()
+    except (ValueError, TypeError, KeyError, IndexError):
+        return None
+    if isinstance(value, tuple):
+        value = value[0]
+    if isinstance(value, str) or np.isnan(value):
+        return None
+    return float(value)
+
+
+def assert_same(batch, scalar):
+    """
+    Compares one batch result with the scalar one
+    :param batch: MASKED value of the batch function
+    :param scalar: FLOAT or None returned by scalar_value
+    :return: None
+    """
+    if scalar is None:
+        assert batch is np.ma.masked
+    else:
+        assert batch is not np.ma.masked
+        assert float(batch) == pytest.approx(scalar, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize("table, fun", [("pri_sed", pri_sed_batch),
+                                        ("sec_sed", sec_sed_batch),
+                                        ("act_sludge", act_sludge_batch)])
+def test_batch_matches_design_results(snapshot, table, fun):
+    expected = design_results(snapshot, use_cache=False)[table]
+    results = fun(snapshot.values)
+    for name, row in expected.iterrows():
+        value = np.ma.filled(np.ma.array(results[name], dtype=float),
+                             np.nan).ravel()[0]
+        assert round(value, 2) == pytest.approx(row["Results"]), name
+
+
+def test_act_sludge_batch_matches_scalar_chain(snapshot):
+    plants = random_plants(snapshot)
+    results = act_sludge_batch(plants)
+    for i in range(len(plants)):
+        a = ActSludge(make_snapshot(plants.iloc[i].to_dict(), snapshot))
+        for name, method in [("V_AT", a.v_at), ("OU_h", a.ou_h),
+                             ("n_D", a.n_d), ("RC", a.rc),
+                             ("SP_d", a.sp_d), ("t_SS_dim", a.t_ss_dim)]:
+            assert_same(results[name][i], scalar_value(method))
+
+
+def test_sec_sed_batch_matches_scalar_chain(snapshot):
+    plants = random_plants(snapshot, seed=2)
+    results = sec_sed_batch(plants)
+    for i in range(len(plants)):
+        s = SecSed(make_snapshot(plants.iloc[i].to_dict(), snapshot))
+        for name, method in [("q_A", s.q_a), ("A_ST", s.a_st),
+                             ("Diameter", s.diam_st), ("h_tot", s.h_tot)]:
+            assert_same(np.ma.array(results[name]).ravel()[i],
+                        scalar_value(method))
+
+
+def test_pri_sed_batch_matches_scalar_chain(snapshot):
+    plants = random_plants(snapshot, seed=3)
+    results = pri_sed_batch(plants)
+    for i in range(len(plants)):
+        p = PriSed(make_snapshot(plants.iloc[i].to_dict(), snapshot))
+        assert_same(results["Tank_surf"][i], scalar_value(p.pri_surf))
+        layout = p.cross_volume()
+        if isinstance(layout, str):
+            layout = [None] * 5
+        for name, value in zip(["Area_per_tank", "Quantity", "Length",
+                                "Width", "Vmin"], layout):
+            assert_same(results[name][i], value)
+
+
+def test_scenarios_broadcast_with_scalars(snapshot):
+    plants = random_plants(snapshot, n=5)
+    results = act_sludge_batch(dict(snapshot.values,
+                                    Tdim=plants["Tdim"].to_numpy()))
+    assert np.ma.array(results["V_AT"]).shape == (5,)
+
+
+def layout_loop(surf, num_tanks=2, width=1.0):
+    """
+    Search loop of the original PriSed.cross_volume: more tanks once the
+    width reaches 10 m, width steps of 0.5 m otherwise
+    :param surf: FLOAT of the total tank surface in m²
+    :param num_tanks: INT of the starting number of tanks
+    :param width: FLOAT of the starting width in m
+    :return: TUPLE with the area per tank, the number of tanks, the
+    length and the width, or None if no layout fits
+    """
+    while True:
+        area = surf / num_tanks
+        length = area / width
+        if 0.1 <= width / length <= 0.2:
+            return area, num_tanks, length, width
+        if width >= 10:
+            if area < 5:
+                # 1 m wide tanks exceed the ratio of 0.2 from here on,
+                # the original loop never ends
+                return None
+            num_tanks += 1
+            width = 1.0
+        else:
+            width += 0.5
+
+
+@pytest.mark.parametrize("num_tanks, width", [(2, 1.0), (3, 2.5), (2, 7.0),
+                                              (5, 1.0)])
+def test_pri_layout_matches_search_loop(num_tanks, width):
+    rng = np.random.default_rng(4)
+    surfs = np.concatenate([np.geomspace(5.1, 2e5, 1500),
+                            rng.uniform(5, 50000, 1500)])
+    layout = pri_layout(surfs, num_tanks, width)
+    for i, surf in enumerate(surfs):
+        expected = layout_loop(surf, num_tanks, width)
+        if expected is None:
+            assert np.isnan(layout[0][i])
+            continue
+        assert [values[i] for values in layout] == pytest.approx(
+            expected, rel=1e-12)
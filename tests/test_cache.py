@@ -0,0 +1,129 @@
+import os
+import numpy as np
+import pytest
+import cache
+from cache import *
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    """
+    ResultCache with a small on-disk tier in a temporary directory
+    :return: ResultCache object
+    """
+    return ResultCache(str(tmp_path / "results.sqlite"), memory_items=2,
+                       max_bytes=3500)
+
+
+def stored_bytes(result_cache):
+    """
+    Size of the on-disk tier summed over the stored results
+    :param result_cache: ResultCache object
+    :return: INT size in B
+    """
+    return result_cache.connection.execute(
+        "SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+
+def test_keys_normalize_equal_numbers():
+    assert (result_key("k", {"Tdim": 12}) == result_key("k", {"Tdim": 12.0})
+            == result_key("k", {"Tdim": np.int64(12)}))
+    assert result_key("k", {"Tdim": 12}) != result_key("k", {"Tdim": 11})
+    assert result_key("k", {"Tdim": 12}) != result_key("j", {"Tdim": 12})
+    assert (result_key("k", {"x": np.arange(3)})
+            != result_key("k", {"x": np.arange(4)}))
+
+
+def test_hits_and_misses(disk_cache, tmp_path):
+    assert disk_cache.get("a") is None
+    disk_cache.put("a", {"value": 1})
+    assert disk_cache.get("a") == {"value": 1}
+    # a second object on the same file only has the disk tier
+    other = ResultCache(str(tmp_path / "results.sqlite"))
+    assert other.get("a") == {"value": 1}
+    assert other.get("b") is None
+    stats = disk_cache.stats()
+    assert (stats["misses"], stats["memory_hits"], stats["stores"]) == (
+        1, 1, 1)
+    assert (other.stats()["disk_hits"], other.stats()["misses"]) == (1, 1)
+
+
+def test_get_or_compute_computes_once(disk_cache):
+    calls = []
+    for _ in range(3):
+        value = disk_cache.get_or_compute(
+            "key", lambda: calls.append(1) or len(calls))
+    assert value == 1 and len(calls) == 1
+
+
+def test_least_recently_used_results_are_evicted(disk_cache):
+    for i in range(3):
+        disk_cache.put(f"k{i}", b"x" * 1000)
+    # k0 is read from disk, so k1 is the least recently used one
+    disk_cache.memory.clear()
+    disk_cache.get("k0")
+    disk_cache.flush()
+    disk_cache.put("k3", b"x" * 1000)
+    keys = {key for key, in disk_cache.connection.execute(
+        "SELECT key FROM results")}
+    assert "k1" not in keys and {"k0", "k3"} <= keys
+    assert disk_cache.stats()["evictions"] >= 1
+    assert disk_cache.stats()["disk_bytes"] == stored_bytes(disk_cache)
+    assert stored_bytes(disk_cache) <= disk_cache.max_bytes
+
+
+def test_running_total_follows_replacements_and_clear(disk_cache):
+    disk_cache.put("a", b"x" * 500)
+    disk_cache.put("a", b"x" * 100)
+    disk_cache.put_many([("b", b"x" * 200), ("c", b"x" * 300)])
+    assert disk_cache.stats()["disk_bytes"] == stored_bytes(disk_cache)
+    disk_cache.clear()
+    assert disk_cache.stats()["disk_bytes"] == 0
+    assert disk_cache.get("a") is None
+
+
+def test_disk_hits_are_touched_in_batches(disk_cache, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_TOUCH_BATCH", 3)
+    for i in range(3):
+        disk_cache.put(f"k{i}", b"x")
+    disk_cache.memory.clear()
+    disk_cache.get("k0")
+    disk_cache.get("k1")
+    assert set(disk_cache.touched) == {"k0", "k1"}
+    disk_cache.get("k2")
+    assert disk_cache.touched == {}
+
+
+def test_design_results_are_cached_copies(snapshot):
+    from main import design_results
+    first = design_results(snapshot)
+    hits = default_cache().stats()["memory_hits"]
+    second = design_results(snapshot)
+    assert default_cache().stats()["memory_hits"] == hits + 1
+    for table in first:
+        assert first[table].equals(second[table])
+    second["pri_sed"].iloc[0, 0] = -1
+    assert not design_results(snapshot)["pri_sed"].equals(second["pri_sed"])
+
+
+def test_cache_file_is_in_the_cache_directory():
+    assert os.path.dirname(CACHE_PATH) == CACHE_DIR
+    assert CACHE_DIR == os.environ["WWTP_CACHE_DIR"]
+
+
+def test_sweep_chunks_are_only_cached_on_request(snapshot):
+    from sweep import sweep_chunk, expand_grid
+    points = expand_grid({"Tdim": [10, 11, 12]})
+    stores = default_cache().stats()["stores"]
+    sweep_chunk(points, snapshot)
+    assert default_cache().stats()["stores"] == stores
+    sweep_chunk(points, snapshot, use_cache=True)
+    assert default_cache().stats()["stores"] == stores + 1
+
+
+def test_sources_cover_the_cached_design_chain():
+    for source in ["feasibility.py", "graph.py", "data.py", "sweep.py",
+                   "std_tables.py", "main.py"]:
+        assert source in CACHE_SOURCES
+    for source in CACHE_SOURCES:
+        assert os.path.isfile(source)
@@ -0,0 +1,65 @@
+import os
+import shutil
+import pytest
+from data import *
+
+
+@pytest.fixture
+def input_copy(tmp_path):
+    """
+    Copy of the input file in a temporary directory
+    :return: STR of the absolute path of the copy
+    """
+    path = str(tmp_path / "plant.xlsx")
+    shutil.copy(os.path.join("..", "input_data.xlsx"), path)
+    return path
+
+
+def test_sidecar_is_json_in_the_cache_directory(input_copy):
+    snapshot = load_snapshot(input_copy)
+    stat = os.stat(input_copy)
+    path = sidecar_path(input_copy, stat)
+    assert os.path.dirname(path) == SIDECAR_DIR
+    assert os.listdir(os.path.dirname(input_copy)) == ["plant.xlsx"]
+    with open(path) as sidecar:
+        json.load(sidecar)
+    assert read_sidecar(input_copy, stat).equals(snapshot.wwtp_params)
+
+
+def test_snapshot_from_the_sidecar_equals_the_parsed_one(input_copy):
+    parsed = load_snapshot(input_copy)
+    SNAPSHOTS.clear()
+    cached = load_snapshot(input_copy)
+    assert cached is not parsed
+    assert dict(cached.values) == dict(parsed.values)
+    assert cached.wwtp_params.equals(parsed.wwtp_params)
+
+
+def test_damaged_or_outdated_sidecars_are_parsed_again(input_copy):
+    load_snapshot(input_copy)
+    stat = os.stat(input_copy)
+    with open(sidecar_path(input_copy, stat), "w") as sidecar:
+        sidecar.write("{not json")
+    assert read_sidecar(input_copy, stat) is None
+    SNAPSHOTS.clear()
+    assert load_snapshot(input_copy).values["Tdim"] == 12
+    # a newer version of the file replaces the old sidecar
+    os.utime(input_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    load_snapshot(input_copy)
+    stem = os.path.basename(sidecar_path(input_copy, stat)).split("-")[0]
+    assert len([name for name in os.listdir(SIDECAR_DIR)
+                if name.startswith(stem)]) == 1
+
+
+def test_param_reads_the_snapshot_values(snapshot):
+    reader = InputReader(snapshot=snapshot)
+    assert reader.param("Population") == snapshot.values["Population"]
+    with pytest.raises(KeyError):
+        reader.param("Unknown")
+
+
+def test_only_the_cache_directory_is_imported():
+    import data
+    assert SIDECAR_DIR == os.path.join(os.environ["WWTP_CACHE_DIR"],
+                                       "params")
+    assert not hasattr(data, "ResultCache")
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from act_sludge import ActSludge
+from envelope import *
+
+
+@pytest.fixture(scope="module")
+def envelope(snapshot):
+    """
+    Envelope of a daily series from 5 to 20 °C
+    :return: TUPLE returned by temperature_envelope
+    """
+    temperatures = pd.Series(np.linspace(5, 20, 31),
+                             index=pd.date_range("2025-01-01", periods=31))
+    return temperature_envelope(temperatures, snapshot)
+
+
+def test_each_temperature_matches_a_single_design(snapshot, envelope):
+    _, table = envelope
+    feasible = table[feasible_mask(table["Infeasible"].to_numpy())]
+    assert len(feasible)
+    for t in feasible["T"].unique():
+        row = feasible[feasible["T"] == t].iloc[0]
+        a = ActSludge(make_snapshot({"Tdim": t}, snapshot))
+        assert row["V_AT"] == pytest.approx(a.v_at())
+        assert row["OU_h"] == pytest.approx(a.ou_h())
+
+
+def test_only_feasible_temperatures_govern(envelope):
+    governing, table = envelope
+    feasible = feasible_mask(table["Infeasible"].to_numpy())
+    assert (~feasible).any()
+    assert table.loc[~feasible, ENVELOPE_RESULTS].isna().all().all()
+    for name in ENVELOPE_GOVERNING:
+        row = governing.loc[name]
+        assert feasible_mask(row["Infeasible"])
+        assert row["Results"] == table.loc[feasible, name].max()
+        assert table.loc[row["Time"], "T"] == row["T"]
+
+
+def test_excluded_temperatures(envelope):
+    _, table = envelope
+    excluded = excluded_temperatures(table)
+    assert excluded.min() == 5 and excluded.max() == 20
+    assert not np.isin([11.0, 12.0], excluded).any()
+
+
+def test_infeasible_series_raises(snapshot):
+    with pytest.raises(ValueError, match="infeasible at every"):
+        temperature_envelope([5.0, 6.0], snapshot)
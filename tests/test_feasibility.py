@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+from main import *
+from feasibility import *
+
+
+def plant_snapshot(values):
+    """
+    Parameter snapshot of one plant
+    :param values: DICT with the plant parameters
+    :return: ParamSnapshot object
+    """
+    return ParamSnapshot(pd.DataFrame({"Value": pd.Series(values),
+                                       "Unit": ""}))
+
+
+def is_message(method):
+    """
+    Whether a design node of the scalar chain answers with a message or
+    with a NaN (e.g. a peak factor beyond its table)
+    :param method: bound design node method
+    :return: TRUE for a STR or NaN result, FALSE for numbers or an error
+    """
+    try:
+        result = method()
+    except Exception:
+        return False
+    return isinstance(result, str) or bool(np.isnan(result).any())
+
+
+def scalar_codes(values, rs=RS_SEC, qsv=QSV_SEC, **assumptions):
+    """
+    Infeasible flags derived from the messages of the scalar chain
+    :param values: DICT with the plant parameters
+    :param rs: FLOAT return sludge ratio of SecSed
+    :param qsv: FLOAT sludge volume loading rate of SecSed
+    :param assumptions: FLOATS of the effluent assumptions of ActSludge
+    :return: INT with the Infeasible flags
+    """
+    snapshot = plant_snapshot(values)
+    sec_sed = SecSed(snapshot)
+    sec_sed.rs, sec_sed.qsv = rs, qsv
+    act_sludge = ActSludge(snapshot)
+    for name, value in assumptions.items():
+        setattr(act_sludge, name, value)
+    code = 0
+    if is_message(sec_sed.q_a):
+        code |= Infeasible.Q_A
+    elif is_message(sec_sed.h_tot):
+        code |= Infeasible.H_TOT
+    if is_message(act_sludge.s_f):
+        code |= Infeasible.SIZE_BAND
+    # the temperature range is checked first by inter_t_ss_dim
+    if (is_message(act_sludge.inter_t_ss_dim) and
+            act_sludge.inter_t_ss_dim()
+            == INFEASIBLE_MESSAGES[Infeasible.TDIM_RANGE]):
+        code |= Infeasible.TDIM_RANGE
+    if np.isnan(act_sludge.c_p_er()):
+        code |= Infeasible.P_REQUIREMENT
+    if is_message(act_sludge.n_bal):
+        code |= Infeasible.N_BALANCE
+    else:
+        if is_message(act_sludge.n_d):
+            code |= Infeasible.N_D
+        if not is_message(act_sludge.s_f) and (
+                is_message(act_sludge.inter_sp_c_bod)
+                or is_message(act_sludge.inter_fc_fn)):
+            code |= Infeasible.SLUDGE_AGE
+    return code
+
+
+@pytest.fixture(scope="module")
+def plants(snapshot):
+    """
+    Random plants around the input file, with temperatures, loads and
+    sizes on both sides of the domain conditions
+    :return: DATAFRAME with one plant per row
+    """
+    rng = np.random.default_rng(7)
+    n = 120
+    df = pd.DataFrame({name: np.full(n, float(value))
+                       for name, value in snapshot.values.items()})
+    df["Population"] = rng.uniform(2000, 300000, n)
+    df["B d,BOD5"] = df["Population"] * rng.uniform(0.02, 0.07, n)
+    df["Q d,aM"] = df["Population"] * rng.uniform(0.15, 0.35, n)
+    df["B d,Ntot"] = df["Population"] * rng.uniform(0.005, 0.012, n)
+    df["B d,Ptot"] = df["Population"] * rng.uniform(0.0012, 0.0018, n)
+    df["Tdim"] = rng.choice([8.0, 10.0, 11.0, 12.0, 13.0], n)
+    return df
+
+
+def test_codes_agree_with_the_scalar_chain(plants):
+    codes = feasibility(plants)
+    for i, (_, row) in enumerate(plants.iterrows()):
+        assert codes[i] == scalar_codes(row.to_dict()), i
+    assert len(set(codes)) > 3
+
+
+@pytest.mark.parametrize("rs, qsv, code", [
+    (0.75, 500, 0), (0.5, 500, Infeasible.Q_A),
+    (0.5, 300, Infeasible.H_TOT), (1.0, 900, Infeasible.Q_A)])
+def test_secondary_sedimentation_codes(snapshot, rs, qsv, code):
+    assert feasibility(snapshot.values, rs=rs, qsv=qsv)[0] == code
+    assert scalar_codes(snapshot.values, rs=rs, qsv=qsv) == code
+
+
+def test_combined_flags(snapshot):
+    values = dict(snapshot.values, Tdim=14, Population=50000)
+    values["B d,BOD5"] = 3000
+    assumptions = {"S_orgN_EST": 2, "S_NH4_EST": 2, "S_NO3_EST": 10}
+    code = feasibility(values, qsv=900, **assumptions)[0]
+    assert code == (Infeasible.SIZE_BAND | Infeasible.TDIM_RANGE
+                    | Infeasible.N_BALANCE | Infeasible.Q_A)
+    assert scalar_codes(values, qsv=900, **assumptions) == code
+    assert feasibility_reasons(code) == [
+        INFEASIBLE_MESSAGES[flag] for flag in
+        [Infeasible.SIZE_BAND, Infeasible.N_BALANCE,
+         Infeasible.TDIM_RANGE, Infeasible.Q_A]]
+    assert not feasible_mask([code])[0]
+
+
+def test_mask_ignores_the_temperature_range_by_default(snapshot):
+    codes = feasibility(pd.DataFrame({**{name: [value, value] for name,
+                                         value in snapshot.values.items()},
+                                      "Tdim": [12.0, 14.0]}))
+    assert list(codes) == [0, Infeasible.TDIM_RANGE]
+    assert feasible_mask(codes).all()
+    assert list(feasible_mask(codes, ignore=0)) == [True, False]
@@ -0,0 +1,61 @@
+import json
+import logging
+import threading
+import pytest
+import fun
+from fun import *
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    """
+    Writes the log files into a temporary directory and stops the
+    logging afterwards
+    :return: pathlib.Path of the directory
+    """
+    monkeypatch.chdir(tmp_path)
+    stop_logging()
+    yield tmp_path
+    stop_logging()
+
+
+def queue_handlers(logger_key):
+    """
+    Queue handlers of a logger
+    :param logger_key: STR of the logger name
+    :return: LIST of LazyQueueHandler objects
+    """
+    return [handler for handler in logging.getLogger(logger_key).handlers
+            if isinstance(handler, QueueHandler)]
+
+
+def test_second_start_adds_nothing(log_dir):
+    threads = threading.active_count()
+    start_logging()
+    listener = fun.log_listener
+    start_logging()
+    assert fun.log_listener is listener
+    assert threading.active_count() == threads + 1
+    for logger_key in LOGGERS_CONFIG:
+        assert len(queue_handlers(logger_key)) == 1
+    logging.getLogger("error_logger").error("written once")
+    stop_logging()
+    assert threading.active_count() == threads
+    with open(log_dir / "error.log") as file:
+        assert file.read().count("written once") == 1
+    for logger_key in LOGGERS_CONFIG:
+        assert not queue_handlers(logger_key)
+
+
+def test_logging_can_be_started_again(log_dir):
+    start_logging()
+    stop_logging()
+    start_logging(json_format=True)
+    for logger_key in LOGGERS_CONFIG:
+        assert len(queue_handlers(logger_key)) == 1
+    logging.getLogger("warning_logger").warning("as JSON")
+    stop_logging()
+    with open(log_dir / "warning.log") as file:
+        entry = json.loads(file.readline())
+    assert entry["logger"] == "warning_logger"
+    assert entry["message"] == "as JSON"
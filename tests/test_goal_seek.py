@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+from main import *
+from goal_seek import *
+
+
+def scalar_capacity(snapshot, variable, value):
+    """
+    Capacity results of the scalar chain for a changed plant parameter,
+    scaling the GOAL_SEEK_SCALED parameters in proportion
+    :param snapshot: ParamSnapshot object with the plant parameters
+    :param variable: STR of the changed parameter
+    :param value: FLOAT of its new value
+    :return: DICT with the GOAL_SEEK_CONSTRAINTS as keys
+    """
+    values = dict(snapshot.values)
+    ratio = value / values[variable]
+    for name in GOAL_SEEK_SCALED.get(variable, []):
+        values[name] = values[name] * ratio
+    values[variable] = value
+    plant = ParamSnapshot(pd.DataFrame({"Value": pd.Series(values),
+                                        "Unit": ""}))
+    act_sludge, sec_sed = ActSludge(plant), SecSed(plant)
+    return {"V_AT": act_sludge.v_at(), "OU_h": act_sludge.ou_h(),
+            "A_ST_tot": (values["Q comb"] / 24) / sec_sed.q_a()}
+
+
+@pytest.mark.parametrize("limits", [
+    {"V_AT": 30000}, {"OU_h": 600}, {"A_ST_tot": 4000},
+    {"V_AT": 30000, "OU_h": 500, "A_ST_tot": 5000}])
+def test_capacity_reproduces_its_limit(snapshot, limits):
+    df = goal_seek(limits, snapshot=snapshot, rtol=1e-9)
+    row = df.iloc[0]
+    assert row["Status"] == "ok"
+    results = scalar_capacity(snapshot, "Population", row["Capacity"])
+    binding = row["Binding"]
+    assert results[binding] == pytest.approx(limits[binding], rel=1e-6)
+    for name, limit in limits.items():
+        assert results[name] <= limit * (1 + 1e-6)
+
+
+def test_one_capacity_per_plant(snapshot):
+    plants = pd.DataFrame({"Tdim": [10.0, 12.0]}, index=["cold", "warm"])
+    df = goal_seek({"V_AT": 30000}, snapshot=snapshot, plants=plants)
+    assert list(df.index) == ["cold", "warm"]
+    # colder plants need larger tanks for the same population
+    assert df.loc["cold", "Capacity"] < df.loc["warm", "Capacity"]
+
+
+def test_statuses_at_the_ends_of_the_bracket(snapshot):
+    df = goal_seek({"V_AT": [1e-6, 1e12]}, snapshot=snapshot)
+    assert list(df["Status"]) == ["exceeded", "not reached"]
+    assert pd.isna(df["Capacity"].iloc[0])
+
+
+def test_unknown_constraints_and_parameters(snapshot):
+    with pytest.raises(KeyError):
+        goal_seek({"V_D": 1000}, snapshot=snapshot)
+    with pytest.raises(KeyError):
+        goal_seek({"V_AT": 1000}, variable="Pop", snapshot=snapshot)
+    with pytest.raises(ValueError):
+        goal_seek({}, snapshot=snapshot)
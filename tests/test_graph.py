@@ -0,0 +1,63 @@
+import pytest
+import graph
+from act_sludge import *
+
+
+def test_nodes_are_computed_once(snapshot):
+    a = ActSludge(snapshot)
+    first = a.ou_h()
+    counts = dict(a.design_graph.eval_counts)
+    assert a.ou_h() == first
+    assert a.design_graph.eval_counts == counts
+    assert set(counts.values()) == {1}
+
+
+def test_setting_an_input_only_drops_its_dependents(snapshot):
+    a = ActSludge(snapshot)
+    a.ou_h()
+    dependents = a.design_graph.dependents(["S_NO3_EST"])
+    assert "ou_h" in dependents and "c_bod5_iat" not in dependents
+    a.S_NO3_EST = 10
+    value = a.ou_h()
+    counts = a.design_graph.eval_counts
+    assert counts["c_bod5_iat"] == 1
+    assert all(counts[node] == 2 for node in dependents
+               if node in counts)
+    fresh = ActSludge(snapshot)
+    fresh.S_NO3_EST = 10
+    assert value == fresh.ou_h()
+
+
+def test_replacing_the_snapshot_drops_every_node(snapshot):
+    a = ActSludge(snapshot)
+    a.v_at()
+    other = make_snapshot({"Population": 200000}, snapshot)
+    a.snapshot = other
+    assert a.v_at() == ActSludge(other).v_at()
+    assert a.design_graph.eval_counts["v_at"] == 2
+
+
+def test_update_inputs_after_an_edit_in_place(snapshot):
+    s = SecSed(snapshot)
+    s.h_tot()
+    s.__dict__["rs"] = 0.9
+    invalidated = update_inputs(s, ["rs"])
+    assert "h_tot" in invalidated
+    fresh = SecSed(snapshot)
+    fresh.rs = 0.9
+    assert s.h_tot() == fresh.h_tot()
+
+
+def test_key_is_the_snapshot_and_the_design_inputs(snapshot, monkeypatch):
+    s = SecSed()
+    assert s.snapshot is load_snapshot()
+    s.a_st()
+    assert s.design_graph.params_key == (s.snapshot, (("qsv", QSV_SEC),
+                                                      ("rs", RS_SEC)))
+    # the key is not rebuilt by memoized calls
+    calls = []
+    monkeypatch.setattr(graph, "get_params_key",
+                        lambda obj: calls.append(obj))
+    s.a_st()
+    s.h_tot()
+    assert calls == []
@@ -0,0 +1,50 @@
+import pytest
+from incremental import *
+
+# Edits applied one after the other (plant parameters and design
+# attributes of every stage)
+EDITS = [{"Tdim": 10}, {"B d,Ptot": 300}, {"S_NO3_EST": 8}, {"rs": 0.9},
+         {"Q comb": 120000}, {"num_tanks": 3},
+         {"Tdim": 11, "S_NH4_EST": 1}, {"B d,BOD5": 6200}]
+
+
+def test_edits_give_the_results_of_a_fresh_design(snapshot):
+    design = IncrementalDesign(snapshot)
+    design.results()
+    applied = {}
+    for changes in EDITS:
+        design.update(changes)
+        applied.update(changes)
+        fresh = IncrementalDesign(snapshot)
+        fresh.update(applied)
+        results, expected = design.results(), fresh.results()
+        for table in expected:
+            assert results[table].equals(expected[table]), (changes, table)
+
+
+def test_only_the_dependent_rows_are_invalidated(snapshot):
+    design = IncrementalDesign(snapshot)
+    design.results()
+    invalidated = design.update({"rs": 0.9})
+    assert not invalidated["pri_sed"] and not invalidated["act_sludge"]
+    assert "h_tot" in invalidated["sec_sed"]
+    counts = dict(design.eval_counts)
+    design.results()
+    recomputed = {key for key, count in design.eval_counts.items()
+                  if count > counts[key]}
+    assert recomputed == {("sec_sed", name)
+                          for name in invalidated["sec_sed"]}
+
+
+def test_results_match_design_results(snapshot):
+    from main import design_results
+    expected = design_results(snapshot, use_cache=False)
+    results = IncrementalDesign(snapshot).results()
+    for table, df in expected.items():
+        assert results[table]["Results"].tolist() == pytest.approx(
+            df["Results"].tolist())
+
+
+def test_unknown_inputs_are_rejected(snapshot):
+    with pytest.raises(KeyError):
+        IncrementalDesign(snapshot).update({"Unknown": 1})
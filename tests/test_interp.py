@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from interp import *
+
+
+def test_vd_vat_matches_np_interp():
+    targets = np.linspace(-0.1, 0.3, 101)
+    expected = np.interp(targets, S_NO3_D_C_BOD_PRE, VD_VAT)
+    assert VD_VAT_INTERP(targets) == pytest.approx(expected, rel=1e-12)
+
+
+def test_fc_fn_matches_np_interp_and_propagates_gaps():
+    t_ss = np.linspace(4, 25, 85)
+    result = FC_FN_INTERP(t_ss)
+    for row, values in zip(result, FC_FN_VALUES):
+        known = ~np.isnan(values)
+        # interval ends on a missing table value give NaN
+        start = np.clip(np.searchsorted(FC_FN_T_SS, t_ss), 1, 5)
+        gap = np.isnan(values[start - 1]) | np.isnan(values[start])
+        expected = np.interp(t_ss, FC_FN_T_SS[known], values[known])
+        assert np.isnan(row[gap]).all()
+        assert row[~gap] == pytest.approx(expected[~gap], rel=1e-12)
+    assert np.isnan(FC_FN_INTERP([3.9, 25.1])).all()
+
+
+def test_sp_c_bod_is_bilinear():
+    rng = np.random.default_rng(0)
+    ratios = rng.uniform(0.3, 1.3, 200)
+    t_ss = rng.uniform(4, 25, 200)
+    result = SP_C_BOD_INTERP(ratios, t_ss)
+    for ratio, t, value in zip(ratios, t_ss, result):
+        by_ratio = [np.interp(t, SP_C_BOD_T_SS, row)
+                    for row in SP_C_BOD_VALUES]
+        # the ratio is clamped to the table range like np.interp
+        expected = np.interp(ratio, SP_C_BOD_RATIOS, by_ratio)
+        assert value == pytest.approx(expected, rel=1e-12)
+    # the sludge age is not extrapolated
+    assert np.isnan(SP_C_BOD_INTERP(0.8, [3.9, 25.1])).all()
+
+
+def test_t_ss_dim_reproduces_the_table():
+    rows = T_SS_DIM_VALUES[T_SS_DIM_DEN_ROWS]
+    vd_vat = T_SS_DIM_VD_VAT[T_SS_DIM_DEN_ROWS]
+    for vd, row in zip(vd_vat, rows):
+        # (plant size, temperature) columns of the table
+        small_10, small_12, large_10, large_12 = row
+        assert T_SS_DIM_INTERP(10, vd).tolist() == [small_10, large_10]
+        assert T_SS_DIM_INTERP(12, vd).tolist() == [small_12, large_12]
+        assert T_SS_DIM_INTERP(11, vd) == pytest.approx(
+            [(small_10 + small_12) / 2, (large_10 + large_12) / 2])
+    assert np.isnan(T_SS_DIM_INTERP([9.9, 12.1], 0.3)).all()
+
+
+def test_results_are_indexed_by_the_enums():
+    row = T_SS_DIM_VALUES[SludgeAgeTarget.DENITRIFICATION_VD_VAT_03]
+    result = T_SS_DIM_INTERP(10, 0.3)
+    assert result[SizeBand.UP_TO_1200] == row[SludgeAgeColumn.T10_UP_TO_1200]
+    assert result[SizeBand.OVER_6000] == row[SludgeAgeColumn.T10_OVER_6000]
+    result = FC_FN_INTERP(15)
+    for factor in PeakFactor:
+        assert result[factor] == FC_FN_VALUES[factor, 4]
+
+
+def test_interpolators_are_read_only():
+    with pytest.raises(ValueError):
+        SP_C_BOD_INTERP.values[0, 0] = 1
+    with pytest.raises(ValueError):
+        FC_FN_INTERP.axes[0][0] = 1
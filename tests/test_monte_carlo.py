@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+from main import *
+from monte_carlo import *
+
+# Influent loads sampled around those of the input file
+LOADS = {"B d,BOD5": ("normal", 5658, 500), "Tdim": ("uniform", 10, 12)}
+
+
+def test_fixed_seed_is_reproducible(snapshot):
+    first = monte_carlo(LOADS, n_samples=3000, snapshot=snapshot, seed=42,
+                        workers=1, block_size=1000)
+    second = monte_carlo(LOADS, n_samples=3000, snapshot=snapshot,
+                         seed=42, workers=1, block_size=1000)
+    pd.testing.assert_frame_equal(first, second)
+    other = monte_carlo(LOADS, n_samples=3000, snapshot=snapshot, seed=43,
+                        workers=1, block_size=1000)
+    assert not first["Mean"].equals(other["Mean"])
+
+
+def test_workers_do_not_change_the_results(snapshot):
+    serial = monte_carlo(LOADS, n_samples=3000, snapshot=snapshot, seed=7,
+                         workers=1, block_size=1000)
+    parallel = monte_carlo(LOADS, n_samples=3000, snapshot=snapshot,
+                           seed=7, workers=2, block_size=1000)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_fixed_values_give_the_scalar_design(snapshot):
+    fixed = {"SVI": SVI_DIM, "t_TH": T_TH_DIM}
+    df = monte_carlo(fixed, n_samples=10, snapshot=snapshot, seed=0,
+                     workers=1)
+    # the results of design_results are rounded to two decimals
+    results = design_results(snapshot)
+    for name, stage in MC_RESULTS.items():
+        expected = results[stage]["Results"][name]
+        for column in ["Mean"] + [f"P{q}" for q in MC_PERCENTILES]:
+            assert df.loc[name, column] == pytest.approx(expected,
+                                                         abs=0.005)
+    assert (df["Feasible"] == 1).all()
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from main import *
+from feasibility import *
+from optimize import *
+
+# Small decision space evaluated by the tests
+SPACE = {"rs": [0.5, 0.75, 1.0], "qsv": [300, 400, 500],
+         "S_NO3_EST": [6, 8, 9, 10, 12]}
+
+
+@pytest.fixture(scope="module")
+def candidates(snapshot):
+    """
+    Every feasible candidate of the small decision space
+    :return: DATAFRAME returned by optimize
+    """
+    return optimize(SPACE, snapshot=snapshot, workers=1, front_only=False)
+
+
+def test_fewest_feasible_primary_tanks(snapshot, candidates):
+    quantities = []
+    for num_tanks in OPTIMIZE_SPACE["num_tanks"]:
+        pri_sed = PriSed(snapshot)
+        pri_sed.num_tanks = num_tanks
+        layout = pri_sed.cross_volume()
+        if not isinstance(layout, str):
+            quantities.append(layout[1])
+    assert (candidates["num_tanks"] == min(quantities)).all()
+    assert optimize(dict(SPACE, num_tanks=[4, 5]), snapshot=snapshot,
+                    workers=1)["num_tanks"].eq(4).all()
+
+
+def test_fewest_feasible_secondary_tanks(snapshot, candidates):
+    for row in candidates.itertuples():
+        sec_sed = SecSed(snapshot)
+        sec_sed.rs, sec_sed.qsv = row.rs, row.qsv
+        ladder = sec_sed.a_st()[1]
+        assert row.sec_tanks == min(
+            tanks for tanks in OPTIMIZE_SPACE["sec_tanks"]
+            if tanks >= ladder)
+
+
+def test_candidates_are_feasible(snapshot, candidates):
+    assert len(candidates)
+    codes = feasibility(dict(snapshot.values, **{
+        name: candidates[name].to_numpy()
+        for name in ["rs", "qsv", "S_NO3_EST"]}))
+    assert codes.shape == (len(candidates),)
+    assert feasible_mask(codes).all()
+    assert (candidates["q_A"] <= 1.6).all()
+    assert (candidates["h_tot"] >= 3).all()
+    assert (candidates["n_D"] >= 0.7).all()
+    assert candidates.attrs["Pruned"]["n_D < 0.7"] > 0
+
+
+def test_front_is_not_dominated(candidates):
+    front = candidates[candidates["Pareto"]]
+    for row in front[OPTIMIZE_OBJECTIVES].to_numpy():
+        objectives = candidates[OPTIMIZE_OBJECTIVES].to_numpy()
+        dominated = ((objectives <= row).all(axis=1)
+                     & (objectives < row).any(axis=1))
+        assert not dominated.any()
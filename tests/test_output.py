@@ -0,0 +1,94 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from output import *
+
+
+@pytest.fixture
+def tables():
+    """
+    Two result tables of numbers and text, each written in two chunks
+    :return: DICT with table names as keys and DATAFRAMES as values
+    """
+    rng = np.random.default_rng(0)
+    index = pd.Index([f"p{i}" for i in range(6)], name="Parameter")
+    return {name: pd.DataFrame({"Results": rng.uniform(0, 100, 6),
+                                "Units": ["m", "m³", "kg/d", "-", "°C",
+                                          "L/(m²*h)"]}, index=index)
+            for name in ["pri_sed", "act_sludge"]}
+
+
+def write_chunks(writer, tables):
+    """
+    Writes every table in two chunks of rows
+    :param writer: ResultWriter object
+    :param tables: DICT with table names as keys and DATAFRAMES as values
+    :return: None
+    """
+    with writer:
+        for start in (0, 3):
+            for table, df in tables.items():
+                writer.write(df.iloc[start:start + 3], table)
+
+
+def test_excel_round_trip(tables, tmp_path):
+    path = str(tmp_path / "results.xlsx")
+    write_chunks(result_writer(path), tables)
+    sheets = pd.read_excel(path, sheet_name=None, index_col=0)
+    assert list(sheets) == list(tables)
+    for table, df in tables.items():
+        pd.testing.assert_frame_equal(sheets[table], df)
+
+
+def test_csv_round_trip(tables, tmp_path):
+    path = str(tmp_path / "results.csv")
+    write_chunks(result_writer(path), tables)
+    for table, df in tables.items():
+        read = pd.read_csv(tmp_path / f"results_{table}.csv", index_col=0)
+        pd.testing.assert_frame_equal(read, df)
+
+
+def test_json_lines_round_trip(tables, tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    write_chunks(result_writer(path), tables)
+    with open(path, encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    assert len(records) == 12
+    read = pd.DataFrame(records)
+    for table, df in tables.items():
+        rows = read[read["table"] == table].drop(columns="table")
+        pd.testing.assert_frame_equal(rows.set_index("Parameter"), df)
+
+
+def test_parquet_round_trip(tables, tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "results.parquet")
+    write_chunks(result_writer(path), tables)
+    for table, df in tables.items():
+        read = pd.read_parquet(tmp_path / f"results_{table}.parquet")
+        pd.testing.assert_frame_equal(read, df)
+
+
+def test_partitions_round_trip(tmp_path):
+    df = pd.DataFrame({"a": np.arange(10.0), "b": np.linspace(0, 1, 10)},
+                      index=pd.RangeIndex(10, 20))
+    path = str(tmp_path / "parts")
+    with PartitionedResultWriter(path) as writer:
+        for start in range(0, 10, 4):
+            writer.write(df.iloc[start:start + 4])
+    with open(os.path.join(path, "columns.json")) as file:
+        assert json.load(file) == ["index", "a", "b"]
+    parts = list(read_partitions(path))
+    assert [len(part) for part in parts] == [4, 4, 2]
+    read = pd.concat(parts, ignore_index=True)
+    assert list(read["index"]) == list(df.index)
+    pd.testing.assert_frame_equal(read[["a", "b"]],
+                                  df.reset_index(drop=True))
+
+
+def test_unknown_formats_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        result_writer(str(tmp_path / "results.doc"))
+    with pytest.raises(ValueError):
+        PartitionedResultWriter(str(tmp_path / "parts"), "csv")
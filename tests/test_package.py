@@ -0,0 +1,28 @@
+import os
+import sys
+import pytest
+
+# the repository directory, to import the package itself
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import wwtp_design
+
+
+@pytest.mark.parametrize("name", wwtp_design.__all__)
+def test_modules_are_the_ones_used_internally(name):
+    module = getattr(wwtp_design, name)
+    assert module is sys.modules[name]
+
+
+def test_package_shares_the_caches_and_the_listener():
+    import data
+    import fun
+    assert wwtp_design.data.SNAPSHOTS is data.SNAPSHOTS
+    assert wwtp_design.fun.start_logging is fun.start_logging
+    assert (wwtp_design.cache.default_cache()
+            is wwtp_design.main.default_cache())
+    assert wwtp_design.ActSludge is wwtp_design.act_sludge.ActSludge
+
+
+def test_unknown_names_raise_attribute_error():
+    with pytest.raises(AttributeError):
+        wwtp_design.__unknown__
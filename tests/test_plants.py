@@ -0,0 +1,65 @@
+import os
+import shutil
+import pytest
+import plants
+from plants import *
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    """
+    Directory with two copies of the input file and a broken workbook
+    :return: STR of the directory
+    """
+    directory = tmp_path / "plants"
+    directory.mkdir()
+    for name in ["a.xlsx", "b.xlsx"]:
+        shutil.copy(os.path.join("..", "input_data.xlsx"), directory / name)
+    (directory / "broken.xlsx").write_text("not a workbook")
+    return str(directory)
+
+
+def crash(path, name, outdir, extension=".xlsx"):
+    """
+    Stand-in for design_plant whose worker process dies
+    """
+    os._exit(1)
+
+
+def test_plant_names_number_repeated_names():
+    assert plant_names(["x/a.xlsx", "y/a.xlsx", "b.xlsx"]) == ["a", "a_2",
+                                                                "b"]
+
+
+def test_expand_inputs_skips_lock_files_and_repetitions(inputs):
+    open(os.path.join(inputs, "~$a.xlsx"), "w").close()
+    paths = expand_inputs([inputs, os.path.join(inputs, "a.xlsx")])
+    assert [os.path.basename(path) for path in paths] == ["a.xlsx", "b.xlsx",
+                                                          "broken.xlsx"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_failed_files_do_not_stop_the_batch(inputs, tmp_path, workers):
+    summary = design_plants([inputs], str(tmp_path / "out"),
+                            workers=workers, extension=".jsonl")
+    rows = summary.set_index("Plant")
+    assert list(rows["Status"]) == ["ok", "ok", "failed"]
+    assert rows.loc["broken", "Error"]
+    for plant in ["a", "b"]:
+        assert os.path.isfile(rows.loc[plant, "Output"])
+        assert rows.loc[plant, "act_sludge.V_AT"] > 0
+    assert (rows.loc["a", "act_sludge.V_AT"]
+            == rows.loc["b", "act_sludge.V_AT"])
+
+
+def test_crashed_workers_give_failed_rows(inputs, tmp_path, monkeypatch):
+    monkeypatch.setattr(plants, "design_plant", crash)
+    summary = design_plants([inputs], str(tmp_path / "out"), workers=2)
+    assert list(summary["Plant"]) == ["a", "b", "broken"]
+    assert (summary["Status"] == "failed").all()
+    assert summary["Error"].str.startswith("BrokenProcessPool").all()
+
+
+def test_unknown_format_is_rejected(inputs, tmp_path):
+    with pytest.raises(ValueError):
+        design_plants([inputs], str(tmp_path / "out"), extension=".doc")
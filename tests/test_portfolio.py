@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+from main import *
+from portfolio import *
+
+
+@pytest.fixture
+def workbook(tmp_path, snapshot):
+    """
+    Portfolio with one plant in the layout of the input file and two
+    plants in the row layout on a second sheet
+    :return: STR of the .xlsx file
+    """
+    path = str(tmp_path / "portfolio.xlsx")
+    sheet = pd.DataFrame([["Input Data", None, None],
+                          [None, "Value", "Unit"]]
+                         + [[name, value, ""] for name, value
+                            in snapshot.values.items()])
+    rows = pd.DataFrame([dict(snapshot.values, Plant=name, Tdim=tdim)
+                         for name, tdim in [("cold", 10), ("mild", 11)]])
+    rows["S_NO3_EST"] = [9, 8]
+    with pd.ExcelWriter(path) as excel:
+        sheet.to_excel(excel, sheet_name="North", index=False,
+                       header=False)
+        rows.to_excel(excel, sheet_name="Rows", index=False)
+    return path
+
+
+def test_workbook_is_read_in_both_layouts(workbook, snapshot):
+    table = read_portfolio(workbook)
+    assert list(table.index) == ["North", "cold", "mild"]
+    assert table.index.name == PORTFOLIO_NAME
+    for name in PORTFOLIO_PARAMS:
+        assert table.loc["North", name] == snapshot.values[name]
+    assert list(table["Tdim"]) == [12, 10, 11]
+    # the plant of the input layout keeps the default assumption
+    assert table.loc["North", "S_NO3_EST"] == ACT_SLUDGE_ASSUMPTIONS[
+        "S_NO3_EST"]
+    assert list(table.loc[["cold", "mild"], "S_NO3_EST"]) == [9, 8]
+
+
+def test_csv_plants_are_numbered(tmp_path, snapshot):
+    path = str(tmp_path / "plants.csv")
+    pd.DataFrame([snapshot.values, snapshot.values]).to_csv(path,
+                                                            index=False)
+    assert list(read_portfolio(path).index) == ["plants_1", "plants_2"]
+
+
+def test_invalid_portfolios_are_reported(tmp_path, snapshot):
+    path = str(tmp_path / "plants.csv")
+    values = dict(snapshot.values, Plant="a", Flow=1)
+    del values["Tdim"]
+    pd.DataFrame([values, dict(values, Population="many")]).to_csv(
+        path, index=False)
+    with pytest.raises(ValueError) as error:
+        read_portfolio(path)
+    message = str(error.value)
+    for part in ["missing parameters ['Tdim']", "unknown parameters "
+                 "['Flow']", "repeated plants ['a']", "'Population'"]:
+        assert part in message
+    with pytest.raises(ValueError):
+        read_portfolio(str(tmp_path / "plants.txt"))
+
+
+def test_design_matches_the_input_file(workbook, snapshot):
+    designs = design_portfolio(workbook)
+    assert list(designs.index) == ["North", "cold", "mild"]
+    # the results of design_results are rounded to two decimals
+    results = design_results(snapshot)
+    for stage, param in [("act_sludge", "V_AT"), ("act_sludge", "OU_h"),
+                         ("sec_sed", "h_tot")]:
+        assert designs.loc["North", (stage, param)] == pytest.approx(
+            results[stage]["Results"][param], abs=0.005)
+    assert (designs.loc["cold", ("act_sludge", "V_AT")]
+            > designs.loc["mild", ("act_sludge", "V_AT")])
@@ -0,0 +1,81 @@
+import json
+import pytest
+import main
+from profiler import *
+
+
+# Small recursive call chain with known call counts
+class Chain:
+    def leaf(self):
+        return 1
+
+    def branch(self, depth):
+        if depth:
+            return self.branch(depth - 1) + self.leaf()
+        return self.leaf()
+
+
+def design_results(chain):
+    """
+    Stand-in for the design_results stage of main.py
+    :param chain: Chain object
+    :return: INT result
+    """
+    return chain.branch(2)
+
+
+def test_calls_and_times_are_recorded():
+    namespace = {"design_results": design_results}
+    profiler = Profiler()
+    profiler.instrument(Chain)
+    profiler.instrument(namespace, ["design_results"])
+    leaf = Chain.leaf
+    with profiler:
+        assert Chain.leaf is not leaf
+        assert namespace["design_results"](Chain()) == 3
+    # the original functions are restored
+    assert Chain.leaf is leaf
+    assert namespace["design_results"] is design_results
+    stats = profiler.report()["functions"]
+    assert stats["Chain.branch"]["calls"] == 3
+    assert stats["Chain.leaf"]["calls"] == 3
+    assert stats["design_results"]["calls"] == 1
+    # recursive calls only count once in the cumulative time
+    total = stats["design_results"]["cumulative_s"]
+    assert stats["Chain.branch"]["cumulative_s"] <= total
+    assert sum(value["self_s"] for value in stats.values()) == (
+        pytest.approx(total))
+    stages = profiler.report()["stages"]
+    assert set(stages["design_results"]) == set(stats)
+
+
+def test_reports_are_written(tmp_path):
+    profiler = Profiler()
+    profiler.instrument(Chain)
+    with profiler:
+        Chain().branch(1)
+    prefix = str(tmp_path / "profile")
+    profiler.write_all(prefix)
+    with open(prefix + ".json") as file:
+        assert json.load(file)["functions"]["Chain.leaf"]["calls"] == 2
+    with open(prefix + ".trace.json") as file:
+        assert len(json.load(file)["traceEvents"]) == 4
+    with open(prefix + ".folded") as file:
+        stacks = [line.rsplit(" ", 1)[0] for line in file]
+    assert set(stacks) == {"Chain.branch", "Chain.branch;Chain.branch",
+                           "Chain.branch;Chain.leaf",
+                           "Chain.branch;Chain.branch;Chain.leaf"}
+
+
+def test_design_chain_is_profiled(snapshot):
+    expected = main.act_sludge_df(snapshot)
+    with design_profiler(memory=True) as profiler:
+        results = main.act_sludge_df(snapshot)
+    assert results.equals(expected)
+    report = profiler.report()
+    assert report["memory"]
+    stage = report["stages"]["act_sludge_df"]
+    assert stage["act_sludge_df"]["calls"] == 1
+    assert stage["ActSludge.v_at"]["calls"] >= 1
+    assert stage["SecSed.x_ss_at"]["calls"] >= 1
+    assert stage["act_sludge_df"]["peak_memory_kib"] > 0
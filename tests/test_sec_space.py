@@ -0,0 +1,96 @@
+import pandas as pd
+import pytest
+from main import *
+from sec_space import *
+
+# Design choices of the scalar SecSed
+SCALAR_SPACE = {"SVI": SVI_DIM, "t_TH": T_TH_DIM,
+                "using": "scraper facilities"}
+
+
+def scalar_sec_sed(snapshot, q_comb, rs, qsv):
+    """
+    SecSed of the scalar chain for a combined flow and design choices
+    :param snapshot: ParamSnapshot object with the plant parameters
+    :param q_comb: FLOAT of the combined flow in m³/d
+    :param rs: FLOAT return sludge ratio
+    :param qsv: FLOAT sludge volume loading rate in L/(m²*h)
+    :return: SecSed object
+    """
+    values = dict(snapshot.values, **{"Q comb": q_comb})
+    sec_sed = SecSed(ParamSnapshot(pd.DataFrame(
+        {"Value": pd.Series(values), "Unit": ""})))
+    sec_sed.rs, sec_sed.qsv = rs, qsv
+    return sec_sed
+
+
+def boundary_qsv(rs, depth=None):
+    """
+    Sludge volume loading rate at which q_A reaches 1.6 or, if a depth
+    is given, h_tot reaches it (both are proportional to qsv)
+    :param rs: FLOAT return sludge ratio
+    :param depth: FLOAT total depth in m (None for the q_A limit)
+    :return: FLOAT in L/(m²*h)
+    """
+    sec_sed = scalar_sec_sed(load_snapshot(), 100000, rs, 100)
+    if depth is None:
+        return 1.6 * 100 / sec_sed.q_a()
+    return ((depth - H1_SEC) * 100
+            / (sec_sed.h2() + sec_sed.h3() + sec_sed.h4()))
+
+
+def space_point(q_comb, rs, qsv, tanks):
+    """
+    Design of one point of the design space
+    :param q_comb: FLOAT of the combined flow in m³/d
+    :param rs: FLOAT return sludge ratio
+    :param qsv: FLOAT sludge volume loading rate in L/(m²*h)
+    :param tanks: INT number of circular tanks
+    :return: DICT with the results (empty if the point is infeasible)
+    """
+    results = sec_sed_space(q_comb, rs=rs, qsv=qsv, tanks=tanks,
+                            **SCALAR_SPACE)
+    return {name: value[0] for name, value in results.items()
+            if len(value)}
+
+
+@pytest.mark.parametrize("rs", [0.5, 0.75, 1.0])
+@pytest.mark.parametrize("side", [1 - 1e-6, 1 + 1e-6])
+def test_q_a_boundary(snapshot, rs, side):
+    qsv = boundary_qsv(rs) * side
+    point = space_point(30000, rs, qsv, 3)
+    q_a = scalar_sec_sed(snapshot, 30000, rs, qsv).q_a()
+    if side < 1:
+        assert point["q_A"] == pytest.approx(q_a, rel=1e-12)
+    else:
+        assert isinstance(q_a, str)
+        assert not point
+
+
+@pytest.mark.parametrize("rs", [0.5, 0.75, 1.0])
+@pytest.mark.parametrize("side", [1 - 1e-6, 1 + 1e-6])
+def test_h_tot_boundary(snapshot, rs, side):
+    qsv = boundary_qsv(rs, depth=3) * side
+    point = space_point(30000, rs, qsv, 3)
+    h_tot = scalar_sec_sed(snapshot, 30000, rs, qsv).h_tot()
+    if side > 1:
+        assert point["h_tot"] == pytest.approx(h_tot, rel=1e-12)
+    else:
+        assert isinstance(h_tot, str)
+        assert not point
+
+
+@pytest.mark.parametrize("a_st_tot, tanks", [
+    (SEC_MAX_TANK_AREA - 1, 2), (SEC_MAX_TANK_AREA + 1, 3),
+    (4250 - 1, 3), (4250 + 1, 4)])
+def test_tank_ladder_boundary(snapshot, a_st_tot, tanks):
+    rs, qsv = RS_SEC, QSV_SEC
+    q_a = scalar_sec_sed(snapshot, 30000, rs, qsv).q_a()
+    q_comb = a_st_tot * q_a * 24
+    a_st, quantity = scalar_sec_sed(snapshot, q_comb, rs, qsv).a_st()
+    assert quantity == tanks
+    results = sec_sed_space(q_comb, rs=rs, qsv=qsv, **SCALAR_SPACE)
+    ladder = results["Ladder"]
+    assert list(results["tanks"][ladder]) == [tanks]
+    assert results["A_ST"][ladder][0] == pytest.approx(a_st, rel=1e-12)
+    assert (results["A_ST"] <= SEC_MAX_TANK_AREA).all()
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from service import *
+
+
+def read(data, limit=2 ** 16):
+    """
+    Runs read_request on raw request bytes
+    :param data: BYTES of the request
+    :param limit: INT buffer size of the reader
+    :return: result of read_request
+    """
+    async def run():
+        reader = asyncio.StreamReader(limit=limit)
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await read_request(reader)
+    return asyncio.run(run())
+
+
+def request(length, body=b"{}"):
+    """
+    POST request with a given Content-Length header
+    :param length: STR of the header value
+    :param body: BYTES of the body
+    :return: BYTES of the request
+    """
+    return (f"POST /design HTTP/1.1\r\nContent-Length: {length}\r\n\r\n"
+            .encode() + body)
+
+
+def test_valid_request():
+    method, path, headers, body = read(request("2"))
+    assert (method, path, body) == ("POST", "/design", b"{}")
+    assert read(b"GET /health HTTP/1.1\r\n\r\n")[3] == b""
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "+2", "", " ", "1e3",
+                                    "٣"])
+def test_invalid_content_length(length):
+    with pytest.raises(RequestError) as error:
+        read(request(length))
+    assert error.value.status == 400
+
+
+def test_body_too_large():
+    with pytest.raises(RequestError) as error:
+        read(request(str(SERVICE_MAX_BODY + 1)))
+    assert error.value.status == 413
+
+
+def test_header_too_long():
+    with pytest.raises(RequestError) as error:
+        read(b"GET / HTTP/1.1\r\nX: " + b"a" * 300 + b"\r\n\r\n", limit=100)
+    assert error.value.status == 400
+
+
+def test_malformed_request_gets_a_response(snapshot):
+    async def run():
+        service = DesignService(snapshot)
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request("abc"))
+        response = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+    assert asyncio.run(run()).startswith(b"HTTP/1.1 400 Bad Request")
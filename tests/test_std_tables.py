@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+import std_tables
+from config import *
+
+
+def test_tables_are_read_only():
+    arrays = [value for name, value in vars(std_tables).items()
+              if isinstance(value, np.ndarray) and not name.startswith("_")]
+    assert arrays
+    for array in arrays:
+        assert not array.flags.writeable
+
+
+def test_labels_match_the_enums():
+    for enum, labels in [(PriMethod, PRI_METHOD_LABELS),
+                         (TreatmentTarget, SVI_TARGET_LABELS),
+                         (WwtpType, WWTP_TYPE_LABELS),
+                         (SludgeAgeTarget, SLUDGE_AGE_TARGET_LABELS),
+                         (SludgeAgeColumn, SLUDGE_AGE_COLUMN_LABELS),
+                         (InhParam, INH_PARAM_LABELS),
+                         (Retention, RETENTION_LABELS),
+                         (SizeClass, SIZE_CLASS_LABELS),
+                         (EffluentParam, EFFLUENT_PARAM_LABELS),
+                         (PeakFactor, PEAK_FACTOR_LABELS)]:
+        assert [member.value for member in enum] == list(range(len(labels)))
+
+
+def test_reporting_views_hold_the_arrays():
+    assert np.array_equal(T_SS_DIM.iloc[:, 1:].to_numpy(dtype=float),
+                          T_SS_DIM_VALUES, equal_nan=True)
+    assert np.array_equal(INH_B.to_numpy(dtype=float), INH_B_VALUES)
+    assert np.array_equal(SP_C_BOD.to_numpy(dtype=float), SP_C_BOD_VALUES)
+    assert np.array_equal(CLE_REQ.to_numpy(dtype=float), CLE_REQ_VALUES,
+                          equal_nan=True)
+    assert np.array_equal(FC_FN.to_numpy(dtype=float), FC_FN_VALUES,
+                          equal_nan=True)
+    target = SVI_TARGET_LABELS[TreatmentTarget.NITRIFICATION_DENITRIFICATION]
+    assert SVI.loc[target, "Favourable"] == [100, 150]
+
+
+@pytest.mark.parametrize("value, expected", [
+    # values of the pandas lookups the tables replaced
+    (Q_A_PRI, 3), (DEPTH_PRI, 2.0), (SVI_DIM, 125), (T_TH_DIM, 2.0),
+    (B_SS_INH, 35),
+    (T_SS_DIM_VALUES[SludgeAgeTarget.DENITRIFICATION_VD_VAT_05,
+                     SludgeAgeColumn.T10_UP_TO_1200], 20.0),
+    (SP_C_BOD_VALUES[3, 3], 0.95),
+    (CLE_REQ_VALUES[SizeClass.CLASS_5, EffluentParam.PTOT], 1),
+    (FC_FN_VALUES[PeakFactor.FN_OVER_6000, 3], 1.8)])
+def test_standard_values(value, expected):
+    assert value == expected
+
+
+def test_phosphorus_requirement_by_size_class():
+    assert np.isnan(C_P_ER[:SizeClass.CLASS_4]).all()
+    assert C_P_ER[SizeClass.CLASS_4:].tolist() == [2, 1]
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+from main import *
+from sweep import *
+
+# Grid of 3 x 4 x 2 points with feasible and infeasible designs
+GRID = {"Tdim": [10, 11, 12], "Population": [20000, 60000, 150000, 250000],
+        "rs": {"start": 0.5, "stop": 1.0, "num": 2}}
+
+
+@pytest.fixture(scope="module")
+def single(snapshot):
+    """
+    Sweep of GRID evaluated as a single chunk in the calling process
+    :return: DATAFRAME returned by sweep
+    """
+    return sweep(GRID, snapshot, workers=1, chunk_size=1000)
+
+
+def test_grid_chunks_follow_the_grid():
+    chunks = list(grid_chunks(GRID, chunk_size=5))
+    assert [len(chunk) for chunk in chunks] == [5, 5, 5, 5, 4]
+    pd.testing.assert_frame_equal(pd.concat(chunks), expand_grid(GRID))
+    assert list(grid_values({"start": 1, "stop": 2, "step": 0.5})) == [1,
+                                                                        1.5]
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(1, 5), (2, 5), (2, 1)])
+def test_chunked_sweeps_equal_a_single_chunk(snapshot, single, workers,
+                                             chunk_size):
+    chunked = sweep(GRID, snapshot, workers=workers, chunk_size=chunk_size)
+    pd.testing.assert_frame_equal(chunked, single)
+
+
+def test_points_equal_the_scalar_design(snapshot):
+    # the results of design_results are rounded to two decimals
+    results = design_results(snapshot)
+    row = sweep({"Tdim": [12]}, snapshot, workers=1).iloc[0]
+    for stage, param in [("pri_sed", "Vmin"), ("sec_sed", "h_tot"),
+                         ("act_sludge", "V_AT"), ("act_sludge", "OU_h")]:
+        assert row[(stage, param)] == pytest.approx(
+            results[stage]["Results"][param], abs=0.005)
+
+
+def test_prefilter_keeps_the_feasible_results(snapshot, single):
+    filtered = sweep(GRID, snapshot, workers=1, chunk_size=5,
+                     prefilter=True)
+    codes = filtered[("check", "Infeasible")]
+    feasible = feasible_mask(codes.to_numpy())
+    assert 0 < feasible.sum() < len(filtered)
+    kept = filtered[feasible].drop(columns="check", level=0)
+    pd.testing.assert_frame_equal(kept, single[feasible])
+    assert filtered.loc[~feasible, ("act_sludge", "V_AT")].isna().all()
+
+
+def test_unknown_parameters_are_rejected(snapshot):
+    with pytest.raises(KeyError):
+        sweep({"Temperature": [10]}, snapshot)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_partitions_round_trip(snapshot, single, tmp_path, workers):
+    path = str(tmp_path / "sweep")
+    # a ceiling of a few grid points per chunk
+    limit = 4 * (len(GRID) + SWEEP_RESULT_COLUMNS + 1) * SWEEP_BYTES_PER_VALUE
+    summary = sweep_to_disk(GRID, path, snapshot, workers=workers,
+                            memory_limit=limit * (3 * workers + 1) // 2)
+    assert summary["points"] == len(single)
+    assert summary["partitions"] == -(-len(single)
+                                      // summary["chunk_size"]) > 1
+    with open(os.path.join(path, "columns.json")) as file:
+        columns = json.load(file)
+    parts = list(read_partitions(path))
+    assert len(parts) == summary["partitions"]
+    df = pd.concat(parts, ignore_index=True).set_index("index")
+    assert list(df.columns) == columns[1:]
+    expected = single.copy()
+    expected.columns = [".".join(column) for column in expected.columns]
+    pd.testing.assert_frame_equal(df, expected, check_names=False,
+                                  check_index_type=False)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from timeseries import *
+
+
+def stream(stats, values, chunk_size):
+    """
+    Feeds a column of values to a StreamStats object chunk by chunk
+    :param stats: StreamStats object with the result "x"
+    :param values: FLOAT array
+    :param chunk_size: INT number of values per chunk
+    :return: DATAFRAME returned by StreamStats.summary
+    """
+    for start in range(0, values.size, chunk_size):
+        stats.update(pd.DataFrame({"x": values[start:start + chunk_size]},
+                                  index=np.arange(start, min(
+                                      start + chunk_size, values.size))))
+    return stats.summary([50, 95])
+
+
+def test_nan_steps_are_left_out():
+    rng = np.random.default_rng(0)
+    values = rng.normal(10, 2, 5000)
+    values[rng.random(values.size) < 0.3] = np.nan
+    values[42] = 99
+    summary = stream(StreamStats(["x"]), values, 700).loc["x"]
+    assert summary["Count"] == np.isfinite(values).sum()
+    assert summary["Mean"] == pytest.approx(np.nanmean(values))
+    assert (summary["Peak"], summary["Peak at"]) == (99, 42)
+    assert summary["P50"] == pytest.approx(np.nanpercentile(values, 50))
+    assert summary["P95"] == pytest.approx(np.nanpercentile(values, 95))
+
+
+def test_reservoir_only_samples_finite_values():
+    rng = np.random.default_rng(1)
+    values = rng.normal(0, 1, 20000)
+    values[::2] = np.nan
+    stats = StreamStats(["x"], reservoir_size=1000)
+    stream(stats, values, 3000)
+    assert stats.reservoir["x"].size == 1000
+    assert np.isfinite(stats.reservoir["x"]).all()
+
+
+def test_all_nan_result():
+    summary = stream(StreamStats(["x"]), np.full(10, np.nan), 4)
+    assert summary.loc["x", "Count"] == 0
+    assert np.isnan(summary.loc["x", ["Mean", "Peak", "P50"]]).all()
+    assert summary.attrs["Time steps"] == 10
@@ -1,10 +1,31 @@
 import sys
 import os
+from importlib import import_module
 
 
 sys.path.append(os.path.dirname(__file__))
 __all__ = [
-    "act_sludge", "config", "data", "fun", "main", "pri_sed", "sec_sed"
+    "act_sludge", "batch", "cache", "cli", "config", "data", "envelope",
+    "feasibility", "fun", "goal_seek", "graph", "incremental", "interp",
+    "main", "monte_carlo", "optimize", "output", "plants", "portfolio",
+    "pri_sed", "profiler", "sec_sed", "sec_space", "service", "sweep",
+    "std_tables", "timeseries"
 ]
 
-from .main import *
+
+def __getattr__(name):
+    """
+    Imports the modules and the names of main.py on first use (PEP 562),
+    so that importing the package does not load pandas. The numpy-only
+    core (std_tables, interp and batch) stays light. The modules are the
+    top-level ones the package imports internally (see sys.path), so
+    there is only one copy of each (one snapshot cache, one results
+    cache and one log listener)
+    :param name: STRING of a module of __all__ or a name of main.py
+    :return: the module or the object of main.py
+    """
+    if name in __all__:
+        return sys.modules.get(name) or import_module(name)
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(sys.modules.get("main") or import_module("main"), name)
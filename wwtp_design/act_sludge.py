@@ -1,39 +1,50 @@
+from interp import *
 from sec_sed import *
 
 
 # Author: Luis Granda
 class ActSludge(InputReader):
-    def __init__(self):
+    # effluent assumptions tracked as inputs of the design nodes
+    S_orgN_EST = DesignInput()
+    S_NH4_EST = DesignInput()
+    S_NO3_EST = DesignInput()
+
+    def __init__(self, snapshot=None):
         """
         For initializing an ActSludge object with the given
         attributes and methods
+        :param snapshot: ParamSnapshot object with the plant parameters
+        (if None, the input file is loaded)
         :return: None
         """
-        InputReader.__init__(self)
+        InputReader.__init__(self, snapshot=snapshot)
         # frequently used parameter
         self.S_orgN_EST = 2  # assumption due to experience
         self.S_NH4_EST = 0  # from 0 to 1
         # from 9 to 10 according to European Union Laws
         self.S_NO3_EST = 9
 
+    @design_node
     def c_n_iat(self):
         """
         Calculation of the total nitrogen concentration from the
         influent to the activated sludge tank
         :return: FLOAT result in mg/L
         """
-        return (self.wwtp_params["Value"]["B d,Ntot"]
-                / self.wwtp_params["Value"]["Q d,aM"]) * (10 ** 6 / 1000)
+        return (self.param("B d,Ntot")
+                / self.param("Q d,aM")) * (10 ** 6 / 1000)
 
+    @design_node
     def c_bod5_iat(self):
         """
         Calculation of the BOD5 concentration from the
         influent to the activated sludge tank
         :return: FLOAT result in mg/L
         """
-        return (self.wwtp_params["Value"]["B d,BOD5"]
-                / self.wwtp_params["Value"]["Q d,aM"]) * (10 ** 6 / 1000)
+        return (self.param("B d,BOD5")
+                / self.param("Q d,aM")) * (10 ** 6 / 1000)
 
+    @design_node
     def x_orgn_bm(self):
         """
         Calculation of the concentration of organic nitrogen
@@ -42,6 +53,7 @@ class ActSludge(InputReader):
         """
         return 0.05 * self.c_bod5_iat()
 
+    @design_node
     def n_bal(self):
         """
         Calculation of the nitrogen balance
@@ -58,6 +70,7 @@ class ActSludge(InputReader):
             return ("Check assumptions or choose low values"
                     " for C_NH4_E_SST or C_NO3_E_SST")
 
+    @design_node
     def den_ratio(self):
         """
         Calculates the ratio of nitrate nitrogen concentration to BOD5
@@ -67,6 +80,7 @@ class ActSludge(InputReader):
         """
         return self.n_bal()[1] / self.c_bod5_iat()
 
+    @design_node
     def inter_vd_vat(self):
         """
         Interpolates the corresponding value of "Vd/Vat" for a given
@@ -74,26 +88,24 @@ class ActSludge(InputReader):
         denitrification and comparable processes" column
         :return: dimensionless FLOAT result
         """
-        return np.interp(self.den_ratio(),
-                         S_NO3_D_C_BOD_IAT["Pre-anoxic zone "
-                                           "denitrification and "
-                                           "comparable processes"],
-                         S_NO3_D_C_BOD_IAT.index)
+        return VD_VAT_INTERP(self.den_ratio())[()]
 
+    @design_node
     def s_f(self):
         """
         Calculation of the safety factor
         :return: dimensionless FLOAT result
         """
-        if (self.wwtp_params["Value"]["B d,BOD5"] <= 1200 or
-                self.wwtp_params["Value"]["Population"] <= 20000):
+        if (self.param("B d,BOD5") <= 1200 or
+                self.param("Population") <= 20000):
             return 1.8
-        elif (self.wwtp_params["Value"]["B d,BOD5"] >= 6000 or
-              self.wwtp_params["Value"]["Population"] >= 100000):
+        elif (self.param("B d,BOD5") >= 6000 or
+              self.param("Population") >= 100000):
             return 1.45
         else:
             return "Approximate B d,BOD5 and Population to the closest value"
 
+    @design_node
     def t_ss_aerob_dim(self):
         """
         Calculation of the (aerobic) dimensioning sludge age to be
@@ -101,8 +113,9 @@ class ActSludge(InputReader):
         :return: FLOAT result in days
         """
         return (self.s_f() * 3.4
-                * 1.103 ** (15 - self.wwtp_params["Value"]["Tdim"]))
+                * 1.103 ** (15 - self.param("Tdim")))
 
+    @design_node
     def t_ss_dim(self):
         """
         Calculation of the dimensioning sludge age for nitrification
@@ -111,6 +124,7 @@ class ActSludge(InputReader):
         """
         return self.t_ss_aerob_dim() * (1 / (1 - (self.inter_vd_vat())))
 
+    @design_node
     def inter_t_ss_dim(self):
         """
         Another way to calculate the dimensioning sludge age by
@@ -119,32 +133,22 @@ class ActSludge(InputReader):
         column of "Tdim"
         :return: FLOAT result in days
         """
-        if not 10.0 <= self.wwtp_params["Value"]["Tdim"] <= 12.0:
+        if not 10.0 <= self.param("Tdim") <= 12.0:
             return "Temperatures outside the 10 to 12°C range"
 
-        start_weight, end_weight =\
-            calc_weights(10, 12, self.wwtp_params["Value"]["Tdim"])
-
-        if (self.wwtp_params["Value"]["B d,BOD5"] <= 1200 or
-                self.wwtp_params["Value"]["Population"] <= 20000):
-            root_key = f"up to 1200 kg/d"
-            column_key =\
-                f"{self.wwtp_params['Value']['Tdim']} °C - up to 1200 kg/d"
-        elif (self.wwtp_params["Value"]["B d,BOD5"] >= 6000 or
-              self.wwtp_params["Value"]["Population"] >= 100000):
-            root_key = f"over 6000 kg/d"
-            column_key =\
-                f"{self.wwtp_params['Value']['Tdim']} °C - over 6000 kg/d"
+        if (self.param("B d,BOD5") <= 1200 or
+                self.param("Population") <= 20000):
+            size_band = SizeBand.UP_TO_1200
+        elif (self.param("B d,BOD5") >= 6000 or
+              self.param("Population") >= 100000):
+            size_band = SizeBand.OVER_6000
         else:
             return "Approximate B d,BOD5 and Population to the closest ranges"
 
-        T_SS_DIM[column_key] = (
-                T_SS_DIM[f"10 °C - {root_key}"] * start_weight
-                + T_SS_DIM[f"12 °C - {root_key}"] * end_weight
-        )
-        return np.interp(self.inter_vd_vat(), T_SS_DIM["Vd/Vat"],
-                         T_SS_DIM[column_key])
+        return T_SS_DIM_INTERP(self.param("Tdim"),
+                               self.inter_vd_vat())[size_band]
 
+    @design_node
     def b_d_ss_iat(self):
         """
         Calculation of the daily suspended solids load from the
@@ -152,18 +156,20 @@ class ActSludge(InputReader):
         :return: FLOAT result in kg/d
         :return:
         """
-        return (INH_B["0.5 to 1.0 h of retention time"]["SS"]
-                * self.wwtp_params["Value"]["Population"] / 1000)
+        return (B_SS_INH
+                * self.param("Population") / 1000)
 
+    @design_node
     def x_ss_iat(self):
         """
         Calculation of the suspended solids concentration from the
         influent to the activated sludge tank
         :return: FLOAT result in mg/L
         """
-        return ((self.b_d_ss_iat() / self.wwtp_params["Value"]["Q d,aM"])
+        return ((self.b_d_ss_iat() / self.param("Q d,aM"))
                 * (10 ** 6 / 1000))
 
+    @design_node
     def ss_bod5_ratio(self):
         """
         Calculates the ratio of suspended solids input concentration
@@ -172,23 +178,26 @@ class ActSludge(InputReader):
         """
         return self.x_ss_iat() / self.c_bod5_iat()
 
+    @design_node
     def f_t(self):
         """
         Calculation of the temperature factor for endogenous respiration
         :return: dimensionless FLOAT result
         """
-        return 1.072 ** (self.wwtp_params["Value"]["Tdim"] - 15)
+        return 1.072 ** (self.param("Tdim") - 15)
 
+    @design_node
     def sp_d_c(self):
         """
         Calculation of the sludge production from carbon removal
         :return: FLOAT result in kg/d
         """
-        return (self.wwtp_params["Value"]["B d,BOD5"]
+        return (self.param("B d,BOD5")
                 * (0.75 + 0.6 * self.ss_bod5_ratio()
                    - (((1 - 0.2) * 0.17 * 0.75 * self.t_ss_dim() * self.f_t())
                       / (1 + 0.17 * self.t_ss_dim() * self.f_t()))))
 
+    @design_node
     def inter_sp_c_bod(self):
         """
         Calculation of the specific sludge production by interpolating
@@ -197,18 +206,12 @@ class ActSludge(InputReader):
         age "self.t_ss_dim()"
         :return: FLOAT result in kgSS/kgBOD5
         """
-        t_ss_ranges = [(4, 8), (8, 10), (10, 15), (15, 20), (20, 25)]
-        for start, end in t_ss_ranges:
-            if start <= self.t_ss_dim() <= end:
-                start_weight, end_weight = calc_weights(start, end,
-                                                        self.t_ss_dim())
-                SP_C_BOD[self.t_ss_dim()] = (SP_C_BOD[start] * start_weight
-                                             + SP_C_BOD[end] * end_weight)
-                return np.interp(self.ss_bod5_ratio(),
-                                 SP_C_BOD.index,
-                                 SP_C_BOD[self.t_ss_dim()])
-        return "Sludge age out of range"
+        sp_c_bod = SP_C_BOD_INTERP(self.ss_bod5_ratio(), self.t_ss_dim())
+        if np.isnan(sp_c_bod):
+            return "Sludge age out of range"
+        return sp_c_bod[()]
 
+    @design_node
     def inter_sp_d_c(self):
         """
         Another way to calculate the sludge production from carbon
@@ -216,34 +219,37 @@ class ActSludge(InputReader):
         influent BOD5 load to the activated sludge tank.
         :return: FLOAT result in kgSS/d
         """
-        return self.inter_sp_c_bod() * self.wwtp_params["Value"]["B d,BOD5"]
+        return self.inter_sp_c_bod() * self.param("B d,BOD5")
 
+    @design_node
     def c_p_iat(self):
         """
         Calculation of the total phosphorus concentration from the
         influent to the activated sludge tank
         :return: FLOAT result in mg/L
         """
-        return (self.wwtp_params["Value"]["B d,Ptot"]
-                / self.wwtp_params["Value"]["Q d,aM"]) * (10 ** 6 / 1000)
+        return (self.param("B d,Ptot")
+                / self.param("Q d,aM")) * (10 ** 6 / 1000)
 
+    @design_node
     def c_p_er(self):
         """
         Searches for effluent requirement for phosphorus according
         to respective size class
         :return: FLOAT result in mg/L
         """
-        if self.wwtp_params["Value"]["B d,BOD5"] < 60:
-            return CLE_REQ["Ptot"]["1 (< 60 kgBOD5/d in raw water)"]
-        elif 60 <= self.wwtp_params["Value"]["B d,BOD5"] <= 300:
-            return CLE_REQ["Ptot"]["2 (60 - 300 kgBOD5/d in raw water)"]
-        elif 300 < self.wwtp_params["Value"]["B d,BOD5"] <= 600:
-            return CLE_REQ["Ptot"]["3 (300 - 600 kgBOD5/d in raw water)"]
-        elif 600 < self.wwtp_params["Value"]["B d,BOD5"] <= 6000:
-            return CLE_REQ["Ptot"]["4 (600 - 6000 kgBOD5/d in raw water)"]
+        if self.param("B d,BOD5") < 60:
+            return C_P_ER[SizeClass.CLASS_1]
+        elif 60 <= self.param("B d,BOD5") <= 300:
+            return C_P_ER[SizeClass.CLASS_2]
+        elif 300 < self.param("B d,BOD5") <= 600:
+            return C_P_ER[SizeClass.CLASS_3]
+        elif 600 < self.param("B d,BOD5") <= 6000:
+            return C_P_ER[SizeClass.CLASS_4]
         else:
-            return CLE_REQ["Ptot"]["5 (> 6000 kgBOD5/d in raw water"]
+            return C_P_ER[SizeClass.CLASS_5]
 
+    @design_node
     def c_p_est(self):
         """
         Calculation of the total phosphorus concentration from the
@@ -253,6 +259,7 @@ class ActSludge(InputReader):
         # (0.6 - 0.7), choose the highest to have a better safety factor
         return 0.7 * self.c_p_er()
 
+    @design_node
     def x_p_bm(self):
         """
         Calculation of the phosphorus necessary for the build-up
@@ -262,6 +269,7 @@ class ActSludge(InputReader):
         # 1 % in AST but 0.5 % in Trickling Filter
         return 0.01 * self.c_bod5_iat()
 
+    @design_node
     def x_p_biop(self, anaerobic_tanks=False, inter_rec_sludge=False):
         """
         Calculation of the excess biological phosphorus removal
@@ -285,6 +293,7 @@ class ActSludge(InputReader):
         else:
             return "Check default keyword arguments"
 
+    @design_node
     def x_p_prec(self, x_p_biop=False):
         """
         Calculation of the phosphorous balance or determination of the
@@ -299,6 +308,7 @@ class ActSludge(InputReader):
         else:
             return self.c_p_iat() - self.c_p_est() - self.x_p_bm()
 
+    @design_node
     def sp_d_p(self, precipitant="Fe", x_p_biop=False):
         """
         Calculation of the sludge production from the phosphorus removal
@@ -309,21 +319,22 @@ class ActSludge(InputReader):
         """
         # Fe is the cheapest precipitant
         if precipitant == "Fe" and x_p_biop is True:
-            return (self.wwtp_params["Value"]["Q d,aM"]
+            return (self.param("Q d,aM")
                     * (3 * self.x_p_biop() + 6.8 * self.x_p_prec())) / 1000
         # Fe is the cheapest precipitant
         elif precipitant == "Fe" and x_p_biop is False:
-            return (self.wwtp_params["Value"]["Q d,aM"]
+            return (self.param("Q d,aM")
                     * 6.8 * self.x_p_prec()) / 1000
         elif precipitant == "Al" and x_p_biop is True:
-            return (self.wwtp_params["Value"]["Q d,aM"]
+            return (self.param("Q d,aM")
                     * (3 * self.x_p_biop() + 5.3 * self.x_p_prec())) / 1000
         elif precipitant == "Al" and x_p_biop is False:
-            return (self.wwtp_params["Value"]["Q d,aM"]
+            return (self.param("Q d,aM")
                     * 5.3 * self.x_p_prec()) / 1000
         else:
             return "Check default keyword arguments"
 
+    @design_node
     def sp_d(self):
         """
         Determination of sludge production in an activated sludge plant
@@ -331,6 +342,7 @@ class ActSludge(InputReader):
         """
         return self.sp_d_c() + self.sp_d_p()
 
+    @design_node
     def m_ss_at(self):
         """
         Calculation of the required mass of suspended solids
@@ -339,13 +351,15 @@ class ActSludge(InputReader):
         """
         return self.t_ss_dim() * self.sp_d()
 
+    @design_node
     def v_at(self):
         """
         Calculation of the volume of the activated sludge tank
         :return: FLOAT result in m³
         """
-        return self.m_ss_at() / SecSed().x_ss_at()
+        return self.m_ss_at() / SecSed(self.snapshot).x_ss_at()
 
+    @design_node
     def v_d(self):
         """
         Calculation of the volume of the activated sludge tank used
@@ -354,6 +368,7 @@ class ActSludge(InputReader):
         """
         return self.inter_vd_vat() * self.v_at()
 
+    @design_node
     def v_n(self):
         """
         Calculation of the volume of the activated sludge tank used
@@ -362,6 +377,7 @@ class ActSludge(InputReader):
         """
         return (1 - self.inter_vd_vat()) * self.v_at()
 
+    @design_node
     def rc(self):
         """
         Calculation of the necessary total recirculation flow ratio (RC)
@@ -370,6 +386,7 @@ class ActSludge(InputReader):
         """
         return (self.n_bal()[0] / self.S_NO3_EST) - 1
 
+    @design_node
     def n_d(self):
         """
         Calculation of maximum possible efficiency of denitrification
@@ -382,67 +399,67 @@ class ActSludge(InputReader):
                     " the European Union is not met. Modify S_NH4_N or "
                     "S_NO3_EST in the nitrogen balance")
 
+    @design_node
     def ou_d_c(self):
         """
         Calculation of oxygen uptake for carbon removal
         :return: FLOAT result in kgO2/d
         """
-        return (self.wwtp_params["Value"]["B d,BOD5"] *
+        return (self.param("B d,BOD5") *
                 (0.56 + ((0.15 * self.t_ss_dim() * self.f_t()) /
                          (1 + 0.17 * self.t_ss_dim() * self.f_t()))))
 
+    @design_node
     def s_no3_iat(self):
         """
         Calculation of the nitrate nitrogen concentration from the
         influent to the activated sludge tank
         :return: FLOAT result in mg/L
         """
-        return (self.wwtp_params["Value"]["B d,NO3-N"]
-                / self.wwtp_params["Value"]["Q d,aM"]) * (10 ** 6 / 1000)
+        return (self.param("B d,NO3-N")
+                / self.param("Q d,aM")) * (10 ** 6 / 1000)
 
+    @design_node
     def ou_d_n(self):
         """
         Calculation of oxygen uptake for nitrification
         :return: FLOAT result in kgO2/d
         """
-        return (self.wwtp_params["Value"]["Q d,aM"] * 4.3 *
+        return (self.param("Q d,aM") * 4.3 *
                 (self.n_bal()[1] - self.s_no3_iat() + self.S_NO3_EST) / 1000)
 
+    @design_node
     def ou_d_d(self):
         """
         Calculation of oxygen uptake for denitrification
         :return: FLOAT result in kgO2/d
         """
-        return (self.wwtp_params["Value"]["Q d,aM"]
+        return (self.param("Q d,aM")
                 * 2.9 * self.n_bal()[1] / 1000)
 
+    @design_node
     def inter_fc_fn(self):
         """
         Determining the peak factors for the oxygen uptake rate by
-        calculating a new column in the DF for a given target value of
-        (self.t_ss_dim) and extracting the respective fc and fn
+        interpolating the precompiled FC_FN table for a given target
+        value of (self.t_ss_dim) and extracting the respective fc and fn
         :return: TUPLE with dimensionless FLOATS results
         """
-        t_ss_ranges = [(4, 6), (6, 8), (8, 10), (10, 15), (15, 25)]
-        if (self.wwtp_params["Value"]["B d,BOD5"] <= 1200 or
-                self.wwtp_params["Value"]["Population"] <= 20000):
-            root_key = f"for <= 1200 kgBOD5/d"
-        elif (self.wwtp_params["Value"]["B d,BOD5"] >= 6000 or
-              self.wwtp_params["Value"]["Population"] >= 100000):
-            root_key = f"for >= 6000 kgBOD5/d"
+        if (self.param("B d,BOD5") <= 1200 or
+                self.param("Population") <= 20000):
+            fn_row = PeakFactor.FN_UP_TO_1200
+        elif (self.param("B d,BOD5") >= 6000 or
+              self.param("Population") >= 100000):
+            fn_row = PeakFactor.FN_OVER_6000
         else:
             return "Approximate B d,BOD5 and Population to the closest ranges"
 
-        for start, end in t_ss_ranges:
-            if start <= self.t_ss_dim() <= end:
-                start_weight, end_weight = calc_weights(start, end,
-                                                        self.t_ss_dim())
-                FC_FN[self.t_ss_dim()] = (FC_FN[start] * start_weight +
-                                          FC_FN[end] * end_weight)
-                return (FC_FN[self.t_ss_dim()]["fc"],
-                        FC_FN[self.t_ss_dim()][f"fn {root_key}"])
-        return "Sludge age out of range"
+        peak_factors = FC_FN_INTERP(self.t_ss_dim())
+        if np.isnan(peak_factors[PeakFactor.FC]):
+            return "Sludge age out of range"
+        return peak_factors[PeakFactor.FC], peak_factors[fn_row]
 
+    @design_node
     def ou_h(self):
         """
         Calculation of the oxygen uptake rate for the daily peak
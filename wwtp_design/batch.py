@@ -0,0 +1,343 @@
+import math as m
+from interp import *
+
+# Width range and width step of the rectangular tanks in m
+PRI_WIDTH_MIN = 1
+PRI_WIDTH_MAX = 10
+PRI_WIDTH_STEP = 0.5
+# Recommended range of the width to length ratio
+PRI_RATIO_MIN = 0.1
+PRI_RATIO_MAX = 0.2
+
+
+def pri_ratio(area, width):
+    """
+    Calculation of the width to length ratio of a rectangular tank
+    :param area: FLOAT or ARRAY of the tank surface in m²
+    :param width: FLOAT or ARRAY of the tank width in m
+    :return: dimensionless FLOAT or ARRAY
+    """
+    return width / (area / width)
+
+
+def pri_layout(surf, num_tanks=2, width=PRI_WIDTH_MIN):
+    """
+    Direct solver of the rectangular tank layout: finds the smallest
+    number of tanks and then the smallest width on the width grid
+    (PRI_WIDTH_STEP steps up to PRI_WIDTH_MAX) with a width to length
+    ratio between PRI_RATIO_MIN and PRI_RATIO_MAX
+    :param surf: FLOAT or ARRAY of total tank surfaces in m²
+    :param num_tanks: INT or ARRAY with the smallest number of tanks
+    :param width: FLOAT or ARRAY with the starting width in m for
+    num_tanks (further tank counts start at PRI_WIDTH_MIN)
+    :return: TUPLE with ARRAYS of the area per tank in m², the number
+    of tanks, the length and the width in m (NaN if no layout fits)
+    """
+    surf, n, width = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(surf, dtype=float)),
+        np.asarray(num_tanks, dtype=float), np.asarray(width, dtype=float))
+    # the ratio can only be reached with PRI_WIDTH_MAX if each tank is
+    # at most PRI_WIDTH_MAX² / PRI_RATIO_MIN m² large
+    n_min = np.ceil(surf * PRI_RATIO_MIN / PRI_WIDTH_MAX ** 2)
+    w_start = np.where(n_min > n, PRI_WIDTH_MIN, width)
+    n = np.maximum(n, n_min)
+    layout = np.full((4,) + surf.shape, np.nan)
+    todo = np.ones(surf.shape, dtype=bool)
+    while todo.any():
+        area = surf / n
+        # smallest width on the grid reaching PRI_RATIO_MIN
+        steps = np.ceil((np.sqrt(PRI_RATIO_MIN * area) - w_start)
+                        / PRI_WIDTH_STEP)
+        w = w_start + np.maximum(steps, 0) * PRI_WIDTH_STEP
+        w_lower = w - PRI_WIDTH_STEP
+        w = np.where((w_lower >= w_start)
+                     & (pri_ratio(area, w_lower) >= PRI_RATIO_MIN),
+                     w_lower, w)
+        w = np.where(pri_ratio(area, w) < PRI_RATIO_MIN,
+                     w + PRI_WIDTH_STEP, w)
+        found = (todo & (w <= PRI_WIDTH_MAX)
+                 & (pri_ratio(area, w) <= PRI_RATIO_MAX))
+        layout[:, found] = [area[found], n[found], area[found] / w[found],
+                            w[found]]
+        # below this area even PRI_WIDTH_MIN exceeds PRI_RATIO_MAX
+        # for any larger number of tanks
+        todo &= ~found & (area >= PRI_WIDTH_MIN ** 2 / PRI_RATIO_MAX)
+        n = n + 1
+        w_start = np.full(surf.shape, float(PRI_WIDTH_MIN))
+    return tuple(layout)
+
+
+# Plant parameters read by the activated sludge tank dimensioning
+ACT_SLUDGE_INPUTS = ["Q d,aM", "B d,BOD5", "B d,Ntot", "B d,NO3-N",
+                     "B d,Ptot", "Tdim", "Population"]
+# Effluent assumptions with the same default values as in ActSludge
+ACT_SLUDGE_ASSUMPTIONS = {"S_orgN_EST": 2, "S_NH4_EST": 0, "S_NO3_EST": 9}
+# Secondary sedimentation parameters with the same default values as
+# in SecSed and fun.x_ss_bs
+SEC_SED_DEFAULTS = {"rs": RS_SEC, "qsv": QSV_SEC, "SVI": SVI_DIM,
+                    "t_TH": T_TH_DIM}
+# Results of the primary sedimentation as in main.pri_sed_df
+PRI_SED_RESULTS = ["Tank_surf", "Depth", "Area_per_tank", "Quantity",
+                   "Length", "Width", "Vmin"]
+
+
+def scenario_arrays(scenarios, names, defaults=None):
+    """
+    Extracts the given parameters of a batch of scenarios as broadcast
+    one-dimensional FLOAT arrays
+    :param scenarios: DICT-like (e.g. DATAFRAME with one row per
+    scenario) mapping parameter names to scalars or arrays
+    :param names: LIST of STR with the parameter names to extract
+    :param defaults: DICT with values of parameters that may be missing
+    :return: LIST of one-dimensional FLOAT arrays of equal length
+    """
+    defaults = defaults or {}
+    arrays = []
+    for name in names:
+        if name in scenarios:
+            arrays.append(np.asarray(scenarios[name], dtype=float))
+        elif name in defaults:
+            arrays.append(np.asarray(defaults[name], dtype=float))
+        else:
+            raise KeyError(f"Missing scenario parameter: {name}")
+    return [np.atleast_1d(a) for a in np.broadcast_arrays(*arrays)]
+
+
+def masked_interp(interpolator, *targets):
+    """
+    Interpolation of masked arrays with a TableInterpolator, masking
+    the masked targets as well as the NaN results
+    :param interpolator: TableInterpolator object
+    :param targets: MASKED ARRAYS with one target per table axis
+    :return: MASKED ARRAY with the interpolated values
+    """
+    mask = np.zeros(np.shape(targets[0]), dtype=bool)
+    for target in targets:
+        mask = mask | np.ma.getmaskarray(target)
+    values = interpolator(*(np.ma.getdata(t) for t in targets))
+    return np.ma.masked_where(np.isnan(values) | mask, values)
+
+
+def batch_size_class(b_d_bod5, population):
+    """
+    Determination of the plant size band used for the safety factor
+    and for the peak factors of the oxygen uptake rate
+    :param b_d_bod5: FLOAT ARRAY of daily BOD5 loads in kg/d
+    :param population: FLOAT ARRAY of population equivalents
+    :return: TUPLE with BOOLEAN ARRAYS for small plants (<= 1200
+    kgBOD5/d) and large plants (>= 6000 kgBOD5/d)
+    """
+    small = (b_d_bod5 <= 1200) | (population <= 20000)
+    large = ~small & ((b_d_bod5 >= 6000) | (population >= 100000))
+    return small, large
+
+
+def batch_c_p_er(b_d_bod5):
+    """
+    Searches for the effluent requirement for phosphorus according to
+    the size class of each scenario
+    :param b_d_bod5: FLOAT ARRAY of daily BOD5 loads in kg/d
+    :return: MASKED ARRAY in mg/L (masked if there is no requirement)
+    """
+    conditions = [b_d_bod5 < 60, b_d_bod5 <= 300, b_d_bod5 <= 600,
+                  b_d_bod5 <= 6000]
+    c_p_er = np.select(conditions, C_P_ER[:SizeClass.CLASS_5],
+                       default=C_P_ER[SizeClass.CLASS_5])
+    return np.ma.masked_invalid(c_p_er)
+
+
+def batch_fc_fn(t_ss_dim, small, large):
+    """
+    Determining the peak factors for the oxygen uptake rate from the
+    precompiled FC_FN table
+    :param t_ss_dim: MASKED ARRAY of dimensioning sludge ages in days
+    :param small: BOOLEAN ARRAY for plants <= 1200 kgBOD5/d
+    :param large: BOOLEAN ARRAY for plants >= 6000 kgBOD5/d
+    :return: TUPLE with dimensionless MASKED ARRAYS of fc and fn
+    (masked outside the sludge age range or without a size band)
+    """
+    fc, fn_small, fn_large = masked_interp(FC_FN_INTERP, t_ss_dim)
+    fn = np.ma.where(small, fn_small, fn_large)
+    fn[~(small | large)] = np.ma.masked
+    return fc, fn
+
+
+def act_sludge_batch(scenarios, **assumptions):
+    """
+    Vectorized dimensioning of the activated sludge tank for a batch of
+    scenarios in one pass. Infeasible values, which ActSludge reports
+    as strings, are masked
+    :param scenarios: DICT-like (e.g. DATAFRAME with one row per
+    scenario) with the ACT_SLUDGE_INPUTS as scalars or arrays. The
+    effluent assumptions and "X_SS_AT" can be given as well
+    :param assumptions: FLOATS overriding the ACT_SLUDGE_ASSUMPTIONS
+    for scenarios that do not include them
+    :return: DICT with the act_sludge_df parameters as keys and
+    MASKED ARRAYS as values
+    """
+    defaults = dict(ACT_SLUDGE_ASSUMPTIONS, X_SS_AT=batch_x_ss(
+        RS_SEC, SVI_DIM, T_TH_DIM)[2])
+    defaults.update(assumptions)
+    (q_d, b_bod5, b_ntot, b_no3, b_ptot, t_dim, population, s_orgn_est,
+     s_nh4_est, s_no3_est, x_ss_at) = scenario_arrays(
+        scenarios, ACT_SLUDGE_INPUTS + list(ACT_SLUDGE_ASSUMPTIONS)
+        + ["X_SS_AT"], defaults)
+    c_bod5_iat = np.ma.array(b_bod5 / q_d * (10 ** 6 / 1000))
+    c_n_iat = np.ma.array(b_ntot / q_d * (10 ** 6 / 1000))
+    x_orgn_bm = 0.05 * c_bod5_iat
+    # nitrogen balance
+    n_bal_ok = s_orgn_est + s_nh4_est + s_no3_est < 13
+    s_nh4_n = np.ma.masked_where(
+        ~n_bal_ok, c_n_iat - s_orgn_est - s_nh4_est - x_orgn_bm)
+    s_no3_d = s_nh4_n - s_no3_est
+    vd_vat = masked_interp(VD_VAT_INTERP, s_no3_d / c_bod5_iat)
+    # safety factor and sludge age
+    small, large = batch_size_class(b_bod5, population)
+    s_f = np.ma.masked_where(~(small | large),
+                             np.where(small, 1.8, 1.45))
+    t_ss_aerob_dim = s_f * 3.4 * 1.103 ** (15 - t_dim)
+    t_ss_dim = t_ss_aerob_dim * (1 / (1 - vd_vat))
+    x_ss_iat = np.ma.array(
+        (B_SS_INH * population / 1000)
+        / q_d * (10 ** 6 / 1000))
+    f_t = np.ma.array(1.072 ** (t_dim - 15))
+    sp_d_c = b_bod5 * (0.75 + 0.6 * (x_ss_iat / c_bod5_iat)
+                       - (((1 - 0.2) * 0.17 * 0.75 * t_ss_dim * f_t)
+                          / (1 + 0.17 * t_ss_dim * f_t)))
+    # phosphorus balance
+    c_p_iat = np.ma.array(b_ptot / q_d * (10 ** 6 / 1000))
+    c_p_est = 0.7 * batch_c_p_er(b_bod5)
+    x_p_bm = 0.01 * c_bod5_iat
+    x_p_prec = c_p_iat - c_p_est - x_p_bm
+    sp_d_p = q_d * 6.8 * x_p_prec / 1000
+    sp_d = sp_d_c + sp_d_p
+    # volumes and recirculation
+    m_ss_at = t_ss_dim * sp_d
+    v_at = m_ss_at / x_ss_at
+    rc = (s_nh4_n / s_no3_est) - 1
+    n_d = 1 - (1 / (1 + rc))
+    n_d = np.ma.masked_where(np.ma.getdata(n_d) < 0.7, n_d)
+    # oxygen uptake
+    ou_d_c = b_bod5 * (0.56 + ((0.15 * t_ss_dim * f_t)
+                               / (1 + 0.17 * t_ss_dim * f_t)))
+    s_no3_iat = np.ma.array(b_no3 / q_d * (10 ** 6 / 1000))
+    ou_d_n = q_d * 4.3 * (s_no3_d - s_no3_iat + s_no3_est) / 1000
+    ou_d_d = q_d * 2.9 * s_no3_d / 1000
+    f_c, f_n = batch_fc_fn(t_ss_dim, small, large)
+    ou_h = (f_c * (ou_d_c - ou_d_d) + f_n * ou_d_n) / 24
+    results = {
+        "C_BOD5_IAT": c_bod5_iat, "C_N_IAT": c_n_iat,
+        "S_orgN_EST": s_orgn_est, "S_NH4_EST": s_nh4_est,
+        "X_orgN_BM": x_orgn_bm, "S_NH4_N": s_nh4_n, "S_NO3_EST": s_no3_est,
+        "S_NO3_D": s_no3_d, "V_D/V_AT": vd_vat, "SF": s_f, "T": t_dim,
+        "t_SS_aerob_dim": t_ss_aerob_dim, "t_SS_dim": t_ss_dim,
+        "X_SS_IAT": x_ss_iat, "F_T": f_t, "SP_d_C": sp_d_c,
+        "C_P_IAT": c_p_iat, "C_P_EST": c_p_est, "X_P_BM": x_p_bm,
+        "X_P_Prec": x_p_prec, "SP_d_P": sp_d_p, "SP_d": sp_d,
+        "M_SS_AT": m_ss_at, "X_SS_AT": x_ss_at, "V_AT": v_at,
+        "V_D": vd_vat * v_at, "V_N": (1 - vd_vat) * v_at, "RC": rc,
+        "n_D": n_d, "OU_d_C": ou_d_c, "S_NO3_IAT": s_no3_iat,
+        "OU_d_N": ou_d_n, "OU_d_D": ou_d_d, "f_C": f_c, "f_N": f_n,
+        "OU_h": ou_h
+    }
+    return {key: np.ma.array(value) for key, value in results.items()}
+
+
+def pri_sed_batch(scenarios, num_tanks=2, width=PRI_WIDTH_MIN):
+    """
+    Vectorized dimensioning of the primary sedimentation tank for a
+    batch of scenarios with the direct layout solver
+    :param scenarios: DICT-like (e.g. DATAFRAME with one row per
+    scenario) with "Q comb" as scalar or array
+    :param num_tanks: INT or ARRAY with the smallest number of tanks
+    :param width: FLOAT or ARRAY with the starting width in m
+    :return: DICT with the pri_sed_df parameters as keys and MASKED
+    ARRAYS as values (masked if no layout fits)
+    """
+    q_comb = scenario_arrays(scenarios, ["Q comb"])[0]
+    # same tank type as in PriSed
+    surf = (q_comb / 24) / Q_A_PRI
+    depth = np.full(surf.shape, DEPTH_PRI)
+    area, quantity, length, width = (
+        np.ma.masked_invalid(value)
+        for value in pri_layout(surf, num_tanks, width))
+    results = {
+        "Tank_surf": surf, "Depth": depth,
+        "Area_per_tank": area, "Quantity": quantity, "Length": length,
+        "Width": width, "Vmin": quantity * width * depth * length
+    }
+    return {key: np.ma.array(value) for key, value in results.items()}
+
+
+def batch_a_st(a_st):
+    """
+    Distribution of the total surface area of the secondary
+    sedimentation over circular tanks as in SecSed.a_st
+    :param a_st: MASKED ARRAY of total surface areas in m²
+    :return: TUPLE with MASKED ARRAYS of the area per tank in m² and
+    the number of circular tanks
+    """
+    a = np.ma.getdata(a_st)
+    conditions = [a <= 2827.43, (2827.44 < a) & (a <= 4250),
+                  (4250 < a) & (a <= 5650), (5650 < a) & (a <= 7100),
+                  (7100 < a) & (a <= 8450)]
+    divisor = np.select(conditions, [1, 2, 3, 4, 5], default=6)
+    quantity = np.select(conditions, [2, 3, 4, 5, 6], default=7)
+    return (a_st / divisor,
+            np.ma.array(quantity, mask=np.ma.getmaskarray(a_st)))
+
+
+def batch_x_ss(rs, svi, t_th, using="scraper facilities"):
+    """
+    Calculation of the suspended solids concentrations of the secondary
+    sedimentation as in fun.x_ss_bs, fun.x_ss_rs and SecSed.x_ss_at
+    :param rs: FLOAT or ARRAY of return sludge ratios
+    :param svi: FLOAT or ARRAY of sludge volume indexes in mL/g
+    :param t_th: FLOAT or ARRAY of thickening times in h
+    :param using: STRING indicating the type of facility to be used
+    for the return sludge
+    :return: TUPLE with MASKED ARRAYS of the bottom sludge, return
+    sludge and activated sludge tank concentrations in g/L
+    """
+    x_ss_bs = np.ma.array((1000 / svi) * t_th ** (1 / 3))
+    x_ss_rs = X_SS_RS_FACTORS[using] * x_ss_bs
+    x_ss_at = (rs * x_ss_rs) / (1 + rs)
+    return x_ss_bs, x_ss_rs, x_ss_at
+
+
+def sec_sed_batch(scenarios, using="scraper facilities", **params):
+    """
+    Vectorized dimensioning of the secondary sedimentation tank for a
+    batch of scenarios in one pass. Infeasible values, which SecSed
+    reports as strings, are masked
+    :param scenarios: DICT-like (e.g. DATAFRAME with one row per
+    scenario) with "Q comb" as scalar or array. The SEC_SED_DEFAULTS
+    ("rs", "qsv", "SVI" and "t_TH") can be given as well
+    :param using: STRING indicating the type of facility to be used
+    for the return sludge
+    :param params: FLOATS overriding the SEC_SED_DEFAULTS for scenarios
+    that do not include them
+    :return: DICT with the sec_sed_df parameters as keys and
+    MASKED ARRAYS as values
+    """
+    defaults = dict(SEC_SED_DEFAULTS)
+    defaults.update(params)
+    q_comb, rs, qsv, svi, t_th = scenario_arrays(
+        scenarios, ["Q comb"] + list(SEC_SED_DEFAULTS), defaults)
+    x_ss_bs, x_ss_rs, x_ss_at = batch_x_ss(rs, svi, t_th, using)
+    q_a = qsv / (x_ss_at * svi)
+    q_a = np.ma.masked_where(np.ma.getdata(q_a) > 1.6, q_a)
+    a_st, quantity = batch_a_st((q_comb / 24) / q_a)
+    h1 = np.ma.array(np.full(q_comb.shape, H1_SEC))
+    h2 = ((0.5 * q_a * (1 + rs)) / (1 - ((x_ss_at * svi) / 1000)))
+    h3 = np.ma.array((1.5 * 0.3 * qsv * (1 + rs)) / 500)
+    h4 = (x_ss_at * q_a * (1 + rs) * t_th) / x_ss_bs
+    h_tot = h1 + h2 + h3 + h4
+    h_tot = np.ma.masked_where(np.ma.getdata(h_tot) < 3, h_tot)
+    results = {
+        "SVI": svi, "t_TH": t_th, "X_SS_BS": x_ss_bs, "X_SS_RS": x_ss_rs,
+        "X_SS_AT": x_ss_at, "q_SV": qsv, "q_A": q_a, "A_ST": a_st,
+        "Quantity": quantity, "Diameter": ((4 * a_st) / m.pi) ** (1 / 2),
+        "h1": h1, "h2": h2, "h3": h3, "h4": h4, "h_tot": h_tot
+    }
+    return {key: np.ma.array(value) for key, value in results.items()}
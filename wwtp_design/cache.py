@@ -0,0 +1,350 @@
+from collections import OrderedDict
+import atexit
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import numpy as np
+import std_tables
+from config import CACHE_DIR
+
+# Version of the cached result formats, to be increased when they change
+CACHE_FORMAT = 1
+# Default on-disk tier in CACHE_DIR. WWTP_CACHE overrides it ("off"
+# disables the cache, "memory" keeps only the in-memory tier)
+CACHE_PATH = os.path.join(CACHE_DIR, "results.sqlite")
+# Number of results kept in memory and size of the on-disk tier in B
+CACHE_MEMORY_ITEMS = 256
+CACHE_MAX_BYTES = 256 * 1024 ** 2
+# Number of on-disk hits whose access times are written together
+CACHE_TOUCH_BATCH = 64
+# Modules whose source defines the cached results
+CACHE_SOURCES = ["std_tables.py", "config.py", "interp.py", "batch.py",
+                 "feasibility.py", "graph.py", "data.py", "fun.py",
+                 "pri_sed.py", "sec_sed.py", "act_sludge.py", "main.py",
+                 "sweep.py"]
+
+
+def tables_version():
+    """
+    Hash of the standard tables of std_tables.py (and thus config.py) and
+    of the source of the design modules, so that cached results are
+    not reused once a table value or a formula changes
+    :return: STR with the hexadecimal SHA-256 digest
+    """
+    digest = hashlib.sha256(f"format {CACHE_FORMAT}".encode())
+    for name, value in sorted(vars(std_tables).items()):
+        if name.startswith("_"):
+            continue
+        if isinstance(value, np.ndarray):
+            digest.update(name.encode() + value.tobytes())
+        elif isinstance(value, (int, float, str, list, tuple, dict)):
+            digest.update(f"{name}={value!r}".encode())
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for source in CACHE_SOURCES:
+        with open(os.path.join(directory, source), "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def normalize_params(value):
+    """
+    Normalizes a parameter value for hashing, so that equal numbers
+    give the same key whatever their type (e.g. 12, 12.0, numpy.int64)
+    :param value: parameter value, ARRAY or nested DICT or LIST
+    :return: JSON-serializable value
+    """
+    if isinstance(value, dict):
+        return {str(key): normalize_params(item)
+                for key, item in value.items()}
+    if isinstance(value, np.ndarray) and value.dtype == object:
+        return [normalize_params(item) for item in value.tolist()]
+    if isinstance(value, np.ndarray):
+        return {"dtype": value.dtype.str, "shape": value.shape,
+                "sha256": hashlib.sha256(
+                    np.ascontiguousarray(value).tobytes()).hexdigest()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_params(item) for item in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        # repr of a FLOAT is exact, 12 and 12.0 give the same text
+        return repr(float(value))
+    return repr(value)
+
+
+def result_key(kind, params):
+    """
+    Content address of a cached result
+    :param kind: STR of the kind of result (e.g. "design_results")
+    :param params: DICT with everything the result depends on besides
+    the tables and the formulas
+    :return: STR with the hexadecimal SHA-256 digest
+    """
+    text = json.dumps([kind, normalize_params(params),
+                       tables_version_cached()], sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+_TABLES_VERSION = None
+
+
+def tables_version_cached():
+    """
+    tables_version computed once per process
+    :return: STR with the hexadecimal SHA-256 digest
+    """
+    global _TABLES_VERSION
+    if _TABLES_VERSION is None:
+        _TABLES_VERSION = tables_version()
+    return _TABLES_VERSION
+
+
+class ResultCache:
+    def __init__(self, path=None, memory_items=CACHE_MEMORY_ITEMS,
+                 max_bytes=CACHE_MAX_BYTES):
+        """
+        For initializing a ResultCache object with an in-memory LRU
+        tier and an optional on-disk SQLite tier evicting the least
+        recently used results beyond a size limit
+        :param path: STR of the SQLite file (None for the memory only)
+        :param memory_items: INT number of results kept in memory
+        :param max_bytes: INT size limit of the on-disk tier in B
+        :return: None
+        """
+        self.path = path
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        # access times of disk hits not written yet
+        self.touched = {}
+        self.lock = threading.Lock()
+        self.counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0,
+                       "stores": 0, "evictions": 0}
+        self.connection = None
+        if path is not None:
+            self.connection = sqlite3.connect(path, timeout=30,
+                                              check_same_thread=False)
+            # several processes (e.g. of a sweep) may share the file
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            with self.connection:
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY "
+                    "KEY, value BLOB, size INTEGER, accessed REAL)")
+                self.connection.execute(
+                    "CREATE INDEX IF NOT EXISTS accessed ON results "
+                    "(accessed)")
+                # running total of the sizes, kept in the same
+                # transactions as the results
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS usage (id INTEGER PRIMARY "
+                    "KEY CHECK (id = 0), bytes INTEGER)")
+                self.connection.execute(
+                    "INSERT OR IGNORE INTO usage SELECT 0, "
+                    "COALESCE(SUM(size), 0) FROM results")
+
+    def remember(self, key, value):
+        """
+        Puts a result into the in-memory tier, dropping the least
+        recently used one beyond memory_items
+        :param key: STR of the content address
+        :param value: cached result
+        :return: None
+        """
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Looks up a result in memory, then on disk
+        :param key: STR of the content address
+        :return: the cached result or None
+        """
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.counts["memory_hits"] += 1
+                return self.memory[key]
+            row = None
+            if self.connection is not None:
+                row = self.connection.execute(
+                    "SELECT value FROM results WHERE key = ?",
+                    (key,)).fetchone()
+            if row is None:
+                self.counts["misses"] += 1
+                return None
+            self.touched[key] = time.time()
+            if len(self.touched) >= CACHE_TOUCH_BATCH:
+                with self.connection:
+                    self.touch()
+            value = pickle.loads(row[0])
+            self.remember(key, value)
+            self.counts["disk_hits"] += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Stores a result in both tiers
+        :param key: STR of the content address
+        :param value: picklable result, which must not be changed
+        afterwards
+        :return: None
+        """
+        self.put_many([(key, value)])
+
+    def put_many(self, items):
+        """
+        Stores several results in both tiers in one disk transaction
+        :param items: LIST of TUPLES with the key and the result
+        :return: None
+        """
+        with self.lock:
+            for key, value in items:
+                self.remember(key, value)
+            self.counts["stores"] += len(items)
+            if self.connection is None or not items:
+                return
+            now = time.time()
+            rows = {}
+            for key, value in items:
+                blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                rows[key] = (key, blob, len(blob), now)
+            with self.connection:
+                self.touch()
+                replaced = sum(
+                    self.connection.execute(
+                        "SELECT COALESCE(SUM(size), 0) FROM results "
+                        "WHERE key = ?", (key,)).fetchone()[0]
+                    for key in rows)
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                    rows.values())
+                self.connection.execute(
+                    "UPDATE usage SET bytes = bytes + ?", (sum(
+                        row[2] for row in rows.values()) - replaced,))
+                self.evict()
+
+    def touch(self):
+        """
+        Writes the access times of the pending disk hits, within the
+        transaction of the caller
+        :return: None
+        """
+        if self.touched:
+            self.connection.executemany(
+                "UPDATE results SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self.touched.items()])
+            self.touched.clear()
+
+    def flush(self):
+        """
+        Writes the access times of the pending disk hits
+        :return: None
+        """
+        with self.lock:
+            if self.connection is not None:
+                with self.connection:
+                    self.touch()
+
+    def evict(self):
+        """
+        Deletes the least recently used results of the on-disk tier
+        until it fits into max_bytes, within the transaction of the
+        caller
+        :return: None
+        """
+        total = self.connection.execute(
+            "SELECT bytes FROM usage").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        old = []
+        freed = 0
+        for key, size in self.connection.execute(
+                "SELECT key, size FROM results ORDER BY accessed"):
+            if total - freed <= self.max_bytes:
+                break
+            old.append((key,))
+            freed += size
+        self.connection.executemany("DELETE FROM results WHERE key = ?", old)
+        self.connection.execute("UPDATE usage SET bytes = bytes - ?",
+                                (freed,))
+        self.counts["evictions"] += len(old)
+
+    def get_or_compute(self, key, fun):
+        """
+        Returns the cached result or computes and stores it
+        :param key: STR of the content address
+        :param fun: function without arguments computing the result
+        :return: the result
+        """
+        value = self.get(key)
+        if value is None:
+            value = fun()
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        """
+        Hit and miss statistics of the cache
+        :return: DICT with the counts of memory and disk hits, misses,
+        stores and evictions, the hit rate and the number of results
+        and bytes of each tier
+        """
+        with self.lock:
+            stats = dict(self.counts)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats[
+                "misses"]
+            stats["hit_rate"] = ((stats["memory_hits"] + stats["disk_hits"])
+                                 / lookups if lookups else 0.0)
+            stats["memory_items"] = len(self.memory)
+            stats["disk_items"], stats["disk_bytes"] = (
+                self.connection.execute(
+                    "SELECT (SELECT COUNT(*) FROM results), bytes FROM usage")
+                .fetchone() if self.connection is not None else (0, 0))
+            return stats
+
+    def clear(self):
+        """
+        Deletes every cached result of both tiers
+        :return: None
+        """
+        with self.lock:
+            self.memory.clear()
+            self.touched.clear()
+            if self.connection is not None:
+                with self.connection:
+                    self.connection.execute("DELETE FROM results")
+                    self.connection.execute("UPDATE usage SET bytes = 0")
+
+
+_DEFAULT_CACHE = None
+
+
+def default_cache():
+    """
+    Cache shared by main, the batch APIs and the design service, set up
+    from the WWTP_CACHE environment variable on first use
+    :return: ResultCache object or None if the cache is disabled
+    """
+    global _DEFAULT_CACHE
+    setting = os.environ.get("WWTP_CACHE", CACHE_PATH)
+    if setting.lower() in ("off", "0", ""):
+        return None
+    if _DEFAULT_CACHE is None:
+        path = None if setting.lower() == "memory" else setting
+        try:
+            if path is not None:
+                os.makedirs(os.path.dirname(os.path.abspath(path)),
+                            exist_ok=True)
+            _DEFAULT_CACHE = ResultCache(path)
+        except (OSError, sqlite3.Error):
+            # e.g. a read-only directory: only the in-memory tier
+            _DEFAULT_CACHE = ResultCache()
+        atexit.register(_DEFAULT_CACHE.flush)
+    return _DEFAULT_CACHE
@@ -0,0 +1,265 @@
+import argparse
+import json
+from sweep import *
+from plants import *
+from service import *
+from portfolio import *
+from envelope import *
+
+
+def build_parser():
+    """
+    Builds the parser of the command-line modes of main.py
+    :return: argparse.ArgumentParser object
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Dimensioning of a wastewater treatment plant. "
+                    "Without a command, the plant in ../input_data.xlsx "
+                    "is designed.")
+    commands = parser.add_subparsers(dest="command")
+    sweep_parser = commands.add_parser(
+        "sweep", help="parameter sweep over a grid of input parameters")
+    sweep_parser.add_argument(
+        "grid", help="JSON file mapping each swept parameter to a list of "
+                     "values or to {\"start\", \"stop\", \"num\"|\"step\"}")
+    sweep_parser.add_argument(
+        "-i", "--input", default="input_data.xlsx",
+        help="input file with the parameters that are not swept "
+             "(relative to ..)")
+    sweep_parser.add_argument(
+        "-o", "--output", default="../sweep_results.csv",
+        help="result table (.csv, .xlsx, .jsonl or .parquet), written "
+             "chunk by chunk")
+    sweep_parser.add_argument(
+        "-w", "--workers", type=int, default=None,
+        help="number of worker processes (default: one per CPU)")
+    sweep_parser.add_argument(
+        "--chunk-size", type=int, default=SWEEP_CHUNK_SIZE,
+        help="grid points per vectorized chunk")
+    sweep_parser.add_argument(
+        "--prefilter", action="store_true",
+        help="skip infeasible grid points before the design stages and "
+             "report their reason codes")
+    sweep_parser.add_argument(
+        "--partitioned", choices=["npy", "parquet"],
+        help="out-of-core mode: write one file per chunk into the output "
+             "directory, with chunks sized to --memory-limit")
+    sweep_parser.add_argument(
+        "--memory-limit", type=float,
+        default=SWEEP_MEMORY_LIMIT / 1024 ** 2,
+        help="memory ceiling in MB of the chunks of the out-of-core mode")
+    design_parser = commands.add_parser(
+        "design", help="design every plant of the given workbooks in "
+                       "parallel")
+    design_parser.add_argument(
+        "inputs", nargs="+",
+        help="input workbooks, directories (their .xlsx files) or glob "
+             "patterns")
+    design_parser.add_argument(
+        "-o", "--outdir", default="../results",
+        help="output directory of the per-plant results and the summary")
+    design_parser.add_argument(
+        "-w", "--workers", type=int, default=None,
+        help="number of worker processes (default: one per CPU)")
+    design_parser.add_argument(
+        "-f", "--format", default="xlsx",
+        choices=[extension[1:] for extension in RESULT_WRITERS],
+        help="format of the per-plant results")
+    design_parser.add_argument(
+        "--summary", default="summary.csv",
+        help="summary table in the output directory (.csv, .xlsx, .jsonl "
+             "or .parquet)")
+    serve_parser = commands.add_parser(
+        "serve", help="local HTTP design service with request batching")
+    serve_parser.add_argument(
+        "-i", "--input", default="input_data.xlsx",
+        help="input file with the parameters that are not requested "
+             "(relative to ..)")
+    serve_parser.add_argument(
+        "--host", default="127.0.0.1", help="local address to listen on")
+    serve_parser.add_argument(
+        "--port", type=int, default=8765, help="TCP port")
+    serve_parser.add_argument(
+        "--unix", help="Unix socket path used instead of host and port")
+    serve_parser.add_argument(
+        "--batch-window", type=float, default=SERVICE_BATCH_WINDOW * 1000,
+        help="time in ms a batch waits for further requests")
+    serve_parser.add_argument(
+        "--max-batch", type=int, default=SERVICE_MAX_BATCH,
+        help="largest number of plants per batch")
+    portfolio_parser = commands.add_parser(
+        "portfolio", help="design every plant of one portfolio file")
+    portfolio_parser.add_argument(
+        "portfolio", help="portfolio with one plant per row or per sheet "
+                          "(.xlsx, .csv or .parquet)")
+    portfolio_parser.add_argument(
+        "-o", "--output", default="../portfolio_results.csv",
+        help="result table (.csv, .xlsx, .jsonl or .parquet)")
+    portfolio_parser.add_argument(
+        "--chunk-size", type=int, default=SWEEP_CHUNK_SIZE,
+        help="plants per vectorized chunk")
+    envelope_parser = commands.add_parser(
+        "envelope", help="activated sludge tank over a temperature series")
+    envelope_parser.add_argument(
+        "temperatures", help="daily or monthly series with a 'T' column "
+                             "(.csv or .parquet)")
+    envelope_parser.add_argument(
+        "-i", "--input", default="input_data.xlsx",
+        help="input file with the plant parameters (relative to ..)")
+    envelope_parser.add_argument(
+        "-t", "--time-column", help="column with the dates")
+    envelope_parser.add_argument(
+        "-o", "--output", default="../envelope_results.csv",
+        help="envelope table (.csv, .xlsx, .jsonl or .parquet)")
+    cache_parser = commands.add_parser(
+        "cache", help="statistics of the results cache or clearing it")
+    cache_parser.add_argument(
+        "--clear", action="store_true", help="delete every cached result")
+    return parser
+
+
+def run_sweep(args):
+    """
+    Runs the "sweep" command and writes its result table
+    :param args: argparse.Namespace object with the parsed arguments
+    :return: INT exit code
+    """
+    with open(args.grid) as grid_file:
+        grid = json.load(grid_file)
+    if args.partitioned:
+        info = sweep_to_disk(grid, args.output, load_snapshot(args.input),
+                             args.workers, args.memory_limit * 1024 ** 2,
+                             args.partitioned, args.prefilter)
+        print(f"{info['points']} grid points written to {args.output} in "
+              f"{info['partitions']} partitions")
+        return 0
+    points = 0
+    with result_writer(args.output) as writer:
+        for results in sweep_chunks(grid, load_snapshot(args.input),
+                                    args.workers, args.chunk_size,
+                                    args.prefilter):
+            results.columns = [".".join(c) for c in results.columns]
+            writer.write(results)
+            points += len(results)
+    print(f"{points} grid points written to {args.output}")
+    return 0
+
+
+def run_design(args):
+    """
+    Runs the "design" command, writes the per-plant results and the
+    summary table and reports the failed files
+    :param args: argparse.Namespace object with the parsed arguments
+    :return: INT exit code (1 if any file failed)
+    """
+    summary = design_plants(args.inputs, args.outdir, args.workers,
+                            "." + args.format)
+    write_results({None: summary.set_index("Plant")},
+                  os.path.join(args.outdir, args.summary))
+    failed = summary[summary["Status"] != "ok"]
+    for _, row in failed.iterrows():
+        print(f"{row['Input']}: {row['Error']}", file=sys.stderr)
+    print(f"{len(summary) - len(failed)} of {len(summary)} plants designed,"
+          f" results in {os.path.abspath(args.outdir)}")
+    return 1 if len(failed) else 0
+
+
+def run_serve(args):
+    """
+    Runs the "serve" command until it is interrupted
+    :param args: argparse.Namespace object with the parsed arguments
+    :return: INT exit code
+    """
+    service = DesignService(load_snapshot(args.input),
+                            args.batch_window / 1000, args.max_batch)
+    address = args.unix or f"http://{args.host}:{args.port}"
+    print(f"Design service listening on {address} (Ctrl+C to stop)")
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def run_portfolio(args):
+    """
+    Runs the "portfolio" command and writes its result table
+    :param args: argparse.Namespace object with the parsed arguments
+    :return: INT exit code (1 if the portfolio is invalid)
+    """
+    try:
+        results = design_portfolio(args.portfolio, args.chunk_size)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    results.columns = [".".join(c) for c in results.columns]
+    write_results({None: results}, args.output)
+    print(f"{len(results)} plants written to {args.output}")
+    return 0
+
+
+def run_envelope(args):
+    """
+    Runs the "envelope" command, writes the envelope and prints the
+    governing cases
+    :param args: argparse.Namespace object with the parsed arguments
+    :return: INT exit code
+    """
+    temperatures = read_temperatures(args.temperatures,
+                                     time_column=args.time_column)
+    governing, envelope = temperature_envelope(temperatures,
+                                               load_snapshot(args.input))
+    write_results({None: envelope}, args.output)
+    print(governing.to_string())
+    excluded = excluded_temperatures(envelope)
+    if excluded.size:
+        print(f"Infeasible temperatures excluded: {excluded.tolist()}")
+    print(f"{len(envelope)} temperatures written to {args.output}")
+    return 0
+
+
+def run_cache(args):
+    """
+    Runs the "cache" command
+    :param args: argparse.Namespace object with the parsed arguments
+    :return: INT exit code (1 if the cache is disabled)
+    """
+    cache = default_cache()
+    if cache is None:
+        print("The results cache is disabled (WWTP_CACHE)", file=sys.stderr)
+        return 1
+    if args.clear:
+        cache.clear()
+        print(f"Results cache {cache.path or 'in memory'} cleared")
+        return 0
+    stats = cache.stats()
+    print(f"Results cache {cache.path or 'in memory'}: "
+          f"{stats['disk_items']} results, {stats['disk_bytes']} B "
+          f"of {cache.max_bytes} B")
+    return 0
+
+
+def run_cli(argv=None):
+    """
+    Entry point of the command-line modes
+    :param argv: LIST of STR with the command-line arguments (None for
+    sys.argv)
+    :return: INT exit code
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "sweep":
+        return run_sweep(args)
+    if args.command == "design":
+        return run_design(args)
+    if args.command == "serve":
+        return run_serve(args)
+    if args.command == "portfolio":
+        return run_portfolio(args)
+    if args.command == "envelope":
+        return run_envelope(args)
+    if args.command == "cache":
+        return run_cache(args)
+    parser.print_help()
+    return 2
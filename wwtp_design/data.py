@@ -1,31 +1,195 @@
 from fun import *
+from graph import *
+from types import MappingProxyType
+import glob
+import hashlib
+import json
 import os
 
+# Parameter snapshots already parsed in this process, keyed on the
+# absolute path and the modification time of the input file
+SNAPSHOTS = {}
+# Directory of the parsed input files within the private cache
+# directory (never next to the input files)
+SIDECAR_DIR = os.path.join(CACHE_DIR, "params")
+
+
+class ParamSnapshot:
+    __slots__ = ("wwtp_params", "values", "file_path", "mtime_ns")
+
+    def __init__(self, wwtp_params, file_path=None, mtime_ns=None):
+        """
+        For initializing an immutable ParamSnapshot object holding the
+        plant parameters of one input file
+        :param wwtp_params: DATAFRAME with the "Value" and "Unit" columns
+        :param file_path: STR of the absolute path of the source file
+        :param mtime_ns: INT of the modification time of the source file
+        :return: None
+        """
+        object.__setattr__(self, "wwtp_params", wwtp_params)
+        object.__setattr__(self, "values", MappingProxyType(
+            dict(zip(wwtp_params.index, wwtp_params["Value"]))))
+        object.__setattr__(self, "file_path", file_path)
+        object.__setattr__(self, "mtime_ns", mtime_ns)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ParamSnapshot objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("ParamSnapshot objects are immutable")
+
+    def __reduce__(self):
+        return ParamSnapshot, (self.wwtp_params, self.file_path,
+                               self.mtime_ns)
+
+
+def sidecar_path(file_path, stat):
+    """
+    Path of the sidecar of an input file in SIDECAR_DIR, keyed on the
+    path, the modification time and the size of the input file
+    :param file_path: STR of the absolute path of the input file
+    :param stat: os.stat_result of the input file
+    :return: STR of the .json file
+    """
+    stem = hashlib.sha256(file_path.encode()).hexdigest()
+    return os.path.join(SIDECAR_DIR, f"{stem}-{stat.st_mtime_ns}-"
+                                     f"{stat.st_size}.json")
+
+
+def read_sidecar(file_path, stat):
+    """
+    Reads the parameters of an input file from its JSON sidecar
+    :param file_path: STR of the absolute path of the input file
+    :param stat: os.stat_result of the input file
+    :return: DATAFRAME with the parameters or None if the sidecar is
+    missing or unreadable
+    """
+    try:
+        with open(sidecar_path(file_path, stat)) as sidecar:
+            table = json.load(sidecar)
+        return pd.DataFrame(table["columns"], index=table["index"])
+    except (OSError, ValueError, KeyError, TypeError):
+        # a missing or damaged sidecar is parsed again and replaced
+        return None
+
+
+def write_sidecar(file_path, stat, wwtp_params):
+    """
+    Stores the parsed parameters of an input file as JSON in
+    SIDECAR_DIR so that later runs can skip the Excel parser, and
+    removes the sidecars of older versions of the file
+    :param file_path: STR of the absolute path of the input file
+    :param stat: os.stat_result of the input file
+    :param wwtp_params: DATAFRAME with the parsed parameters
+    :return: None (a read-only cache directory just disables the
+    sidecar)
+    """
+    path = sidecar_path(file_path, stat)
+    table = {"index": wwtp_params.index.tolist(),
+             "columns": {name: wwtp_params[name].tolist()
+                         for name in wwtp_params}}
+    try:
+        os.makedirs(SIDECAR_DIR, exist_ok=True)
+        for old in glob.glob(path.rsplit("-", 2)[0] + "-*.json"):
+            os.remove(old)
+        with open(path + ".tmp", "w") as sidecar:
+            json.dump(table, sidecar)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+
+
+def parse_input(file_path):
+    """
+    Parses the parameter table of an Excel input file
+    :param file_path: STR of the path of the input file
+    :return: DATAFRAME with the parameters as index and the "Value" and
+    "Unit" columns
+    """
+    return pd.read_excel(file_path, skiprows=[0], index_col=0, header=[0])
+
+
+def load_snapshot(xlsx_file_name="input_data.xlsx"):
+    """
+    Returns the parameter snapshot of an Excel input file. The workbook
+    is only parsed if neither the in-memory cache nor the JSON sidecar
+    hold an up-to-date copy
+    :param xlsx_file_name: STR of the corresponding .xlsx file name
+    :return: ParamSnapshot object
+    :raises FileNotFoundError: if the input file does not exist
+    """
+    file_path = os.path.abspath(os.path.join("..", xlsx_file_name))
+    stat = os.stat(file_path)
+    key = (file_path, stat.st_mtime_ns)
+    if key not in SNAPSHOTS:
+        wwtp_params = read_sidecar(file_path, stat)
+        if wwtp_params is None:
+            wwtp_params = parse_input(file_path)
+            write_sidecar(file_path, stat, wwtp_params)
+        # drop snapshots of older versions of the same file
+        for old_key in [k for k in SNAPSHOTS if k[0] == file_path]:
+            del SNAPSHOTS[old_key]
+        SNAPSHOTS[key] = ParamSnapshot(wwtp_params, file_path,
+                                       stat.st_mtime_ns)
+    return SNAPSHOTS[key]
+
+
+def make_snapshot(values, base=None):
+    """
+    Builds a parameter snapshot from given values, e.g. for a scenario
+    that is not stored in an input file
+    :param values: DICT with parameter names and their values
+    :param base: ParamSnapshot object providing the parameters (and
+    units) that are not in values
+    :return: ParamSnapshot object
+    """
+    wwtp_params = (base.wwtp_params.copy() if base is not None
+                   else pd.DataFrame(columns=["Value", "Unit"]))
+    wwtp_params["Value"] = wwtp_params["Value"].astype(object)
+    for name, value in values.items():
+        wwtp_params.loc[name, "Value"] = value
+    return ParamSnapshot(wwtp_params)
+
 
 class InputReader:
-    def __init__(self, xlsx_file_name="input_data.xlsx"):
+    def __init__(self, xlsx_file_name="input_data.xlsx", snapshot=None):
         """
         For initializing an InputReader object with the given
         attributes and methods
         :param xlsx_file_name: STR of the corresponding .xlsx file name
+        :param snapshot: ParamSnapshot object to be used instead of
+        reading the .xlsx file
         :return: None
         """
+        self.snapshot = None
         self.wwtp_params = pd.DataFrame()
-        self.get_input_data(xlsx_file_name)
+        if snapshot is None:
+            self.get_input_data(xlsx_file_name)
+        else:
+            self.snapshot = snapshot
+            self.wwtp_params = snapshot.wwtp_params
 
     def get_input_data(self, xlsx_file_name):
         """
-        Reads input data from an Excel file and store it in the
-        wwtp_params DataFrame
+        Reads input data from an Excel file (or from the cached
+        snapshot of it) and store it in the wwtp_params DataFrame
         :param xlsx_file_name: STR of the corresponding .xlsx file name
         :return: None if there is no error and -1 (INT) if
         there is an error
         """
         try:
-            file_path = os.path.join("..", xlsx_file_name)
-            self.wwtp_params = pd.read_excel(file_path,
-                                             skiprows=[0],
-                                             index_col=0,
-                                             header=[0])
+            self.snapshot = load_snapshot(xlsx_file_name)
+            self.wwtp_params = self.snapshot.wwtp_params
         except FileNotFoundError:
             return -1
+
+    def param(self, name):
+        """
+        Reads a plant parameter, recording it as input of the design
+        node being computed
+        :param name: STR of the parameter name
+        :return: value of the parameter
+        """
+        record_input(self, name)
+        values = self.snapshot.values if self.snapshot is not None else {}
+        return values[name]
@@ -0,0 +1,92 @@
+from feasibility import *
+from timeseries import *
+
+# Temperature-dependent results of the activated sludge tank kept for
+# every temperature of the series
+ENVELOPE_RESULTS = ["F_T", "t_SS_aerob_dim", "t_SS_dim", "SP_d_C", "SP_d",
+                    "M_SS_AT", "V_AT", "V_D", "V_N", "OU_d_C", "OU_d_N",
+                    "OU_d_D", "OU_h"]
+# Governing cases: the largest tank volume and the largest oxygen uptake
+ENVELOPE_GOVERNING = {"V_AT": "m3", "OU_h": "kgO2/h"}
+
+
+def read_temperatures(file_path, columns=None, time_column=None):
+    """
+    Reads the wastewater temperatures of a series file
+    :param file_path: STR of a .csv or .parquet file with a "T" column
+    :param columns: DICT renaming the columns of the file to TS_COLUMNS
+    :param time_column: STR of the column with the dates, used as index
+    :return: SERIES of temperatures in °C
+    """
+    chunks = list(read_influent(file_path, columns=columns,
+                                time_column=time_column))
+    series = pd.concat(chunks) if chunks else pd.DataFrame()
+    if "T" not in series:
+        raise ValueError(f"No temperature column 'T' in {file_path}")
+    return series["T"].astype(float)
+
+
+def excluded_temperatures(envelope):
+    """
+    Temperatures of an envelope left out of the governing cases
+    :param envelope: DATAFRAME returned by temperature_envelope
+    :return: sorted FLOAT array of the distinct temperatures whose
+    design is infeasible (see feasible_mask)
+    """
+    feasible = feasible_mask(envelope["Infeasible"].to_numpy())
+    return np.unique(envelope["T"].to_numpy()[~feasible])
+
+
+def temperature_envelope(temperatures, snapshot=None, **assumptions):
+    """
+    Dimensions the activated sludge tank for every temperature of a
+    daily or monthly series in one vectorized pass instead of one run
+    per Tdim. Each distinct temperature is evaluated once. Only the
+    feasible temperatures (see feasible_mask) can govern the design
+    :param temperatures: SERIES (its index, e.g. the dates, is kept),
+    ARRAY-like of temperatures in °C or STR of a file read with
+    read_temperatures
+    :param snapshot: ParamSnapshot object with the plant parameters
+    (if None, the input file is loaded); its Tdim is replaced
+    :param assumptions: FLOATS overriding the ACT_SLUDGE_ASSUMPTIONS
+    :return: TUPLE with a DATAFRAME of the governing cases (one row per
+    ENVELOPE_GOVERNING result with its value, units, temperature,
+    position in the series and feasibility code) and the envelope
+    DATAFRAME with "T", the ENVELOPE_RESULTS (NaN if infeasible) and
+    the "Infeasible" codes of feasibility per temperature
+    :raises ValueError: if the design is infeasible at every
+    temperature, listing the excluded temperatures
+    """
+    if isinstance(temperatures, str):
+        temperatures = read_temperatures(temperatures)
+    if snapshot is None:
+        snapshot = load_snapshot()
+    series = pd.Series(temperatures, dtype=float)
+    unique, inverse = np.unique(series.to_numpy(), return_inverse=True)
+    scenarios = dict(snapshot.values, Tdim=unique)
+    results = act_sludge_batch(scenarios, **assumptions)
+    codes = np.broadcast_to(feasibility(scenarios, **assumptions),
+                            unique.shape)
+    feasible = feasible_mask(codes)
+    envelope = pd.DataFrame({"T": series.to_numpy()}, index=series.index)
+    for name in ENVELOPE_RESULTS:
+        values = np.ma.filled(np.ma.array(results[name], dtype=float),
+                              np.nan)
+        values = np.where(feasible, values, np.nan)
+        envelope[name] = values[inverse]
+    envelope["Infeasible"] = codes[inverse]
+    rows = {}
+    for name, units in ENVELOPE_GOVERNING.items():
+        values = envelope[name].to_numpy()
+        if np.isnan(values).all():
+            raise ValueError(
+                "The activated sludge tank design is infeasible at every "
+                f"temperature (excluded: "
+                f"{excluded_temperatures(envelope).tolist()})")
+        i = int(np.nanargmax(values))
+        rows[name] = {"Results": values[i], "Units": units,
+                      "T": envelope["T"].iloc[i],
+                      "Time": envelope.index[i],
+                      "Infeasible": envelope["Infeasible"].iloc[i]}
+    governing = pd.DataFrame.from_dict(rows, orient="index")
+    return governing, envelope
@@ -0,0 +1,119 @@
+from enum import IntFlag
+from batch import *
+
+
+# Reasons why a design is infeasible, combined as bit flags per scenario
+class Infeasible(IntFlag):
+    SIZE_BAND = 1
+    N_BALANCE = 2
+    TDIM_RANGE = 4
+    SLUDGE_AGE = 8
+    N_D = 16
+    Q_A = 32
+    H_TOT = 64
+    P_REQUIREMENT = 128
+
+
+# Messages of the design classes (or their meaning) for every reason
+INFEASIBLE_MESSAGES = {
+    Infeasible.SIZE_BAND: "Approximate B d,BOD5 and Population to the "
+                          "closest value",
+    Infeasible.N_BALANCE: "Check assumptions or choose low values for "
+                          "C_NH4_E_SST or C_NO3_E_SST",
+    Infeasible.TDIM_RANGE: "Temperatures outside the 10 to 12°C range",
+    Infeasible.SLUDGE_AGE: "Sludge age out of range",
+    Infeasible.N_D: "The denitrification ratio n_D is below 0.7",
+    Infeasible.Q_A: "The surface overflow flow rate q_a was exceeded",
+    Infeasible.H_TOT: "The calculated circular tank depth is not "
+                      "sufficient",
+    Infeasible.P_REQUIREMENT: "No phosphorus effluent requirement for "
+                              "the size class"
+}
+# Reasons that do not stop the design chain of main.py: the temperature
+# range only limits the interpolated sludge age of inter_t_ss_dim
+FEASIBILITY_WARNINGS = Infeasible.TDIM_RANGE
+
+
+def feasibility(scenarios, using="scraper facilities", **params):
+    """
+    Evaluates the domain conditions of the design chain for a batch of
+    scenarios up front, without the volumes, sludge productions, oxygen
+    uptakes and tank layouts: size band of s_f, nitrogen balance of
+    n_bal (assumptions below 13 mg/L), Tdim range of inter_t_ss_dim,
+    sludge age range of inter_sp_c_bod and inter_fc_fn, n_D >= 0.7,
+    q_A <= 1.6, h_tot >= 3 and the phosphorus effluent requirement of
+    the size class (needed for the excess sludge)
+    :param scenarios: DICT-like (e.g. DATAFRAME with one row per
+    scenario) with "Q comb" and the ACT_SLUDGE_INPUTS as scalars or
+    arrays. The effluent assumptions and the SEC_SED_DEFAULTS can be
+    given as well
+    :param using: STRING indicating the type of facility to be used
+    for the return sludge
+    :param params: FLOATS overriding the ACT_SLUDGE_ASSUMPTIONS and
+    SEC_SED_DEFAULTS for scenarios that do not include them
+    :return: INT array with the Infeasible flags of every scenario (0
+    if every condition holds)
+    """
+    defaults = dict(ACT_SLUDGE_ASSUMPTIONS, **SEC_SED_DEFAULTS)
+    defaults.update(params)
+    (q_comb, q_d, b_bod5, b_ntot, b_no3, b_ptot, t_dim, population,
+     s_orgn_est, s_nh4_est, s_no3_est, rs, qsv, svi, t_th) = (
+        scenario_arrays(scenarios, ["Q comb"] + ACT_SLUDGE_INPUTS
+                        + list(defaults), defaults))
+    codes = np.zeros(q_comb.shape, dtype=int)
+    # secondary sedimentation
+    x_ss_bs, x_ss_rs, x_ss_at = (np.ma.getdata(value) for value
+                                 in batch_x_ss(rs, svi, t_th, using))
+    q_a = qsv / (x_ss_at * svi)
+    h_tot = (H1_SEC
+             + (0.5 * q_a * (1 + rs)) / (1 - ((x_ss_at * svi) / 1000))
+             + (1.5 * 0.3 * qsv * (1 + rs)) / 500
+             + (x_ss_at * q_a * (1 + rs) * t_th) / x_ss_bs)
+    codes[q_a > 1.6] |= Infeasible.Q_A
+    codes[(q_a <= 1.6) & (h_tot < 3)] |= Infeasible.H_TOT
+    # size band and temperature
+    small, large = batch_size_class(b_bod5, population)
+    codes[~(small | large)] |= Infeasible.SIZE_BAND
+    codes[(t_dim < 10) | (t_dim > 12)] |= Infeasible.TDIM_RANGE
+    codes[np.ma.getmaskarray(batch_c_p_er(b_bod5))] |= (
+        Infeasible.P_REQUIREMENT)
+    # nitrogen balance and denitrification
+    n_bal_ok = s_orgn_est + s_nh4_est + s_no3_est < 13
+    codes[~n_bal_ok] |= Infeasible.N_BALANCE
+    c_bod5_iat = b_bod5 / q_d * (10 ** 6 / 1000)
+    s_nh4_n = (b_ntot / q_d * (10 ** 6 / 1000) - s_orgn_est - s_nh4_est
+               - 0.05 * c_bod5_iat)
+    n_d = 1 - (1 / (s_nh4_n / s_no3_est))
+    codes[n_bal_ok & ~(n_d >= 0.7)] |= Infeasible.N_D
+    # sludge age within the tables of the sludge production and the
+    # peak factors
+    vd_vat = VD_VAT_INTERP((s_nh4_n - s_no3_est) / c_bod5_iat)
+    t_ss_dim = (np.where(small, 1.8, 1.45) * 3.4 * 1.103 ** (15 - t_dim)
+                / (1 - vd_vat))
+    x_ss_iat = (B_SS_INH * population / 1000) / q_d * (10 ** 6 / 1000)
+    sp_c_bod = SP_C_BOD_INTERP(x_ss_iat / c_bod5_iat, t_ss_dim)
+    f_c, f_n = batch_fc_fn(np.ma.array(t_ss_dim), small, large)
+    out = (np.isnan(sp_c_bod) | np.ma.getmaskarray(f_c)
+           | np.ma.getmaskarray(f_n))
+    codes[n_bal_ok & (small | large) & out] |= Infeasible.SLUDGE_AGE
+    return codes
+
+
+def feasible_mask(codes, ignore=FEASIBILITY_WARNINGS):
+    """
+    Boolean validity mask of the reason codes of feasibility
+    :param codes: INT array returned by feasibility
+    :param ignore: Infeasible flags that do not count
+    :return: BOOLEAN array, TRUE for the feasible scenarios
+    """
+    return (np.asarray(codes) & ~ignore) == 0
+
+
+def feasibility_reasons(code):
+    """
+    Explains the reason code of one scenario
+    :param code: INT returned by feasibility for the scenario
+    :return: LIST of STR with the INFEASIBLE_MESSAGES of its flags
+    """
+    return [message for flag, message in INFEASIBLE_MESSAGES.items()
+            if int(code) & flag]
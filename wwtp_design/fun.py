@@ -1,6 +1,27 @@
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
 from config import *
 
+# Level, log file and format of each logger
+LOGGERS_CONFIG = {
+    "info_logger": {"level": logging.INFO, "filename": "info.log",
+                    "format": "[%(asctime)s] %(message)s"},
+    "warning_logger": {
+        "level": logging.WARNING, "filename": "warning.log",
+        "format": "[%(asctime)s %(levelname)s: %(message)s"
+    },
+    "error_logger": {"level": logging.ERROR, "filename": "error.log",
+                     "format": "[%(asctime)s %(levelname)s: %(message)s"}
+}
+# Records waiting to be written by the listener thread of start_logging
+log_queue = queue.SimpleQueue()
+log_listener = None
+
 
 def x_ss_bs():
     """
@@ -8,10 +29,7 @@ def x_ss_bs():
     the bottom sludge
     :return: FLOAT result in g/L or kg/m³
     """
-    return ((1000
-            / np.mean(SVI["Favourable"]["Nitrification and denitrification"]))
-            * TTH["Thickening time"]
-            ["Activated sludge plants with denitrification"][0] ** (1 / 3))
+    return (1000 / SVI_DIM) * T_TH_DIM ** (1 / 3)
 
 
 def x_ss_rs(using="scraper facilities"):
@@ -21,54 +39,95 @@ def x_ss_rs(using="scraper facilities"):
     :param using: STRING indicating the type of facility to be used
     :return: FLOAT result in g/L or kg/m³
     """
-    if using == "scraper facilities":
-        return 0.7 * x_ss_bs()
-    elif using == "suction facilities":
-        return 0.6 * x_ss_bs()
+    if using in X_SS_RS_FACTORS:
+        return X_SS_RS_FACTORS[using] * x_ss_bs()
 
 
-def calc_weights(start, end, variable):
-    """
-    Calculation of initial and final weights of the dimensioning
-    sludge age
-    :param start: INT of the starting value in one of the sludge
-    age ranges
-    :param end: INT of the ending value in one of the sludge age
-    ranges
-    :param variable: FLOAT of the variable to be found its weights
-    :return: TUPLE with dimensionless FLOATS results
-    """
-    start_weight = (end - variable) / (end - start)
-    end_weight = 1 - start_weight
-    return start_weight, end_weight
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        """
+        Formats a record as one JSON object per line. Tables (DATAFRAMES
+        or SERIES) logged as message are written as structured data
+        :param record: logging.LogRecord object
+        :return: STR with the JSON object
+        """
+        entry = {"time": self.formatTime(record), "logger": record.name,
+                 "level": record.levelname}
+        if hasattr(record.msg, "to_dict"):
+            entry["data"] = record.msg.to_dict()
+        else:
+            entry["message"] = record.getMessage()
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
 
 
-def start_logging():
+class LazyQueueHandler(QueueHandler):
+    def prepare(self, record):
+        """
+        Queues the record without formatting it, so that the messages
+        (e.g. whole DATAFRAMES) are only formatted by the listener
+        thread. The logged objects must not be changed afterwards
+        :param record: logging.LogRecord object
+        :return: copy of the record
+        """
+        return copy.copy(record)
+
+
+def start_logging(json_format=None):
     """
-    To set up logging formats and log file names for different scenarios
+    To set up logging formats and log file names for different
+    scenarios. The handlers are only created at the first call: the
+    loggers put their records into a queue and a background thread
+    formats and writes them, so the caller does not wait for log I/O
+    :param json_format: TRUE to write JSON lines instead of text
+    (default: the WWTP_LOG_FORMAT environment variable set to "json")
     :return: None, but three logger objects will be created
     """
-    loggers_config = {
-        "info_logger": {"level": logging.INFO, "filename": "info.log",
-                        "format": "[%(asctime)s] %(message)s"},
-        "warning_logger": {
-            "level": logging.WARNING, "filename": "warning.log",
-            "format": "[%(asctime)s %(levelname)s: %(message)s"
-        },
-        "error_logger": {"level": logging.ERROR, "filename": "error.log",
-                         "format": "[%(asctime)s %(levelname)s: %(message)s"}
-    }
-    for logger_key, logger_value in loggers_config.items():
+    global log_listener
+    if log_listener is not None:
+        return
+    if json_format is None:
+        json_format = os.environ.get("WWTP_LOG_FORMAT") == "json"
+    handlers = []
+    for logger_key, logger_value in LOGGERS_CONFIG.items():
+        formatter = (JsonFormatter() if json_format
+                     else logging.Formatter(logger_value["format"]))
+        # file handler for log file and stream handler for terminal
+        # output, both only writing the records of this logger
+        for handler in (logging.FileHandler(logger_value["filename"],
+                                            mode="w"),
+                        logging.StreamHandler()):
+            handler.setFormatter(formatter)
+            handler.addFilter(logging.Filter(logger_key))
+            handlers.append(handler)
         logger = logging.getLogger(logger_key)
         logger.setLevel(logger_value["level"])
-        # file handler for log file
-        file_handler = logging.FileHandler(logger_value["filename"], mode="w")
-        file_handler.setFormatter(logging.Formatter(logger_value["format"]))
-        logger.addHandler(file_handler)
-        # stream handler for terminal output
-        stream_handler = logging.StreamHandler()
-        stream_handler.setFormatter(logging.Formatter(logger_value["format"]))
-        logger.addHandler(stream_handler)
+        logger.addHandler(LazyQueueHandler(log_queue))
+    log_listener = QueueListener(log_queue, *handlers)
+    log_listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """
+    Writes the queued records and stops the background thread of the
+    logging (called at exit, start_logging can set it up again)
+    :return: None
+    """
+    global log_listener
+    if log_listener is None:
+        return
+    log_listener.stop()
+    for handler in log_listener.handlers:
+        handler.close()
+    for logger_key in LOGGERS_CONFIG:
+        logger = logging.getLogger(logger_key)
+        for handler in logger.handlers[:]:
+            if isinstance(handler, LazyQueueHandler):
+                logger.removeHandler(handler)
+    log_listener = None
+    atexit.unregister(stop_logging)
 
 
 def log_actions(fun):
@@ -83,9 +142,36 @@ def log_actions(fun):
         Wrapper function in order to log script execution messages
         :param args: optional arguments
         :param kwargs: optional keyword arguments
-        :return: None
+        :return: result of fun
         """
         start_logging()
-        fun(*args, **kwargs)
-        logging.shutdown()
+        return fun(*args, **kwargs)
+    return wrapper
+
+
+def profile_actions(fun):
+    """
+    'profile_actions' decorator, opted in with the WWTP_PROFILE
+    environment variable holding the prefix of the output files
+    (WWTP_PROFILE_MEMORY=1 also records the peak traced memory)
+    :param fun: a function calling the design stages of main.py
+    :return: result of applying the wrapper function to the
+    corresponding "fun"
+    """
+    def wrapper(*args, **kwargs):
+        """
+        Wrapper function in order to profile the design chain
+        :param args: optional arguments
+        :param kwargs: optional keyword arguments
+        :return: result of fun
+        """
+        prefix = os.environ.get("WWTP_PROFILE")
+        if not prefix:
+            return fun(*args, **kwargs)
+        from profiler import design_profiler
+        memory = os.environ.get("WWTP_PROFILE_MEMORY") == "1"
+        with design_profiler(fun.__globals__, memory) as profiler:
+            result = fun(*args, **kwargs)
+        profiler.write_all(prefix)
+        return result
     return wrapper
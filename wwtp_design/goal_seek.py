@@ -0,0 +1,148 @@
+from batch import *
+from data import *
+
+# Capacity constraints (upper limits of results) and their units: the
+# activated sludge tank volume, the total surface of the secondary
+# sedimentation tanks and the hourly oxygen uptake
+GOAL_SEEK_CONSTRAINTS = {"V_AT": "m3", "A_ST_tot": "m2", "OU_h": "kgO2/h"}
+# Parameters scaled in proportion to the solved one (per capita flows
+# and loads stay constant when solving for the population)
+GOAL_SEEK_SCALED = {
+    "Population": ["Q d,aM", "Q DW,aM", "Q DW2h,max", "Q WW,aM",
+                   "Q inf,aM", "Q comb", "B d,BOD5", "B d,Ntot",
+                   "B d,NO3-N", "B d,Ptot"]
+}
+# Search range of the solved parameter relative to its current value
+GOAL_SEEK_BRACKET = (1e-3, 1e3)
+# Number of points of the geometric grid scanned before the bisection
+GOAL_SEEK_GRID = 41
+
+
+def capacity_results(scenarios):
+    """
+    Evaluates the secondary sedimentation and activated sludge tank
+    for a batch of scenarios
+    :param scenarios: DICT with the plant parameters as arrays
+    :return: DICT with the GOAL_SEEK_CONSTRAINTS as keys and FLOAT
+    arrays as values (NaN for infeasible designs)
+    """
+    scenarios = dict(scenarios)
+    sec = sec_sed_batch(scenarios)
+    scenarios["X_SS_AT"] = sec["X_SS_AT"].filled(np.nan)
+    act = act_sludge_batch(scenarios)
+    # A_ST of sec_sed_batch is the surface per tank
+    a_st_tot = (np.asarray(scenarios["Q comb"]) / 24) / sec["q_A"]
+    results = {"V_AT": act["V_AT"], "A_ST_tot": a_st_tot,
+               "OU_h": act["OU_h"]}
+    return {name: np.ma.array(value, dtype=float).filled(np.nan)
+            for name, value in results.items()}
+
+
+def goal_seek(limits, variable="Population", snapshot=None, plants=None,
+              scaled=None, bracket=GOAL_SEEK_BRACKET,
+              grid=GOAL_SEEK_GRID, rtol=1e-6, max_iter=200):
+    """
+    Inverse design: largest value of a plant parameter for which every
+    given result stays within its limit, for all plants and constraints
+    at once. The bracket is scanned on a geometric grid and the largest
+    grid point within the limit is refined by vectorized bisection
+    against the following one, so infeasible or decreasing ranges below
+    the capacity (e.g. at the change of the size class) do not matter.
+    An infeasible design counts as exceeding the limit
+    :param limits: DICT with GOAL_SEEK_CONSTRAINTS ("V_AT" in m³,
+    "A_ST_tot" in m² or "OU_h" in kgO2/h) as keys and FLOATS or ARRAYS
+    (one per plant) as values
+    :param variable: STR of the solved parameter, e.g. "Population" or
+    "B d,BOD5"
+    :param snapshot: ParamSnapshot object with the plant parameters
+    (if None, the input file is loaded)
+    :param plants: DICT-like (e.g. DATAFRAME with one row per plant)
+    with parameters overriding those of the snapshot (optional)
+    :param scaled: LIST of STR with parameters scaled in proportion to
+    the variable (default GOAL_SEEK_SCALED, nothing for other variables)
+    :param bracket: TUPLE with the search range relative to the current
+    value of the variable
+    :param grid: INT number of grid points scanned in the bracket
+    :param rtol: FLOAT relative tolerance of the solution
+    :param max_iter: INT largest number of bisection steps
+    :return: DATAFRAME with one row per plant, the largest value of the
+    variable per constraint, the "Capacity" (smallest of them), the
+    "Binding" constraint and the "Status": "ok", "exceeded" (a limit is
+    exceeded on the whole grid, no capacity) or "not reached" (no limit
+    is reached at the upper end of the bracket, the capacity is that
+    end)
+    """
+    if snapshot is None:
+        snapshot = load_snapshot()
+    unknown = [name for name in limits if name not in GOAL_SEEK_CONSTRAINTS]
+    if unknown:
+        raise KeyError(f"Unknown capacity constraints: {unknown}")
+    if not limits:
+        raise ValueError("At least one capacity limit is needed")
+    known = (set(snapshot.values) | set(ACT_SLUDGE_ASSUMPTIONS)
+             | set(SEC_SED_DEFAULTS))
+    params = dict(snapshot.values)
+    if plants is not None:
+        unknown = [name for name in plants if name not in known]
+        if unknown:
+            raise KeyError(f"Unknown plant parameters: {unknown}")
+        params.update({name: plants[name] for name in plants})
+    if variable not in snapshot.values:
+        raise KeyError(f"Unknown plant parameter: {variable}")
+    if scaled is None:
+        scaled = GOAL_SEEK_SCALED.get(variable, [])
+    names = list(limits)
+    values = scenario_arrays(dict(params, **limits),
+                             list(params) + names)
+    n, k = values[0].size, len(names)
+    # one bisection per (constraint, plant) pair, constraint-major
+    scenarios = {name: np.tile(value, k)
+                 for name, value in zip(params, values)}
+    limit = np.concatenate(values[len(params):])
+    x0 = scenarios[variable]
+
+    def excess(x):
+        # x holds one or more values per (constraint, plant) pair
+        reps = x.size // x0.size
+        trial = {name: np.tile(value, reps)
+                 for name, value in scenarios.items()}
+        trial[variable] = x
+        for name in scaled:
+            trial[name] = trial[name] * (x / np.tile(x0, reps))
+        results = capacity_results(trial)
+        chosen = np.concatenate([
+            results[name].reshape(reps, k, n)[:, j]
+            for j, name in enumerate(names)], axis=1)
+        return chosen.ravel() - np.tile(limit, reps)
+
+    factors = np.geomspace(bracket[0], bracket[1], grid)
+    within = (excess(np.outer(factors, x0).ravel()) <= 0).reshape(grid, -1)
+    exceeded = ~within.any(axis=0)
+    reached = ~within[-1]
+    # largest grid point within the limit and the following one
+    last = grid - 1 - np.argmax(within[::-1], axis=0)
+    lo = x0 * factors[last]
+    hi = x0 * factors[np.minimum(last + 1, grid - 1)]
+    active = ~exceeded & reached
+    for _ in range(max_iter):
+        active &= hi / lo - 1 > rtol
+        if not active.any():
+            break
+        # geometric mid-point, as the bracket spans orders of magnitude
+        mid = np.sqrt(lo * hi)
+        ok = excess(mid) <= 0
+        lo = np.where(active & ok, mid, lo)
+        hi = np.where(active & ~ok, mid, hi)
+    solved = np.where(exceeded, np.nan, lo)
+    solved, exceeded, reached = (array.reshape(k, n) for array
+                                 in (solved, exceeded, reached))
+    df = pd.DataFrame(dict(zip(names, solved)),
+                      index=getattr(plants, "index", None))
+    # exceeded constraints bind first
+    binding = np.argmin(np.where(exceeded, -np.inf, solved), axis=0)
+    df["Capacity"] = solved[binding, np.arange(n)]
+    df["Binding"] = np.array(names)[binding]
+    df["Status"] = np.where(exceeded.any(axis=0), "exceeded",
+                            np.where(reached[binding, np.arange(n)], "ok",
+                                     "not reached"))
+    return df
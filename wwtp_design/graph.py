@@ -0,0 +1,233 @@
+from functools import wraps
+
+
+class DesignGraph:
+    def __init__(self):
+        """
+        For initializing a DesignGraph object that memoizes the design
+        quantities of one object and records how they depend on each
+        other
+        :return: None
+        """
+        # values of the nodes computed for the current parameter set
+        self.values = {}
+        # (dependency, dependent) pairs found while evaluating nodes
+        self.edges = set()
+        # number of times each node has been computed
+        self.eval_counts = {}
+        # plant parameters and design attributes read by the nodes
+        self.inputs = set()
+        # snapshot and design inputs the values were computed for
+        self.params_key = (None, ())
+        self.stack = []
+
+    @property
+    def nodes(self):
+        """
+        Lists the nodes of the graph seen so far
+        :return: LIST of STR with the node names
+        """
+        nodes = set(self.eval_counts)
+        for dependency, dependent in self.edges:
+            nodes.update((dependency, dependent))
+        return sorted(nodes)
+
+    def dependencies(self, node):
+        """
+        Lists the nodes a given node is computed from
+        :param node: STR of the node name
+        :return: LIST of STR with the node names
+        """
+        return sorted(dep for dep, target in self.edges if target == node)
+
+    def dependents(self, names):
+        """
+        Lists the nodes computed directly or indirectly from the given
+        nodes or inputs
+        :param names: iterable of STR with node or input names
+        :return: SET of STR with the node names
+        """
+        found = set()
+        todo = list(names)
+        while todo:
+            name = todo.pop()
+            for dependency, dependent in self.edges:
+                if dependency == name and dependent not in found:
+                    found.add(dependent)
+                    todo.append(dependent)
+        return found
+
+    def invalidate(self, names):
+        """
+        Drops the values of the nodes that depend on changed inputs, so
+        that only those are computed again
+        :param names: iterable of STR with the changed input names
+        :return: SET of STR with the invalidated node names
+        """
+        invalidated = self.dependents(names)
+        for node in invalidated:
+            self.values.pop(node, None)
+        return invalidated
+
+    def track(self, label, fun):
+        """
+        Calls a function as if it was a node, recording which nodes and
+        inputs it uses but without memoizing its value
+        :param label: STR of the name of the pseudo node
+        :param fun: function without arguments
+        :return: result of fun
+        """
+        self.stack.append(label)
+        try:
+            return fun()
+        finally:
+            self.stack.pop()
+
+    def evaluate(self, fun, obj, args, kwargs):
+        """
+        Returns the value of a node, computing it only if it has not
+        been computed yet for the current parameter set of obj
+        :param fun: design method of the node
+        :param obj: object the design method belongs to
+        :param args: TUPLE of positional arguments of the method
+        :param kwargs: DICT of keyword arguments of the method
+        :return: value of the node
+        """
+        node = fun.__name__
+        if args or kwargs:
+            node += repr(args + tuple(sorted(kwargs.items())))
+        # a replaced snapshot invalidates every node (the design inputs
+        # invalidate their own dependents when they are set)
+        if getattr(obj, "snapshot", None) is not self.params_key[0]:
+            self.values.clear()
+            self.params_key = get_params_key(obj)
+        if self.stack:
+            self.edges.add((node, self.stack[-1]))
+        if node not in self.values:
+            self.stack.append(node)
+            try:
+                self.values[node] = fun(obj, *args, **kwargs)
+            finally:
+                self.stack.pop()
+            self.eval_counts[node] = self.eval_counts.get(node, 0) + 1
+        return self.values[node]
+
+
+def get_params_key(obj):
+    """
+    Builds the key of the parameter set of an object from its
+    ParamSnapshot (the object itself, which is immutable and kept alive
+    by the key) and the values of its DesignInput attributes. It is
+    only built when the graph is created and when the inputs change
+    :param obj: object with design_node methods
+    :return: TUPLE identifying the parameter set
+    """
+    inputs = tuple((name, obj.__dict__.get(name))
+                   for name in design_inputs(type(obj)))
+    return getattr(obj, "snapshot", None), inputs
+
+
+def design_inputs(cls):
+    """
+    Lists the DesignInput attributes of a class
+    :param cls: class with design_node methods
+    :return: LIST of STR with the attribute names
+    """
+    return sorted(name for name in dir(cls)
+                  if isinstance(getattr(cls, name), DesignInput))
+
+
+def design_graph(obj):
+    """
+    Returns the design graph of an object, creating it if needed
+    :param obj: object with design_node methods
+    :return: DesignGraph object
+    """
+    graph = obj.__dict__.get("design_graph")
+    if graph is None:
+        graph = obj.__dict__["design_graph"] = DesignGraph()
+        graph.params_key = get_params_key(obj)
+    return graph
+
+
+def record_input(obj, name):
+    """
+    Records that the node being computed reads an input of an object
+    :param obj: object with design_node methods
+    :param name: STR of the plant parameter or design attribute
+    :return: None
+    """
+    graph = obj.__dict__.get("design_graph")
+    if graph is not None and graph.stack:
+        graph.inputs.add(name)
+        graph.edges.add((name, graph.stack[-1]))
+
+
+def update_inputs(obj, names):
+    """
+    Invalidates the nodes of an object after some of its inputs were
+    changed in place, keeping the values of all the other nodes
+    :param obj: object with design_node methods whose plant parameters
+    or design attributes have been changed
+    :param names: iterable of STR with the changed input names
+    :return: SET of STR with the invalidated node names
+    """
+    graph = design_graph(obj)
+    invalidated = graph.invalidate(names)
+    graph.params_key = get_params_key(obj)
+    return invalidated
+
+
+class DesignInput:
+    def __set_name__(self, owner, name):
+        """
+        Names the design attribute after the class attribute
+        :param owner: class
+        :param name: STR of the attribute name
+        :return: None
+        """
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        """
+        Reads the design attribute, recording it as input of the node
+        being computed
+        :param obj: object with design_node methods
+        :param owner: class
+        :return: value of the attribute
+        """
+        if obj is None:
+            return self
+        record_input(obj, self.name)
+        return obj.__dict__[self.name]
+
+    def __set__(self, obj, value):
+        """
+        Sets the design attribute, dropping the values of the nodes
+        computed from it
+        :param obj: object with design_node methods
+        :param value: new value of the attribute
+        :return: None
+        """
+        obj.__dict__[self.name] = value
+        if "design_graph" in obj.__dict__:
+            update_inputs(obj, [self.name])
+
+
+def design_node(fun):
+    """
+    'design_node' decorator that turns a design method without side
+    effects into a memoized node of the object's design_graph
+    :param fun: a method
+    :return: wrapper method evaluating the node lazily
+    """
+    @wraps(fun)
+    def wrapper(self, *args, **kwargs):
+        """
+        Wrapper method in order to look up the node in the design graph
+        :param args: optional arguments
+        :param kwargs: optional keyword arguments
+        :return: value of the node
+        """
+        return design_graph(self).evaluate(fun, self, args, kwargs)
+    return wrapper
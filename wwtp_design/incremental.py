@@ -0,0 +1,193 @@
+from main import *
+
+
+def layout_row(i):
+    """
+    Row of the primary sedimentation table taken from cross_volume
+    :param i: INT position in the TUPLE returned by cross_volume
+    :return: function of a PriSed object (the message of cross_volume
+    if there is no layout)
+    """
+    def row(p):
+        layout = p.cross_volume()
+        return layout if isinstance(layout, str) else layout[i]
+    return row
+
+
+# Rows of the result tables of main.py as functions of the design
+# object of their table, giving the same values as pri_sed_df,
+# sec_sed_df and act_sludge_df
+INCREMENTAL_ROWS = {
+    "pri_sed": {
+        "Tank_surf": lambda p: p.pri_surf(),
+        "Depth": lambda p: p.pri_deep,
+        "Area_per_tank": layout_row(0),
+        "Quantity": layout_row(1),
+        "Length": layout_row(2),
+        "Width": layout_row(3),
+        "Vmin": layout_row(4)
+    },
+    "sec_sed": {
+        "SVI": lambda s: SVI_DIM,
+        "t_TH": lambda s: T_TH_DIM,
+        "X_SS_BS": lambda s: x_ss_bs(),
+        "X_SS_RS": lambda s: x_ss_rs(),
+        "X_SS_AT": lambda s: s.x_ss_at(),
+        "q_SV": lambda s: s.qsv,
+        "q_A": lambda s: s.q_a(),
+        "A_ST": lambda s: s.a_st()[0],
+        "Quantity": lambda s: s.a_st()[1],
+        "Diameter": lambda s: s.diam_st(),
+        "h1": lambda s: s.h1,
+        "h2": lambda s: s.h2(),
+        "h3": lambda s: s.h3(),
+        "h4": lambda s: s.h4(),
+        "h_tot": lambda s: s.h_tot()
+    },
+    "act_sludge": {
+        "C_BOD5_IAT": lambda a: a.c_bod5_iat(),
+        "C_N_IAT": lambda a: a.c_n_iat(),
+        "S_orgN_EST": lambda a: a.S_orgN_EST,
+        "S_NH4_EST": lambda a: a.S_NH4_EST,
+        "X_orgN_BM": lambda a: a.x_orgn_bm(),
+        "S_NH4_N": lambda a: a.n_bal()[0],
+        "S_NO3_EST": lambda a: a.S_NO3_EST,
+        "S_NO3_D": lambda a: a.n_bal()[1],
+        "V_D/V_AT": lambda a: a.inter_vd_vat(),
+        "SF": lambda a: a.s_f(),
+        "T": lambda a: a.param("Tdim"),
+        "t_SS_aerob_dim": lambda a: a.t_ss_aerob_dim(),
+        "t_SS_dim": lambda a: a.t_ss_dim(),
+        "X_SS_IAT": lambda a: a.x_ss_iat(),
+        "F_T": lambda a: a.f_t(),
+        "SP_d_C": lambda a: a.sp_d_c(),
+        "C_P_IAT": lambda a: a.c_p_iat(),
+        "C_P_EST": lambda a: a.c_p_est(),
+        "X_P_BM": lambda a: a.x_p_bm(),
+        "X_P_Prec": lambda a: a.x_p_prec(),
+        "SP_d_P": lambda a: a.sp_d_p(),
+        "SP_d": lambda a: a.sp_d(),
+        "M_SS_AT": lambda a: a.m_ss_at(),
+        # ActSludge uses a SecSed object with the default attributes
+        "X_SS_AT": lambda a: SecSed(a.snapshot).x_ss_at(),
+        "V_AT": lambda a: a.v_at(),
+        "V_D": lambda a: a.v_d(),
+        "V_N": lambda a: a.v_n(),
+        "RC": lambda a: a.rc(),
+        "n_D": lambda a: a.n_d(),
+        "OU_d_C": lambda a: a.ou_d_c(),
+        "S_NO3_IAT": lambda a: a.s_no3_iat(),
+        "OU_d_N": lambda a: a.ou_d_n(),
+        "OU_d_D": lambda a: a.ou_d_d(),
+        "f_C": lambda a: a.inter_fc_fn()[0],
+        "f_N": lambda a: a.inter_fc_fn()[1],
+        "OU_h": lambda a: a.ou_h()
+    }
+}
+INCREMENTAL_UNITS = {"pri_sed": PRI_SED_UNITS, "sec_sed": SEC_SED_UNITS,
+                     "act_sludge": ACT_SLUDGE_UNITS}
+
+
+class IncrementalDesign:
+    def __init__(self, snapshot=None):
+        """
+        For initializing an IncrementalDesign object, which keeps the
+        design objects of one plant and the results of the three tables
+        between edits of the inputs. The design graphs record which
+        plant parameters and design attributes each result is computed
+        from, so an edit only recomputes the affected results
+        :param snapshot: ParamSnapshot object with the plant parameters
+        (if None, the input file is loaded)
+        :return: None
+        """
+        if snapshot is None:
+            snapshot = load_snapshot()
+        self.snapshot = snapshot
+        self.objects = {"pri_sed": PriSed(snapshot),
+                        "sec_sed": SecSed(snapshot),
+                        "act_sludge": ActSludge(snapshot)}
+        # results of the rows computed for the current inputs
+        self.values = {}
+        # number of times each row has been computed
+        self.eval_counts = {}
+
+    def inputs(self):
+        """
+        Lists the inputs that can be edited
+        :return: DICT with the plant parameters and the design
+        attributes (e.g. "S_NO3_EST", "rs" or "num_tanks") as keys and
+        their current values as values
+        """
+        inputs = dict(self.snapshot.values)
+        for obj in self.objects.values():
+            for name in dir(type(obj)):
+                if isinstance(getattr(type(obj), name), DesignInput):
+                    inputs[name] = getattr(obj, name)
+        return inputs
+
+    def row(self, table, name):
+        """
+        Returns the result of one row, computing it only if it is not
+        known for the current inputs
+        :param table: STR of the table ("pri_sed", "sec_sed" or
+        "act_sludge")
+        :param name: STR of the parameter of the row
+        :return: value of the row
+        """
+        key = (table, name)
+        if key not in self.values:
+            fun = INCREMENTAL_ROWS[table][name]
+            obj = self.objects[table]
+            self.values[key] = design_graph(obj).track(
+                f"{table}.{name}", lambda: fun(obj))
+            self.eval_counts[key] = self.eval_counts.get(key, 0) + 1
+        return self.values[key]
+
+    def results(self):
+        """
+        Result tables of the current inputs
+        :return: DICT with the DESIGN_TABLES as keys and DATAFRAMES
+        like those of design_results as values
+        """
+        tables = {}
+        for table, units in INCREMENTAL_UNITS.items():
+            df = pd.DataFrame({
+                "Results": [self.row(table, name) for name in units],
+                "Units": list(units.values())}, index=list(units))
+            tables[table] = df.round(2)
+        return tables
+
+    def update(self, changes):
+        """
+        Edits inputs without reading the input file again and drops
+        the results computed from them
+        :param changes: DICT with new values of plant parameters or
+        design attributes
+        :return: DICT with the DESIGN_TABLES as keys and LISTS with the
+        invalidated rows as values
+        :raises KeyError: if an input is unknown
+        """
+        inputs = self.inputs()
+        unknown = [name for name in changes if name not in inputs]
+        if unknown:
+            raise KeyError(f"Unknown inputs: {unknown}")
+        params = {name: value for name, value in changes.items()
+                  if name in self.snapshot.values}
+        if params:
+            self.snapshot = make_snapshot(params, self.snapshot)
+        labels = set()
+        for obj in self.objects.values():
+            obj.snapshot = self.snapshot
+            if isinstance(obj, InputReader):
+                obj.wwtp_params = self.snapshot.wwtp_params
+            for name, value in changes.items():
+                if isinstance(getattr(type(obj), name, None), DesignInput):
+                    setattr(obj, name, value)
+            labels |= update_inputs(obj, changes)
+        invalidated = {table: [] for table in INCREMENTAL_ROWS}
+        for table, rows in INCREMENTAL_ROWS.items():
+            for name in rows:
+                if f"{table}.{name}" in labels:
+                    invalidated[table].append(name)
+                    self.values.pop((table, name), None)
+        return invalidated
@@ -0,0 +1,83 @@
+from std_tables import *
+
+
+def calc_weights(start, end, variable):
+    """
+    Calculation of initial and final weights of the dimensioning
+    sludge age
+    :param start: INT of the starting value in one of the sludge
+    age ranges
+    :param end: INT of the ending value in one of the sludge age
+    ranges
+    :param variable: FLOAT of the variable to be found its weights
+    :return: TUPLE with dimensionless FLOATS results
+    """
+    start_weight = (end - variable) / (end - start)
+    end_weight = 1 - start_weight
+    return start_weight, end_weight
+
+
+class TableInterpolator:
+    def __init__(self, axes, values, clamp):
+        """
+        For initializing an immutable TableInterpolator object that
+        interpolates a standard table linearly along each of its axes
+        :param axes: LIST of increasing FLOAT arrays with the grid
+        values of each axis
+        :param values: ARRAY of table values whose last dimensions
+        match the axes (leading dimensions are rows interpolated
+        together, e.g. fc and fn)
+        :param clamp: LIST of BOOLEANS per axis, TRUE to clamp targets
+        to the axis range (as np.interp does) and FALSE to return NaN
+        outside of it
+        :return: None
+        """
+        self.axes = tuple(read_only(axis) for axis in axes)
+        self.values = read_only(values)
+        self.clamp = tuple(clamp)
+
+    def __call__(self, *targets):
+        """
+        Interpolates the table at the given targets. As in the range
+        search of ActSludge, a target on a grid value uses the interval
+        ending there, so NaN table values propagate
+        :param targets: FLOATS or ARRAYS with one target per axis
+        :return: FLOAT ARRAY with the leading dimensions of the table
+        followed by the broadcast shape of the targets
+        """
+        targets = np.broadcast_arrays(*(np.asarray(t, dtype=float)
+                                        for t in targets))
+        outside = np.zeros(targets[0].shape, dtype=bool)
+        corners = [((), 1.0)]
+        for axis, target, clamp in zip(self.axes, targets, self.clamp):
+            if clamp:
+                target = np.clip(target, axis[0], axis[-1])
+            else:
+                outside |= (target < axis[0]) | (target > axis[-1])
+            end = np.clip(np.searchsorted(axis, target, side="left"),
+                          1, axis.size - 1)
+            start_weight, end_weight = calc_weights(axis[end - 1],
+                                                    axis[end], target)
+            corners = [(index + (i,), weight * w)
+                       for index, weight in corners
+                       for i, w in ((end - 1, start_weight),
+                                    (end, end_weight))]
+        lead = (slice(None),) * (self.values.ndim - len(self.axes))
+        result = sum(self.values[lead + index] * weight
+                     for index, weight in corners)
+        return np.where(outside, np.nan, result)
+
+
+# Vd/Vat from the nitrate to be denitrified per BOD5 (pre-anoxic zone)
+VD_VAT_INTERP = TableInterpolator([S_NO3_D_C_BOD_PRE], VD_VAT, [True])
+# Dimensioning sludge age for nitrification and denitrification by
+# plant size (SizeBand), temperature and Vd/Vat
+T_SS_DIM_INTERP = TableInterpolator(
+    [[10, 12], T_SS_DIM_VD_VAT[T_SS_DIM_DEN_ROWS]],
+    T_SS_DIM_VALUES[T_SS_DIM_DEN_ROWS].T.reshape(2, 2, -1), [False, True])
+# Specific sludge production by X_ss_iat/C_bod_iat and sludge age
+SP_C_BOD_INTERP = TableInterpolator(
+    [SP_C_BOD_RATIOS, SP_C_BOD_T_SS], SP_C_BOD_VALUES, [True, False])
+# Peak factors fc, fn for <= 1200 kgBOD5/d and fn for >= 6000 kgBOD5/d
+# (PeakFactor) by sludge age
+FC_FN_INTERP = TableInterpolator([FC_FN_T_SS], FC_FN_VALUES, [False])
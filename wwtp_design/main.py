@@ -1,91 +1,150 @@
 import sys
 from act_sludge import *
 from pri_sed import *
+from output import *
+from cache import *
+from feasibility import *
 from time import perf_counter
 
+# Result table of each stage, also used as sheet or file suffix
+DESIGN_TABLES = {"pri_sed": "primary sedimentation tank",
+                 "sec_sed": "secondary sedimentation tank",
+                 "act_sludge": "activated sludge tank"}
+DESIGN_OUTPUT = "../design_results.xlsx"
+# Parameters and units of the result table of each stage
+PRI_SED_UNITS = {"Tank_surf": "m2", "Depth": "m", "Area_per_tank": "m2",
+                 "Quantity": "rectangular tanks", "Length": "m",
+                 "Width": "m", "Vmin": "m3"}
+SEC_SED_UNITS = {"SVI": "mL/g", "t_TH": "h", "X_SS_BS": "g/L",
+                 "X_SS_RS": "g/L", "X_SS_AT": "g/L", "q_SV": "L/(m2*h)",
+                 "q_A": "m/h", "A_ST": "m2", "Quantity": "circular tanks",
+                 "Diameter": "m", "h1": "m", "h2": "m", "h3": "m", "h4": "m",
+                 "h_tot": "m"}
+ACT_SLUDGE_UNITS = {
+    "C_BOD5_IAT": "mg/L", "C_N_IAT": "mg/L", "S_orgN_EST": "mg/L",
+    "S_NH4_EST": "mg/L", "X_orgN_BM": "mg/L", "S_NH4_N": "mg/L",
+    "S_NO3_EST": "mg/L", "S_NO3_D": "mg/L", "V_D/V_AT": "-", "SF": "-",
+    "T": "C", "t_SS_aerob_dim": "d", "t_SS_dim": "d", "X_SS_IAT": "mg/L",
+    "F_T": "-", "SP_d_C": "kg/d", "C_P_IAT": "mg/L", "C_P_EST": "mg/L",
+    "X_P_BM": "mg/L", "X_P_Prec": "mg/L", "SP_d_P": "kg/d", "SP_d": "kg/d",
+    "M_SS_AT": "kg", "X_SS_AT": "g/L", "V_AT": "m3", "V_D": "m3",
+    "V_N": "m3", "RC": "-", "n_D": "-", "OU_d_C": "kgO2/d",
+    "S_NO3_IAT": "mg/L", "OU_d_N": "kgO2/d", "OU_d_D": "kgO2/d",
+    "f_C": "-", "f_N": "-", "OU_h": "kgO2/h"
+}
 
-def pri_sed_df():
+
+def pri_sed_df(snapshot=None):
     """
     Places the results of the primary sedimentation tank dimensioning
     in a data frame
+    :param snapshot: ParamSnapshot object with the plant parameters
+    (if None, the input file is loaded)
     :return: DATAFRAME with the final results
     """
-    params = ["Tank_surf", "Depth", "Area_per_tank",
-              "Quantity", "Length", "Width", "Vmin"]
-    results = [PriSed().pri_surf(), PriSed().pri_deep,
-               PriSed().cross_volume()[0], PriSed().cross_volume()[1],
-               PriSed().cross_volume()[2], PriSed().cross_volume()[3],
-               PriSed().cross_volume()[4]]
-    units = ["m2", "m", "m2", "rectangular tanks", "m", "m", "m3"]
-    df = pd.DataFrame({"Results": results, "Units": units}, index=params)
+    if snapshot is None:
+        snapshot = load_snapshot()
+    p = PriSed(snapshot)
+    results = [p.pri_surf(), p.pri_deep, *p.cross_volume()]
+    df = pd.DataFrame({"Results": results,
+                       "Units": list(PRI_SED_UNITS.values())},
+                      index=list(PRI_SED_UNITS))
     return df.round(2)
 
 
-def sec_sed_df():
+def sec_sed_df(snapshot=None):
     """
     Places the results of the secondary sedimentation tank dimensioning
     in a data frame
+    :param snapshot: ParamSnapshot object with the plant parameters
+    (if None, the input file is loaded)
     :return: DATAFRAME with the final results
     """
-    params = ["SVI", "t_TH", "X_SS_BS", "X_SS_RS", "X_SS_AT", "q_SV", "q_A",
-              "A_ST", "Quantity", "Diameter", "h1", "h2", "h3", "h4", "h_tot"]
+    if snapshot is None:
+        snapshot = load_snapshot()
+    s = SecSed(snapshot)
     results = [
-        np.mean(SVI["Favourable"]["Nitrification and denitrification"]),
-        TTH["Thickening time"]["Activated sludge"
-                               " plants with denitrification"][0], x_ss_bs(),
-        x_ss_rs(), SecSed().x_ss_at(), SecSed().qsv, SecSed().q_a(),
-        SecSed().a_st()[0], SecSed().a_st()[1], SecSed().diam_st(),
-        SecSed().h1, SecSed().h2(), SecSed().h3(), SecSed().h4(),
-        SecSed().h_tot()
+        SVI_DIM, T_TH_DIM, x_ss_bs(), x_ss_rs(), s.x_ss_at(), s.qsv,
+        s.q_a(), s.a_st()[0], s.a_st()[1], s.diam_st(), s.h1, s.h2(),
+        s.h3(), s.h4(), s.h_tot()
     ]
-    units = (["mL/g", "h"] + ["g/L"] * 3 + ["L/(m2*h)", "m/h", "m2"] +
-             ["circular tanks"] + ["m"] * 6)
-    df = pd.DataFrame({"Results": results, "Units": units}, index=params)
+    df = pd.DataFrame({"Results": results,
+                       "Units": list(SEC_SED_UNITS.values())},
+                      index=list(SEC_SED_UNITS))
     return df.round(2)
 
 
-def act_sludge_df():
+def act_sludge_df(snapshot=None):
     """
     Places the results of the activated sludge tank dimensioning
     in a data frame
+    :param snapshot: ParamSnapshot object with the plant parameters
+    (if None, the input file is loaded)
     :return: DATAFRAME with the final results
     """
-    a = ActSludge()
-    params = ["C_BOD5_IAT", "C_N_IAT", "S_orgN_EST", "S_NH4_EST", "X_orgN_BM",
-              "S_NH4_N", "S_NO3_EST", "S_NO3_D", "V_D/V_AT", "SF", "T",
-              "t_SS_aerob_dim", "t_SS_dim", "X_SS_IAT", "F_T", "SP_d_C",
-              "C_P_IAT", "C_P_EST", "X_P_BM", "X_P_Prec", "SP_d_P", "SP_d",
-              "M_SS_AT", "X_SS_AT", "V_AT", "V_D", "V_N", "RC", "n_D",
-              "OU_d_C", "S_NO3_IAT", "OU_d_N", "OU_d_D", "f_C", "f_N", "OU_h"]
+    if snapshot is None:
+        snapshot = load_snapshot()
+    a = ActSludge(snapshot)
     results = [a.c_bod5_iat(), a.c_n_iat(), a.S_orgN_EST, a.S_NH4_EST,
                a.x_orgn_bm(), a.n_bal()[0], a.S_NO3_EST, a.n_bal()[1],
                a.inter_vd_vat(), a.s_f(),
-               InputReader().wwtp_params["Value"]["Tdim"], a.t_ss_aerob_dim(),
+               a.wwtp_params["Value"]["Tdim"], a.t_ss_aerob_dim(),
                a.t_ss_dim(), a.x_ss_iat(), a.f_t(), a.sp_d_c(), a.c_p_iat(),
                a.c_p_est(), a.x_p_bm(), a.x_p_prec(), a.sp_d_p(), a.sp_d(),
-               a.m_ss_at(), SecSed().x_ss_at(), a.v_at(), a.v_d(), a.v_n(),
+               a.m_ss_at(), SecSed(snapshot).x_ss_at(), a.v_at(), a.v_d(),
+               a.v_n(),
                a.rc(), a.n_d(), a.ou_d_c(), a.s_no3_iat(), a.ou_d_n(),
                a.ou_d_d(), a.inter_fc_fn()[0], a.inter_fc_fn()[1], a.ou_h()]
-    units = (
-            ["mg/L"] * 8 + ["-"] * 2 + ["C", "d", "d", "mg/L"] + ["-", "kg/d"]
-            + ["mg/L"] * 4 + ["kg/d"] * 2 + ["kg", "g/L"] + ["m3"] * 3 + ["-"]
-            * 2 + ["kgO2/d", "mg/L"] + ["kgO2/d"] * 2 + ["-"] * 2 + ["kgO2/h"]
-    )
-    df = pd.DataFrame({"Results": results, "Units": units}, index=params)
+    df = pd.DataFrame({"Results": results,
+                       "Units": list(ACT_SLUDGE_UNITS.values())},
+                      index=list(ACT_SLUDGE_UNITS))
     return df.round(2)
 
 
+def design_results(snapshot=None, use_cache=True):
+    """
+    Computes the results of every stage once, or takes them from the
+    results cache if the same plant parameters were designed before
+    :param snapshot: ParamSnapshot object with the plant parameters
+    (if None, the input file is loaded)
+    :param use_cache: FALSE to always compute the results
+    :return: DICT with the DESIGN_TABLES as keys and DATAFRAMES with
+    the final results as values
+    """
+    if snapshot is None:
+        snapshot = load_snapshot()
+    cache = default_cache() if use_cache else None
+    if cache is None:
+        return {"pri_sed": pri_sed_df(snapshot),
+                "sec_sed": sec_sed_df(snapshot),
+                "act_sludge": act_sludge_df(snapshot)}
+    results = cache.get_or_compute(
+        result_key("design_results", dict(snapshot.values)),
+        lambda: design_results(snapshot, use_cache=False))
+    # the cached tables are shared, the caller gets its own copies
+    return {table: df.copy() for table, df in results.items()}
+
+
 @log_actions
-def main():
+@profile_actions
+def main(output=DESIGN_OUTPUT):
     """
     Main functionality of the script
+    :param output: STR of the output file, whose extension chooses the
+    result writer (.xlsx for one workbook with a sheet per stage,
+    .csv or .parquet for one file per stage, .jsonl for one file)
     :return: None or -1, but generates three log files
     """
     # retrieves logger objects from the logging system
     info_logger = logging.getLogger("info_logger")
     error_logger = logging.getLogger("error_logger")
     warning_logger = logging.getLogger("warning_logger")
-    if InputReader().get_input_data("input_data.xlsx") == -1:
+    # the input file is parsed once and shared by all the stages
+    try:
+        snapshot = load_snapshot("input_data.xlsx")
+    except FileNotFoundError:
+        snapshot = None
+    if snapshot is None:
         info_logger.info("Nothing to show")
         warning_logger.warning("An unexpected event has occurred. "
                                "It is most likely an error")
@@ -94,31 +153,28 @@ def main():
     else:
         # log of information
         info_logger.info("Using the following dimensioning data")
-        info_logger.info(InputReader().wwtp_params)
-        info_logger.info(
-            "Results of the dimensioning of the primary sedimentation tank")
-        pri_sed_df().to_excel(
-            os.path.abspath("../pri_sed_results.xlsx"))
-        info_logger.info(pri_sed_df())
-        info_logger.info(
-            "Results of the dimensioning of the secondary sedimentation tank")
-        sec_sed_df().to_excel(
-            os.path.abspath("../sec_sed_results.xlsx"))
-        info_logger.info(sec_sed_df())
-        info_logger.info(
-            "Results of the dimensioning of the activated sludge tank")
-        act_sludge_df().to_excel(
-            os.path.abspath("../act_sludge_results.xlsx"))
-        info_logger.info(act_sludge_df())
+        info_logger.info(snapshot.wwtp_params)
+        # domain conditions checked before the design chain
+        reasons = feasibility_reasons(feasibility(snapshot.values)[0])
+        for reason in reasons:
+            warning_logger.warning(reason)
+        results = design_results(snapshot)
+        write_results(results, output)
+        for table, stage in DESIGN_TABLES.items():
+            info_logger.info(f"Results of the dimensioning of the {stage}")
+            info_logger.info(results[table])
         # log of warnings
-        warning_logger.warning("No warnings are reported")
+        if not reasons:
+            warning_logger.warning("No warnings are reported")
         # log of errors
         error_logger.error("No errors are reported")
 
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
-        print("Too many command-line arguments")
+        # command-line modes such as "sweep"
+        from cli import run_cli
+        sys.exit(run_cli(sys.argv[1:]))
     else:
         # run code and evaluate performance
         t0 = perf_counter()
@@ -0,0 +1,112 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from batch import *
+from data import *
+
+# Results summarized by the Monte Carlo analysis and their stage
+MC_RESULTS = {"V_AT": "act_sludge", "A_ST": "sec_sed", "h_tot": "sec_sed",
+              "OU_h": "act_sludge"}
+# Number of samples evaluated together in one vectorized pass
+MC_BLOCK_SIZE = 100000
+MC_PERCENTILES = [5, 50, 95]
+
+
+def range_distributions():
+    """
+    Uniform distributions over the ranges of config.py that SecSed
+    reduces to a single value (mean SVI and first thickening time)
+    :return: DICT with sample_parameter distribution specifications
+    """
+    svi = SVI_FAVOURABLE[TreatmentTarget.NITRIFICATION_DENITRIFICATION]
+    t_th = TTH_RANGES[WwtpType.WITH_DENITRIFICATION]
+    return {"SVI": ("uniform", *svi), "t_TH": ("uniform", *t_th)}
+
+
+def sample_parameter(rng, spec, size):
+    """
+    Draws samples of one parameter
+    :param rng: numpy.random.Generator object
+    :param spec: TUPLE with the name of a numpy.random.Generator
+    distribution followed by its parameters, e.g. ("normal", 5658, 500)
+    or ("uniform", 100, 150), or a FLOAT for a fixed value
+    :param size: INT number of samples
+    :return: FLOAT array with the samples
+    """
+    if np.isscalar(spec):
+        return np.full(size, float(spec))
+    return getattr(rng, spec[0])(*spec[1:], size=size)
+
+
+def monte_carlo_block(size, seed, distributions, base):
+    """
+    Samples and evaluates one block of the Monte Carlo analysis
+    :param size: INT number of samples of the block
+    :param seed: numpy.random.SeedSequence object of the block
+    :param distributions: DICT with the sampled parameters and their
+    sample_parameter specifications
+    :param base: ParamSnapshot object with the parameters not sampled
+    :return: DICT with the MC_RESULTS as keys and FLOAT arrays as
+    values (NaN for infeasible samples)
+    """
+    rng = np.random.default_rng(seed)
+    scenarios = dict(base.values)
+    # sorted to draw the parameters in the same order on every run
+    for name in sorted(distributions):
+        scenarios[name] = sample_parameter(rng, distributions[name], size)
+    sec = sec_sed_batch(scenarios)
+    scenarios["X_SS_AT"] = sec["X_SS_AT"].filled(np.nan)
+    stages = {"sec_sed": sec, "act_sludge": act_sludge_batch(scenarios)}
+    return {name: np.broadcast_to(stages[stage][name].astype(float)
+                                  .filled(np.nan), size)
+            for name, stage in MC_RESULTS.items()}
+
+
+def monte_carlo(distributions=None, n_samples=1000000, snapshot=None,
+                seed=None, workers=None, block_size=MC_BLOCK_SIZE,
+                percentiles=None):
+    """
+    Monte Carlo uncertainty analysis of the secondary sedimentation and
+    activated sludge tank dimensioning. The samples are split into
+    blocks with independent random streams, so the results only depend
+    on the seed and the block size, not on the number of workers
+    :param distributions: DICT with sample_parameter specifications of
+    the influent loads or other parameters, added to (and overriding)
+    range_distributions()
+    :param n_samples: INT number of samples
+    :param snapshot: ParamSnapshot object with the parameters not
+    sampled (if None, the input file is loaded)
+    :param seed: INT seed of the random streams (None for a random one)
+    :param workers: INT number of worker processes (None for one per
+    CPU, 1 to run in the calling process)
+    :param block_size: INT number of samples per block
+    :param percentiles: LIST of FLOATS with the percentiles to report
+    (default MC_PERCENTILES)
+    :return: DATAFRAME with the MC_RESULTS as index and the mean, the
+    percentiles and the share of feasible samples as columns
+    """
+    if snapshot is None:
+        snapshot = load_snapshot()
+    if percentiles is None:
+        percentiles = MC_PERCENTILES
+    all_distributions = range_distributions()
+    all_distributions.update(distributions or {})
+    sizes = [min(block_size, n_samples - start)
+             for start in range(0, n_samples, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = (sizes, seeds, repeat(all_distributions), repeat(snapshot))
+    if workers == 1 or len(sizes) == 1:
+        blocks = list(map(monte_carlo_block, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            blocks = list(pool.map(monte_carlo_block, *args))
+    rows = {}
+    for name in MC_RESULTS:
+        samples = np.concatenate([block[name] for block in blocks])
+        feasible = samples[~np.isnan(samples)]
+        row = {"Mean": feasible.mean() if feasible.size else np.nan}
+        for q in percentiles:
+            row[f"P{q:g}"] = (np.percentile(feasible, q) if feasible.size
+                              else np.nan)
+        row["Feasible"] = feasible.size / n_samples
+        rows[name] = row
+    return pd.DataFrame.from_dict(rows, orient="index")
@@ -0,0 +1,190 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from sweep import *
+
+# Decision variables of the optimizer and their default candidates
+# (grid_values specifications): smallest number of primary tanks,
+# return sludge ratio, sludge volume loading rate in L/(m²*h), number
+# of secondary tanks and nitrate in the effluent in mg/L (which sets
+# the recirculation and V_D/V_AT)
+OPTIMIZE_SPACE = {
+    "num_tanks": [2, 3, 4, 5, 6],
+    "rs": {"start": 0.5, "stop": 1.0, "num": 11},
+    "qsv": {"start": 300, "stop": 500, "num": 5},
+    "sec_tanks": [2, 3, 4, 5, 6, 7, 8],
+    "S_NO3_EST": {"start": 5, "stop": 12, "num": 15}
+}
+# Minimized objectives: total tank volume in m³ and oxygen uptake in
+# kgO2/h
+OPTIMIZE_OBJECTIVES = ["V_tot", "OU_h"]
+# Number of candidates evaluated together in one vectorized pass
+OPTIMIZE_CHUNK_SIZE = 5000
+
+
+def pareto_front(objectives):
+    """
+    Finds the candidates that no other candidate dominates, i.e. is at
+    least as good in every objective and better in one
+    :param objectives: FLOAT array with one row per candidate and one
+    column per minimized objective (NaN rows are ignored)
+    :return: BOOLEAN array, TRUE for the candidates of the front (one
+    of several identical candidates)
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    front = np.zeros(len(objectives), dtype=bool)
+    remaining = np.flatnonzero(~np.isnan(objectives).any(axis=1))
+    # in lexicographic order, the first remaining candidate is never
+    # dominated by the ones after it
+    remaining = remaining[np.lexsort(objectives[remaining].T[::-1])]
+    while remaining.size:
+        best = remaining[0]
+        front[best] = True
+        dominated = (objectives[remaining] >= objectives[best]).all(axis=1)
+        remaining = remaining[~dominated]
+    return front
+
+
+def pri_stage(num_tanks, snapshot):
+    """
+    Primary sedimentation for every candidate smallest number of tanks
+    :param num_tanks: ARRAY with the candidate numbers of tanks
+    :param snapshot: ParamSnapshot object with the plant parameters
+    :return: DICT with the fewest tanks of a feasible layout ("Quantity")
+    and its volume in m³ ("V_pri"); the volume does not depend on the
+    number of tanks
+    :raises ValueError: if no candidate has a feasible layout
+    """
+    pri = pri_sed_batch(snapshot.values, num_tanks=num_tanks)
+    quantity = pri["Quantity"].filled(np.nan)
+    if np.isnan(quantity).all():
+        raise ValueError("No primary sedimentation layout for the "
+                         "candidate numbers of tanks")
+    best = np.nanargmin(quantity)
+    return {"Quantity": int(quantity[best]),
+            "V_pri": float(pri["Vmin"][best])}
+
+
+def sec_stage(rs, qsv, sec_tanks, snapshot):
+    """
+    Secondary sedimentation on the grid of return sludge ratios and
+    sludge volume loading rates, pruning q_A > 1.6 and h_tot < 3 before
+    the activated sludge tank is evaluated
+    :param rs: ARRAY with the candidate return sludge ratios
+    :param qsv: ARRAY with the candidate sludge volume loading rates
+    :param sec_tanks: ARRAY with the candidate numbers of tanks
+    :param snapshot: ParamSnapshot object with the plant parameters
+    :return: TUPLE with a DATAFRAME of the feasible (rs, qsv) pairs and
+    a DICT with the number of pairs pruned per reason
+    """
+    rs, qsv = (a.ravel() for a in np.meshgrid(rs, qsv, indexing="ij"))
+    sec = sec_sed_batch(snapshot.values, rs=rs, qsv=qsv)
+    a_st_tot = (snapshot.values["Q comb"] / 24) / sec["q_A"]
+    # fewest candidate tanks allowed by the a_st tank-count ladder
+    ladder = sec["Quantity"].astype(float).filled(np.inf)
+    sec_tanks = np.sort(sec_tanks)
+    index = np.searchsorted(sec_tanks, ladder)
+    high_q_a = np.ma.getmaskarray(sec["q_A"])
+    low_h_tot = ~high_q_a & np.ma.getmaskarray(sec["h_tot"])
+    no_tanks = ~high_q_a & ~low_h_tot & (index == sec_tanks.size)
+    keep = ~(high_q_a | low_h_tot | no_tanks)
+    tanks = sec_tanks[np.minimum(index, sec_tanks.size - 1)]
+    df = pd.DataFrame({
+        "rs": rs, "qsv": qsv, "X_SS_AT": sec["X_SS_AT"].filled(np.nan),
+        "q_A": sec["q_A"].filled(np.nan), "h_tot": sec["h_tot"].filled(
+            np.nan), "A_ST_tot": a_st_tot.filled(np.nan), "sec_tanks": tanks
+    })[keep]
+    df["V_sec"] = df["A_ST_tot"] * df["h_tot"]
+    pruned = {"q_A > 1.6": int(high_q_a.sum()),
+              "h_tot < 3": int(low_h_tot.sum()),
+              "sec_tanks": int(no_tanks.sum())}
+    return df.reset_index(drop=True), pruned
+
+
+def act_chunk(candidates, snapshot):
+    """
+    Activated sludge tank for a chunk of candidates
+    :param candidates: DATAFRAME with "X_SS_AT" and "S_NO3_EST"
+    :param snapshot: ParamSnapshot object with the plant parameters
+    :return: DATAFRAME with V_AT, OU_h, V_D/V_AT, RC and n_D (NaN if
+    infeasible)
+    """
+    scenarios = dict(snapshot.values)
+    scenarios.update({name: candidates[name].to_numpy()
+                      for name in ["X_SS_AT", "S_NO3_EST"]})
+    act = act_sludge_batch(scenarios)
+    return pd.DataFrame({name: np.broadcast_to(
+        act[name].astype(float).filled(np.nan), len(candidates))
+        for name in ["V_AT", "V_D/V_AT", "RC", "n_D", "OU_h"]},
+        index=candidates.index)
+
+
+def optimize(space=None, snapshot=None, workers=None,
+             chunk_size=OPTIMIZE_CHUNK_SIZE, front_only=True):
+    """
+    Multi-objective design optimizer minimizing the total tank volume
+    (primary and secondary sedimentation and activated sludge tank) and
+    the oxygen uptake OU_h together. Infeasible regions are pruned stage
+    by stage (q_A > 1.6 and h_tot < 3 before the activated sludge tank,
+    then n_D < 0.7) and the remaining candidates are evaluated in
+    vectorized chunks over a process pool. The numbers of tanks do not
+    change the volumes, so the fewest feasible ones are used
+    :param space: DICT with OPTIMIZE_SPACE variables overriding their
+    default candidates (grid_values specifications)
+    :param snapshot: ParamSnapshot object with the plant parameters
+    (if None, the input file is loaded)
+    :param workers: INT number of worker processes (None for one per
+    CPU, 1 to run in the calling process)
+    :param chunk_size: INT number of candidates per chunk
+    :param front_only: FALSE to return every feasible candidate with a
+    "Pareto" column instead of the Pareto front only
+    :return: DATAFRAME with the decision variables and the results of
+    the candidates, sorted by the objectives. Its attrs hold the number
+    of "Candidates" and the number "Pruned" per reason
+    """
+    if snapshot is None:
+        snapshot = load_snapshot()
+    unknown = [name for name in space or {} if name not in OPTIMIZE_SPACE]
+    if unknown:
+        raise KeyError(f"Unknown decision variables: {unknown}")
+    values = {name: grid_values(spec)
+              for name, spec in dict(OPTIMIZE_SPACE, **space or {}).items()}
+    pri = pri_stage(values["num_tanks"], snapshot)
+    sec, pruned = sec_stage(values["rs"], values["qsv"],
+                            values["sec_tanks"], snapshot)
+    # only the feasible sedimentation designs meet the nitrate values
+    n_no3 = values["S_NO3_EST"].size
+    candidates = sec.loc[sec.index.repeat(n_no3)].reset_index(drop=True)
+    candidates["S_NO3_EST"] = np.tile(values["S_NO3_EST"], len(sec))
+    chunks = [candidates.iloc[i:i + chunk_size]
+              for i in range(0, len(candidates), chunk_size)]
+    if workers == 1 or len(chunks) <= 1:
+        results = list(map(act_chunk, chunks, repeat(snapshot)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(act_chunk, chunks, repeat(snapshot)))
+    if results:
+        candidates = candidates.join(pd.concat(results))
+    else:
+        candidates = candidates.reindex(
+            columns=list(candidates) + ["V_AT", "V_D/V_AT", "RC", "n_D",
+                                        "OU_h"])
+    low_n_d = candidates["n_D"].isna() & candidates["RC"].notna()
+    feasible = candidates["V_AT"].notna() & candidates["OU_h"].notna()
+    pruned["n_D < 0.7"] = int(low_n_d.sum())
+    pruned["infeasible"] = int((~feasible & ~low_n_d).sum())
+    candidates = candidates[feasible & ~low_n_d].copy()
+    candidates.insert(0, "num_tanks", pri["Quantity"])
+    candidates["V_pri"] = pri["V_pri"]
+    candidates["V_tot"] = (candidates["V_pri"] + candidates["V_sec"]
+                           + candidates["V_AT"])
+    candidates["Pareto"] = pareto_front(
+        candidates[OPTIMIZE_OBJECTIVES].to_numpy())
+    if front_only:
+        candidates = candidates[candidates["Pareto"]].drop(
+            columns="Pareto")
+    candidates = candidates.sort_values(OPTIMIZE_OBJECTIVES).reset_index(
+        drop=True)
+    candidates.attrs["Candidates"] = (
+        values["rs"].size * values["qsv"].size * n_no3)
+    candidates.attrs["Pruned"] = pruned
+    return candidates
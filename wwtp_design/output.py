@@ -0,0 +1,252 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+
+class ResultWriter:
+    def __init__(self, path):
+        """
+        For initializing a ResultWriter object that writes result
+        tables chunk by chunk. Every table is started by its first
+        chunk and extended by the following ones
+        :param path: STR of the output file
+        :return: None
+        """
+        self.path = os.path.abspath(path)
+        self.rows = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def table_path(self, table):
+        """
+        Path of the file of a table for the writers with one file per
+        table
+        :param table: STR of the table name (None for the output file)
+        :return: STR of the file path
+        """
+        if table is None:
+            return self.path
+        stem, extension = os.path.splitext(self.path)
+        return f"{stem}_{table}{extension}"
+
+    def write(self, df, table=None):
+        """
+        Appends a chunk of rows to a table
+        :param df: DATAFRAME with the rows (the index is written too)
+        :param table: STR of the table name (None for a single table)
+        :return: None
+        """
+        self.write_chunk(df, table, self.rows.get(table, 0))
+        self.rows[table] = self.rows.get(table, 0) + len(df)
+
+    def write_chunk(self, df, table, start):
+        """
+        Writes a chunk of rows, implemented by each writer
+        :param df: DATAFRAME with the rows
+        :param table: STR of the table name or None
+        :param start: INT number of rows already written to the table
+        :return: None
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Finishes the output files
+        :return: None
+        """
+
+
+class ExcelResultWriter(ResultWriter):
+    def __init__(self, path):
+        """
+        Writer of a single workbook with one sheet per table. openpyxl
+        keeps the whole workbook in memory, so large batches should use
+        one of the other writers
+        :param path: STR of the .xlsx file
+        :return: None
+        """
+        ResultWriter.__init__(self, path)
+        self.excel = None
+
+    def write_chunk(self, df, table, start):
+        if self.excel is None:
+            self.excel = pd.ExcelWriter(self.path)
+        df.to_excel(self.excel, sheet_name=table or "Sheet1",
+                    startrow=start + 1 if start else 0, header=not start)
+
+    def close(self):
+        if self.excel is not None:
+            self.excel.close()
+            self.excel = None
+
+
+class CsvResultWriter(ResultWriter):
+    def write_chunk(self, df, table, start):
+        df.to_csv(self.table_path(table), mode="a" if start else "w",
+                  header=not start)
+
+
+class JsonLinesResultWriter(ResultWriter):
+    def __init__(self, path):
+        """
+        Writer of a single JSON Lines file with one object per row. The
+        rows of named tables carry the table name in the "table" key
+        :param path: STR of the .jsonl file
+        :return: None
+        """
+        ResultWriter.__init__(self, path)
+        self.file = None
+
+    def write_chunk(self, df, table, start):
+        if self.file is None:
+            self.file = open(self.path, "w", encoding="utf-8")
+        df = df.reset_index()
+        if table is not None:
+            df.insert(0, "table", table)
+        self.file.write(df.to_json(orient="records", lines=True,
+                                   force_ascii=False).rstrip("\n") + "\n")
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class ParquetResultWriter(ResultWriter):
+    def __init__(self, path):
+        """
+        Writer of one Parquet file per table, with one row group per
+        chunk. Needs the optional pyarrow package
+        :param path: STR of the .parquet file
+        :return: None
+        """
+        ResultWriter.__init__(self, path)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Writing Parquet results requires pyarrow "
+                              "(pip install pyarrow)")
+        self.pa = pyarrow
+        self.writers = {}
+
+    def write_chunk(self, df, table, start):
+        # columns mixing numbers with messages (e.g. infeasible designs)
+        # are stored as text
+        df = df.astype({column: str for column in df.columns
+                        if df[column].dtype == object})
+        chunk = self.pa.Table.from_pandas(df)
+        if table not in self.writers:
+            self.writers[table] = self.pa.parquet.ParquetWriter(
+                self.table_path(table), chunk.schema)
+        self.writers[table].write_table(chunk)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+
+
+class PartitionedResultWriter(ResultWriter):
+    def __init__(self, path, file_format="npy"):
+        """
+        Writer of one file per chunk ("part-00000.npy", ...) in a
+        directory, so that every chunk is written and released on its
+        own. NPY partitions hold the index and the numeric columns as
+        one FLOAT array, with the column names in "columns.json";
+        Parquet partitions need the optional pyarrow package
+        :param path: STR of the output directory (created if needed)
+        :param file_format: STR "npy" or "parquet"
+        :return: None
+        """
+        ResultWriter.__init__(self, path)
+        if file_format not in ("npy", "parquet"):
+            raise ValueError(f"Unknown partition format '{file_format}', "
+                             f"use 'npy' or 'parquet'")
+        if file_format == "parquet":
+            try:
+                import pyarrow
+            except ImportError:
+                raise ImportError("Writing Parquet partitions requires "
+                                  "pyarrow (pip install pyarrow)")
+        self.file_format = file_format
+        self.parts = 0
+        os.makedirs(self.path, exist_ok=True)
+
+    def table_path(self, table):
+        directory = (self.path if table is None
+                     else os.path.join(self.path, table))
+        return os.path.join(directory,
+                            f"part-{self.parts:05d}.{self.file_format}")
+
+    def write_chunk(self, df, table, start):
+        path = self.table_path(table)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df = df.reset_index()
+        df.columns = [str(column) for column in df.columns]
+        if self.file_format == "parquet":
+            df.to_parquet(path)
+        else:
+            if not start:
+                with open(os.path.join(os.path.dirname(path),
+                                       "columns.json"), "w") as file:
+                    json.dump(list(df.columns), file)
+            np.save(path, df.to_numpy(dtype=float))
+        self.parts += 1
+
+
+def read_partitions(path):
+    """
+    Reads the partitions of a PartitionedResultWriter one by one
+    :param path: STR of the directory of a table
+    :return: generator of DATAFRAMES, one per partition, in order
+    """
+    parts = sorted(name for name in os.listdir(path)
+                   if name.startswith("part-"))
+    columns = None
+    for name in parts:
+        if name.endswith(".parquet"):
+            yield pd.read_parquet(os.path.join(path, name))
+            continue
+        if columns is None:
+            with open(os.path.join(path, "columns.json")) as file:
+                columns = json.load(file)
+        yield pd.DataFrame(np.load(os.path.join(path, name)),
+                           columns=columns)
+
+
+# Result writers by file extension
+RESULT_WRITERS = {".xlsx": ExcelResultWriter, ".csv": CsvResultWriter,
+                  ".jsonl": JsonLinesResultWriter,
+                  ".parquet": ParquetResultWriter}
+
+
+def result_writer(path):
+    """
+    Chooses the result writer from the extension of the output file
+    :param path: STR of the output file (.xlsx, .csv, .jsonl or .parquet)
+    :return: ResultWriter object
+    :raises ValueError: if the extension has no writer
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in RESULT_WRITERS:
+        raise ValueError(f"No result writer for '{extension}' files, use "
+                         f"one of {sorted(RESULT_WRITERS)}")
+    return RESULT_WRITERS[extension](path)
+
+
+def write_results(tables, path):
+    """
+    Writes complete result tables through the writer of the output file
+    :param tables: DICT with table names as keys and DATAFRAMES as values
+    :param path: STR of the output file
+    :return: None
+    """
+    with result_writer(path) as writer:
+        for table, df in tables.items():
+            writer.write(df, table)
@@ -0,0 +1,127 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+from main import *
+
+# Results copied from every plant into the summary table (stage, name)
+PLANT_SUMMARY = [("pri_sed", "Quantity"), ("pri_sed", "Vmin"),
+                 ("sec_sed", "Quantity"), ("sec_sed", "A_ST"),
+                 ("sec_sed", "h_tot"), ("act_sludge", "V_AT"),
+                 ("act_sludge", "OU_h")]
+
+
+def expand_inputs(inputs):
+    """
+    Expands input files, directories (their .xlsx files) and glob
+    patterns into a list of workbooks
+    :param inputs: LIST of STR with files, directories or patterns
+    :return: LIST of STR with the absolute paths, in the given order
+    and without repetitions
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            found = sorted(glob.glob(os.path.join(item, "*.xlsx")))
+        elif glob.has_magic(item):
+            found = sorted(glob.glob(item, recursive=True))
+        else:
+            found = [item]
+        for path in found:
+            # skips the lock files of opened workbooks
+            if not os.path.basename(path).startswith("~$"):
+                path = os.path.abspath(path)
+                if path not in paths:
+                    paths.append(path)
+    return paths
+
+
+def plant_names(paths):
+    """
+    Names the plants after their input files, numbering repeated names
+    :param paths: LIST of STR with the input files
+    :return: LIST of STR with one unique name per file
+    """
+    names = []
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, i = stem, 1
+        while name in names:
+            i += 1
+            name = f"{stem}_{i}"
+        names.append(name)
+    return names
+
+
+def failed_row(path, name, error):
+    """
+    Summary row of a plant whose design failed
+    :param path: STR of the input workbook
+    :param name: STR of the plant name
+    :param error: EXCEPTION raised while designing the plant
+    :return: DICT with the summary row of the plant
+    """
+    return {"Plant": name, "Input": path, "Status": "failed",
+            "Error": f"{type(error).__name__}: {error}", "Output": ""}
+
+
+def design_plant(path, name, outdir, extension=".xlsx"):
+    """
+    Designs the plant of one input workbook and writes its results
+    :param path: STR of the input workbook
+    :param name: STR of the plant name used for the output file
+    :param outdir: STR of the output directory
+    :param extension: STR of the output format (see RESULT_WRITERS)
+    :return: DICT with the summary row of the plant. Any error is
+    reported in the "Error" column instead of being raised
+    """
+    try:
+        snapshot = load_snapshot(path)
+        results = design_results(snapshot)
+        output = os.path.join(outdir, f"{name}_results{extension}")
+        write_results(results, output)
+    except Exception as error:
+        return failed_row(path, name, error)
+    row = {"Plant": name, "Input": path, "Status": "ok", "Error": "",
+           "Output": output}
+    for stage, param in PLANT_SUMMARY:
+        row[f"{stage}.{param}"] = results[stage]["Results"].get(param)
+    return row
+
+
+def design_plants(inputs, outdir, workers=None, extension=".xlsx"):
+    """
+    Designs every plant workbook concurrently in a process pool. A
+    failing file is reported in the summary without stopping the rest
+    :param inputs: LIST of STR with files, directories or glob patterns
+    :param outdir: STR of the output directory (created if needed)
+    :param workers: INT number of worker processes (None for one per
+    CPU, 1 to run in the calling process)
+    :param extension: STR of the output format (see RESULT_WRITERS)
+    :return: DATAFRAME with one summary row per input file
+    """
+    if extension not in RESULT_WRITERS:
+        raise ValueError(f"No result writer for '{extension}' files, use "
+                         f"one of {sorted(RESULT_WRITERS)}")
+    os.makedirs(outdir, exist_ok=True)
+    paths = expand_inputs(inputs)
+    jobs = list(zip(paths, plant_names(paths)))
+    outdir = os.path.abspath(outdir)
+    if workers == 1 or len(jobs) <= 1:
+        rows = [design_plant(path, name, outdir, extension)
+                for path, name in jobs]
+    else:
+        rows = [None] * len(jobs)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(design_plant, path, name, outdir,
+                                   extension): i
+                       for i, (path, name) in enumerate(jobs)}
+            for future in as_completed(futures):
+                i = futures[future]
+                # a crashed worker (BrokenProcessPool), a result that
+                # cannot be pickled or a MemoryError only fails its plant
+                try:
+                    rows[i] = future.result()
+                except Exception as error:
+                    rows[i] = failed_row(*jobs[i], error)
+    columns = (["Plant", "Input", "Status", "Error", "Output"]
+               + [f"{stage}.{param}" for stage, param in PLANT_SUMMARY])
+    return pd.DataFrame(rows, columns=columns)
@@ -0,0 +1,145 @@
+from sweep import *
+
+# Plant parameters every plant of a portfolio needs (those of the
+# input file)
+PORTFOLIO_PARAMS = ["Population", "Q d,aM", "Q DW,aM", "Q DW2h,max",
+                    "Q WW,aM", "Q inf,aM", "Q comb", "B d,BOD5",
+                    "B d,Ntot", "B d,NO3-N", "B d,Ptot", "Tdim"]
+# Optional parameters that can be given per plant as well
+PORTFOLIO_OPTIONAL = list(ACT_SLUDGE_ASSUMPTIONS) + list(SEC_SED_DEFAULTS)
+# Values of the optional parameters for the plants that do not set them
+PORTFOLIO_DEFAULTS = dict(ACT_SLUDGE_ASSUMPTIONS, **SEC_SED_DEFAULTS)
+# Column with the plant names in the row layout
+PORTFOLIO_NAME = "Plant"
+
+
+def sheet_table(sheet, name):
+    """
+    Converts one worksheet of a portfolio into parameter rows. A sheet
+    with a "Value" header cell is one plant in the layout of the input
+    file, named after the sheet; any other sheet has a header row with
+    the parameter names and one row per plant
+    :param sheet: DATAFRAME of the raw cells (read without header)
+    :param name: STR of the sheet name
+    :return: DATAFRAME with one row per plant and one column per
+    parameter
+    """
+    cells = sheet.dropna(how="all").dropna(axis=1, how="all")
+    if cells.empty:
+        return pd.DataFrame()
+    header = cells.index[(cells.iloc[:, 1:] == "Value").any(axis=1)]
+    if len(header):
+        params = cells.loc[header[0]:].iloc[1:]
+        return pd.DataFrame([params.iloc[:, 1].to_numpy()],
+                            columns=params.iloc[:, 0].to_numpy(),
+                            index=[name])
+    table = pd.DataFrame(cells.iloc[1:].to_numpy(),
+                         columns=cells.iloc[0].to_numpy())
+    return plant_rows(table, name)
+
+
+def plant_rows(table, stem):
+    """
+    Indexes a table in the row layout by the plant names
+    :param table: DATAFRAME with one row per plant
+    :param stem: STR naming the plants if there is no PORTFOLIO_NAME
+    column ("<stem>_1", "<stem>_2", ...)
+    :return: DATAFRAME indexed by the plant names
+    """
+    if PORTFOLIO_NAME in table:
+        return table.set_index(PORTFOLIO_NAME)
+    table.index = [f"{stem}_{i + 1}" for i in range(len(table))]
+    return table
+
+
+def check_portfolio(table):
+    """
+    Validates a portfolio once for all its plants
+    :param table: DATAFRAME with one row per plant
+    :return: DATAFRAME with the parameters as FLOAT columns, the empty
+    optional parameters set to PORTFOLIO_DEFAULTS
+    :raises ValueError: listing the missing, unknown and non-numeric
+    parameters and the repeated plant names
+    """
+    errors = []
+    missing = [name for name in PORTFOLIO_PARAMS if name not in table]
+    if missing:
+        errors.append(f"missing parameters {missing}")
+    unknown = [name for name in table
+               if name not in PORTFOLIO_PARAMS + PORTFOLIO_OPTIONAL]
+    if unknown:
+        errors.append(f"unknown parameters {unknown}")
+    repeated = table.index[table.index.duplicated()].unique().tolist()
+    if repeated:
+        errors.append(f"repeated plants {repeated}")
+    values = table.apply(pd.to_numeric, errors="coerce")
+    for name in values:
+        bad = values[name].isna().to_numpy()
+        if name in PORTFOLIO_DEFAULTS:
+            # plants that do not set an optional parameter
+            bad = bad & table[name].notna().to_numpy()
+        if bad.any():
+            errors.append(f"'{name}' is not a number for "
+                          f"{values.index[bad].tolist()}")
+    if errors:
+        raise ValueError("Invalid portfolio: " + "; ".join(errors))
+    values = values.fillna({name: PORTFOLIO_DEFAULTS[name]
+                            for name in values if name in PORTFOLIO_DEFAULTS})
+    values.index.name = PORTFOLIO_NAME
+    return values.astype(float)
+
+
+def read_portfolio(path):
+    """
+    Reads the plants of a portfolio file in a single pass into one
+    parameter table. A workbook holds one plant per sheet (layout of
+    the input file) or one plant per row (header row with the parameter
+    names and an optional "Plant" column), or both; .csv and .parquet
+    files hold one plant per row
+    :param path: STR of the .xlsx, .csv or .parquet file
+    :return: DATAFRAME indexed by the plant names with one FLOAT column
+    per parameter, validated by check_portfolio
+    :raises ValueError: if the format is unknown or the portfolio is
+    invalid
+    """
+    stem, extension = os.path.splitext(os.path.basename(path))
+    extension = extension.lower()
+    if extension == ".xlsx":
+        # every sheet is parsed from one opening of the workbook
+        sheets = pd.read_excel(path, sheet_name=None, header=None)
+        table = pd.concat([sheet_table(sheet, name)
+                           for name, sheet in sheets.items()])
+    elif extension == ".csv":
+        table = plant_rows(pd.read_csv(path), stem)
+    elif extension == ".parquet":
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError("Reading Parquet portfolios requires "
+                              "pyarrow (pip install pyarrow)")
+        table = plant_rows(pd.read_parquet(path), stem)
+    else:
+        raise ValueError(f"Unknown portfolio format '{extension}', use "
+                         f".xlsx, .csv or .parquet")
+    return check_portfolio(table)
+
+
+def design_portfolio(portfolio, chunk_size=SWEEP_CHUNK_SIZE):
+    """
+    Designs every plant of a portfolio with the batch functions, in
+    vectorized chunks instead of one workbook and one design per plant
+    :param portfolio: STR of a portfolio file or DATAFRAME returned by
+    read_portfolio
+    :param chunk_size: INT number of plants per chunk
+    :return: DATAFRAME indexed by the plant names with (stage,
+    parameter) columns as in sweep. Infeasible results are NaN
+    """
+    if isinstance(portfolio, str):
+        portfolio = read_portfolio(portfolio)
+    # every parameter is given per plant
+    base = make_snapshot({})
+    results = [sweep_chunk(portfolio.iloc[i:i + chunk_size], base)
+               for i in range(0, len(portfolio), chunk_size)]
+    if not results:
+        return pd.DataFrame(index=portfolio.index)
+    return pd.concat(results)
@@ -1,51 +1,81 @@
 from data import *
+from batch import *
 
 
 # Author: Lucas Tardio
 class PriSed(InputReader):
-    def __init__(self):
+    # starting values tracked as inputs of the design nodes
+    num_tanks = DesignInput()
+    width = DesignInput()
+
+    def __init__(self, snapshot=None):
         """
         For initializing a PriSed object with the given
         attributes and methods
+        :param snapshot: ParamSnapshot object with the plant parameters
+        (if None, the input file is loaded)
         :return: None
         """
-        InputReader.__init__(self)
+        InputReader.__init__(self, snapshot=snapshot)
         # starting values
         self.num_tanks = 2
         self.width = 1
-        self.pri_deep = (
-            PARAMS_PRI)["Depth"][("PS combined with activated sludge"
-                                  " process (with excess sludge)")]
+        self.pri_deep = DEPTH_PRI
 
+    @design_node
     def pri_surf(self):
         """
         Rectangular primary sedimentation tank surface calculation
         :return: FLOAT result in m²
         """
-        return (
-                (self.wwtp_params["Value"]["Q comb"] / 24)
-                / PARAMS_PRI["q_A"]
-                ["PS combined with activated sludge process"
-                 " (with excess sludge)"][1]
-        )
+        return (self.param("Q comb") / 24) / Q_A_PRI
 
+    @design_node
     def cross_volume(self):
         """
         Calculation of cross-section and volume for each rectangular
-        primary sedimentation tank
+        primary sedimentation tank, starting from self.num_tanks and
+        self.width (which are not modified)
         :return: TUPLE with FLOATS of area in m², num_tanks, length
         in m, width in m, and volume in m³
         """
-        # Maximum width of 10 m according to recommendations
-        while self.width <= 10:
-            area = self.pri_surf() / self.num_tanks
-            length = area / self.width
-            ratio = self.width / length
-            volume = self.num_tanks * self.width * self.pri_deep * length
-            if 0.1 <= ratio <= 0.2:
-                return area, self.num_tanks, length, self.width, volume
-            elif self.width >= 10:
-                self.num_tanks += 1
-                self.width = 1
-            else:
-                self.width += 0.5
+        area, num_tanks, length, width = (
+            value[0] for value in pri_layout(self.pri_surf(),
+                                             self.num_tanks, self.width))
+        if np.isnan(area):
+            return "No rectangular tank layout within the width limits"
+        volume = num_tanks * width * self.pri_deep * length
+        return area, int(num_tanks), length, width, volume
+
+    def layouts(self, max_tanks=None):
+        """
+        Lists all the feasible rectangular tank layouts on the width
+        grid, ranked by volume (which is the same for every layout,
+        total surface times depth), number of tanks and width
+        :param max_tanks: INT of the largest number of tanks to list
+        (if None, 10 tank counts from the smallest feasible one)
+        :return: DATAFRAME with one row per layout and the same
+        columns as main.pri_sed_df
+        """
+        surf = self.pri_surf()
+        n_min = max(self.num_tanks, int(
+            np.ceil(surf * PRI_RATIO_MIN / PRI_WIDTH_MAX ** 2)))
+        if max_tanks is None:
+            max_tanks = n_min + 9
+        n, w = np.meshgrid(
+            np.arange(n_min, max_tanks + 1),
+            np.arange(PRI_WIDTH_MIN, PRI_WIDTH_MAX + PRI_WIDTH_STEP / 2,
+                      PRI_WIDTH_STEP), indexing="ij")
+        area = surf / n
+        ratio = pri_ratio(area, w)
+        fits = (PRI_RATIO_MIN <= ratio) & (ratio <= PRI_RATIO_MAX)
+        df = pd.DataFrame({
+            "Tank_surf": surf, "Depth": self.pri_deep,
+            "Area_per_tank": area[fits], "Quantity": n[fits],
+            "Length": area[fits] / w[fits], "Width": w[fits],
+            "Vmin": n[fits] * w[fits] * self.pri_deep * area[fits] / w[fits]
+        })
+        # rounding keeps floating point noise out of the volume ranking
+        df = df.sort_values(["Vmin", "Quantity", "Width"], kind="stable",
+                            key=lambda column: column.round(6))
+        return df.reset_index(drop=True)
@@ -0,0 +1,265 @@
+from functools import wraps
+from time import perf_counter
+import json
+import tracemalloc
+
+# Functions of main.py profiled as design stages
+STAGE_FUNCTIONS = ["pri_sed_df", "sec_sed_df", "act_sludge_df",
+                   "design_results"]
+
+
+class Frame:
+    def __init__(self, name, stage, start, memory_start):
+        """
+        For initializing a Frame object of one running call
+        :param name: STR of the profiled function
+        :param stage: STR of the design stage the call belongs to
+        :param start: FLOAT of the perf_counter value at the call
+        :param memory_start: INT of the traced memory in B at the call
+        :return: None
+        """
+        self.name = name
+        self.stage = stage
+        self.start = start
+        self.children = 0.0
+        self.memory_start = memory_start
+        self.memory_peak = 0
+
+
+class Profiler:
+    def __init__(self, memory=False):
+        """
+        For initializing a Profiler object. The registered functions are
+        only replaced by instrumented ones while the profiler is active
+        (with statement), so there is no overhead outside of it
+        :param memory: TRUE to record the peak traced memory of every
+        call with tracemalloc (much slower)
+        :return: None
+        """
+        self.memory = memory
+        self.targets = []
+        self.originals = []
+        self.stack = []
+        self.stats = {}
+        self.stage_stats = {}
+        self.stacks = {}
+        self.events = []
+        self.origin = None
+
+    def instrument(self, owner, names=None, prefix=None):
+        """
+        Registers functions to be profiled
+        :param owner: class or DICT namespace (e.g. the globals of a
+        module) holding the functions
+        :param names: LIST of STR with the function names (if None, every
+        function defined in the class)
+        :param prefix: STR put before the names in the reports (default
+        the class name)
+        :return: None
+        """
+        namespace = owner if isinstance(owner, dict) else vars(owner)
+        if names is None:
+            names = [name for name, value in namespace.items()
+                     if callable(value) and not isinstance(value, type)
+                     and (not name.startswith("__") or name == "__init__")]
+        if prefix is None and not isinstance(owner, dict):
+            prefix = owner.__name__
+        for name in names:
+            label = f"{prefix}.{name}" if prefix else name
+            self.targets.append((owner, name, label))
+
+    def __enter__(self):
+        self.origin = perf_counter()
+        if self.memory:
+            tracemalloc.start()
+        for owner, name, label in self.targets:
+            original = (owner[name] if isinstance(owner, dict)
+                        else vars(owner)[name])
+            self.originals.append((owner, name, original))
+            self.set(owner, name, self.wrap(original, label))
+        return self
+
+    def __exit__(self, *exc_info):
+        for owner, name, original in reversed(self.originals):
+            self.set(owner, name, original)
+        self.originals = []
+        if self.memory:
+            tracemalloc.stop()
+
+    @staticmethod
+    def set(owner, name, value):
+        """
+        Sets a function of a class or of a DICT namespace
+        :param owner: class or DICT
+        :param name: STR of the function name
+        :param value: function
+        :return: None
+        """
+        if isinstance(owner, dict):
+            owner[name] = value
+        else:
+            setattr(owner, name, value)
+
+    def wrap(self, fun, label):
+        """
+        Instrumented version of a function
+        :param fun: a function
+        :param label: STR of the name used in the reports
+        :return: wrapper function recording the call
+        """
+        @wraps(fun)
+        def wrapper(*args, **kwargs):
+            self.enter(label)
+            try:
+                return fun(*args, **kwargs)
+            finally:
+                self.exit()
+        return wrapper
+
+    def traced_memory(self):
+        """
+        Current and peak memory traced by tracemalloc
+        :return: TUPLE with the current and the peak traced memory in B
+        (zeros without memory profiling)
+        """
+        return tracemalloc.get_traced_memory() if self.memory else (0, 0)
+
+    def enter(self, label):
+        """
+        Opens the frame of a call
+        :param label: STR of the profiled function
+        :return: None
+        """
+        current, peak = self.traced_memory()
+        stage = None
+        if self.stack:
+            parent = self.stack[-1]
+            parent.memory_peak = max(parent.memory_peak,
+                                     peak - parent.memory_start)
+            stage = parent.stage
+        # calls belong to the innermost stage function around them
+        if label.split(".")[-1] in STAGE_FUNCTIONS:
+            stage = label
+        if self.memory:
+            tracemalloc.reset_peak()
+        self.stack.append(Frame(label, stage, perf_counter(), current))
+
+    def exit(self):
+        """
+        Closes the frame of the running call and records its statistics
+        :return: None
+        """
+        end = perf_counter()
+        frame = self.stack.pop()
+        elapsed = end - frame.start
+        self_time = elapsed - frame.children
+        peak = max(frame.memory_peak,
+                   self.traced_memory()[1] - frame.memory_start)
+        if self.stack:
+            parent = self.stack[-1]
+            parent.children += elapsed
+            parent.memory_peak = max(parent.memory_peak,
+                                     peak + frame.memory_start
+                                     - parent.memory_start)
+        if self.memory:
+            tracemalloc.reset_peak()
+        tables = [self.stats]
+        if frame.stage is not None:
+            tables.append(self.stage_stats.setdefault(frame.stage, {}))
+        for table in tables:
+            stats = table.setdefault(frame.name, {
+                "calls": 0, "cumulative_s": 0.0, "self_s": 0.0,
+                "peak_memory_kib": 0.0})
+            stats["calls"] += 1
+            stats["self_s"] += self_time
+            stats["peak_memory_kib"] = max(stats["peak_memory_kib"],
+                                           peak / 1024)
+            # recursive calls are only counted once in the cumulative time
+            if all(f.name != frame.name for f in self.stack):
+                stats["cumulative_s"] += elapsed
+        stack = ";".join([f.name for f in self.stack] + [frame.name])
+        self.stacks[stack] = self.stacks.get(stack, 0.0) + self_time
+        self.events.append({
+            "name": frame.name, "cat": frame.stage or "design", "ph": "X",
+            "ts": (frame.start - self.origin) * 1e6, "dur": elapsed * 1e6,
+            "pid": 1, "tid": 1})
+
+    def report(self):
+        """
+        Summary of the profiled calls
+        :return: DICT with the statistics per function ("functions") and
+        per design stage ("stages"), sorted by cumulative time
+        """
+        def ranked(table):
+            return dict(sorted(table.items(),
+                               key=lambda item: -item[1]["cumulative_s"]))
+
+        return {"memory": self.memory, "functions": ranked(self.stats),
+                "stages": {stage: ranked(table)
+                           for stage, table in self.stage_stats.items()}}
+
+    def write_json(self, path):
+        """
+        Writes the report as JSON
+        :param path: STR of the output file
+        :return: None
+        """
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+
+    def write_chrome_trace(self, path):
+        """
+        Writes every call as a Chrome trace event (chrome://tracing,
+        Perfetto or speedscope)
+        :param path: STR of the output file
+        :return: None
+        """
+        with open(path, "w") as file:
+            json.dump({"traceEvents": self.events,
+                       "displayTimeUnit": "ms"}, file)
+
+    def write_collapsed(self, path):
+        """
+        Writes the self time in µs of every call stack in the collapsed
+        format of flamegraph.pl and speedscope
+        :param path: STR of the output file
+        :return: None
+        """
+        with open(path, "w") as file:
+            for stack, seconds in self.stacks.items():
+                file.write(f"{stack} {round(seconds * 1e6)}\n")
+
+    def write_all(self, prefix):
+        """
+        Writes the JSON report (prefix.json), the Chrome trace
+        (prefix.trace.json) and the collapsed stacks (prefix.folded)
+        :param prefix: STR of the path of the output files without
+        extension
+        :return: None
+        """
+        self.write_json(prefix + ".json")
+        self.write_chrome_trace(prefix + ".trace.json")
+        self.write_collapsed(prefix + ".folded")
+
+
+def design_profiler(stages=None, memory=False):
+    """
+    Profiler of the design chain: every method of ActSludge, SecSed and
+    PriSed, InputReader.__init__ and the stage functions of main.py
+    :param stages: DICT namespace with the STAGE_FUNCTIONS (default the
+    globals of main.py, pass those of __main__ when run as a script)
+    :param memory: TRUE to record the peak traced memory
+    :return: Profiler object
+    """
+    from act_sludge import ActSludge, SecSed, InputReader
+    from pri_sed import PriSed
+    if stages is None:
+        import main
+        stages = vars(main)
+    profiler = Profiler(memory)
+    for cls in (ActSludge, SecSed, PriSed):
+        profiler.instrument(cls)
+    profiler.instrument(InputReader, ["__init__"])
+    profiler.instrument(stages, [name for name in STAGE_FUNCTIONS
+                                 if name in stages])
+    return profiler
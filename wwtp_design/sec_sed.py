@@ -4,19 +4,43 @@ from data import *
 
 # Author: Camila Alvarado
 class SecSed:
-    def __init__(self):
+    # design attributes tracked as inputs of the design nodes
+    rs = DesignInput()
+    qsv = DesignInput()
+
+    def __init__(self, snapshot=None):
         """
         For initializing a SecSed object with the given
         attributes and methods
+        :param snapshot: ParamSnapshot object with the plant parameters
+        (if None, the input file is loaded)
         :return: None
         """
+        if snapshot is None:
+            try:
+                snapshot = load_snapshot()
+            except FileNotFoundError:
+                # reported when a parameter is read
+                pass
+        self.snapshot = snapshot
         # return sludge ratio always 0.75 dimensionless
-        self.rs = 0.75
+        self.rs = RS_SEC
         # max sludge volume loading rate for horizontal flow (L/(m²*h))
-        self.qsv = 500
+        self.qsv = QSV_SEC
         # clean water and return flow zone with minimum depth of 0.5 m
-        self.h1 = 0.5
+        self.h1 = H1_SEC
+
+    def param(self, name):
+        """
+        Reads a plant parameter, recording it as input of the design
+        node being computed
+        :param name: STR of the parameter name
+        :return: value of the parameter
+        """
+        record_input(self, name)
+        return (self.snapshot or load_snapshot()).values[name]
 
+    @design_node
     def x_ss_at(self):
         """
         Calculation of suspended solids concentration in the activated
@@ -25,23 +49,19 @@ class SecSed:
         """
         return (self.rs * x_ss_rs()) / (1 + self.rs)
 
+    @design_node
     def q_a(self):
         """
         Calculation of the surface overflow rate of the secondary
         sedimentation tank
         :return: FLOAT result in m/h
         """
-        if (self.qsv /
-                (self.x_ss_at() *
-                 np.mean(SVI["Favourable"]["Nitrification"
-                                           " and denitrification"])) <= 1.6):
-            return (self.qsv
-                    / (self.x_ss_at() *
-                       np.mean(SVI["Favourable"]["Nitrification"
-                                                 " and denitrification"])))
+        if self.qsv / (self.x_ss_at() * SVI_DIM) <= 1.6:
+            return self.qsv / (self.x_ss_at() * SVI_DIM)
         else:
             return "The surface overflow flow rate q_a was exceeded"
 
+    @design_node
     def a_st(self):
         """
         Calculation of tank surface area and number of circular tanks
@@ -51,8 +71,7 @@ class SecSed:
         # With a limit value of 2827.43 m2 , the maximum diameter of
         # the collector bridge would be 60 m according to the
         # recommendations for stability in the collector bridge
-        a_st = ((InputReader().wwtp_params["Value"]["Q comb"] / 24) /
-                self.q_a())
+        a_st = (self.param("Q comb") / 24) / self.q_a()
         if a_st <= 2827.43:
             # Redundancy of 1 in case of collector bridge maintenance
             return a_st, 2
@@ -67,6 +86,7 @@ class SecSed:
         else:
             return (a_st / 6), 7
 
+    @design_node
     def diam_st(self):
         """
         Calculation of the diameter of each of the secondary
@@ -75,17 +95,16 @@ class SecSed:
         """
         return ((4 * self.a_st()[0]) / m.pi) ** (1/2)
 
+    @design_node
     def h2(self):
         """
         Calculation of the separation and return flow zone
         :return: FLOAT result in m
         """
         return ((0.5 * self.q_a() * (1 + self.rs)) /
-                (1 - ((self.x_ss_at() *
-                       np.mean(SVI["Favourable"]
-                               ["Nitrification and denitrification"]))
-                      / 1000)))
+                (1 - ((self.x_ss_at() * SVI_DIM) / 1000)))
 
+    @design_node
     def h3(self):
         """
         Calculation of the density flow and storage zone
@@ -93,17 +112,16 @@ class SecSed:
         """
         return (1.5 * 0.3 * self.qsv * (1 + self.rs)) / 500
 
+    @design_node
     def h4(self):
         """
         Calculation of the thickening and sludge removal zone
         :return: FLOAT result in m
         """
-        return ((self.x_ss_at() * self.q_a()
-                * (1 + self.rs) *
-                TTH["Thickening time"]
-                ["Activated sludge plants with denitrification"][0])
+        return ((self.x_ss_at() * self.q_a() * (1 + self.rs) * T_TH_DIM)
                 / x_ss_bs())
 
+    @design_node
     def h_tot(self):
         """
         Calculation of the total depth of the secondary circular
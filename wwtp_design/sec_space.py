@@ -0,0 +1,90 @@
+from batch import *
+
+# Candidate design choices of the secondary sedimentation tank: return
+# sludge ratio, sludge volume loading rate in L/(m²*h), SVI in mL/g
+# (favourable range for nitrification and denitrification), thickening
+# time in h (range for denitrification), return sludge facilities and
+# number of circular tanks
+SEC_SPACE = {
+    "rs": np.linspace(0.5, 1.0, 11),
+    "qsv": np.linspace(300, 500, 5),
+    "SVI": np.linspace(*SVI_FAVOURABLE[
+        TreatmentTarget.NITRIFICATION_DENITRIFICATION], 5),
+    "t_TH": np.linspace(*TTH_RANGES[WwtpType.WITH_DENITRIFICATION], 3),
+    "using": list(X_SS_RS_FACTORS),
+    "tanks": np.arange(2, 9)
+}
+# Largest surface per tank in m² (60 m diameter of the collector
+# bridge, see SecSed.a_st)
+SEC_MAX_TANK_AREA = 2827.43
+# Tanks kept in reserve for the maintenance of the collector bridge
+SEC_RESERVE_TANKS = 1
+
+
+def sec_sed_space(q_comb, **space):
+    """
+    Enumerates the full cross product of the secondary sedimentation
+    design choices as broadcast arrays, one axis per choice, instead of
+    one SecSed object per design. The depths only depend on rs, qsv,
+    SVI, t_TH and the facilities, so they are computed and checked
+    (q_A <= 1.6, positive h2, h_tot >= 3) once before the flows and
+    tank counts are broadcast. Every number of tanks is evaluated with
+    SEC_RESERVE_TANKS in reserve, and a tank may be at most
+    SEC_MAX_TANK_AREA large
+    :param q_comb: FLOAT or ARRAY of the combined flows in m³/d (one
+    axis of the design space as well)
+    :param space: candidates overriding those of SEC_SPACE ("rs", "qsv",
+    "SVI", "t_TH", "using" and "tanks") as scalars or LISTS
+    :return: DICT with "Q comb", the SEC_SPACE choices and the
+    sec_sed_df parameters (plus "A_ST_tot", the total surface in m², and
+    "Ladder", TRUE for the number of tanks SecSed.a_st would choose) as
+    keys and one-dimensional arrays of the feasible designs as values
+    :raises KeyError: if a design choice is unknown
+    """
+    unknown = [name for name in space if name not in SEC_SPACE]
+    if unknown:
+        raise KeyError(f"Unknown design choices: {unknown}")
+    space = dict(SEC_SPACE, **space)
+    axes = [np.atleast_1d(np.asarray(q_comb, dtype=float))]
+    axes += [np.atleast_1d(np.asarray(space[name], dtype=float))
+             for name in ["rs", "qsv", "SVI", "t_TH"]]
+    axes.append(np.atleast_1d(np.asarray(
+        [X_SS_RS_FACTORS[using] for using in np.atleast_1d(space["using"])])))
+    axes.append(np.atleast_1d(np.asarray(space["tanks"], dtype=int)))
+    q, rs, qsv, svi, t_th, factor, tanks = (
+        a.reshape([-1 if i == j else 1 for j in range(7)])
+        for i, a in enumerate(axes))
+    # depths on the (rs, qsv, SVI, t_TH, using) axes only
+    x_ss_bs = (1000 / svi) * t_th ** (1 / 3)
+    x_ss_rs = factor * x_ss_bs
+    x_ss_at = (rs * x_ss_rs) / (1 + rs)
+    q_a = qsv / (x_ss_at * svi)
+    h2 = (0.5 * q_a * (1 + rs)) / (1 - ((x_ss_at * svi) / 1000))
+    h3 = (1.5 * 0.3 * qsv * (1 + rs)) / 500
+    h4 = (x_ss_at * q_a * (1 + rs) * t_th) / x_ss_bs
+    h_tot = H1_SEC + h2 + h3 + h4
+    deep = (q_a <= 1.6) & (h2 > 0) & (h_tot >= 3)
+    # surfaces on every axis, only for the feasible depths
+    a_st_tot = (q / 24) / q_a
+    a_st = a_st_tot / np.maximum(tanks - SEC_RESERVE_TANKS, 1)
+    feasible = deep & (a_st <= SEC_MAX_TANK_AREA)
+    index = np.nonzero(feasible)
+    shape = feasible.shape
+
+    def pick(values):
+        return np.broadcast_to(values, shape)[index]
+
+    results = {"Q comb": pick(q), "rs": pick(rs), "qsv": pick(qsv),
+               "SVI": pick(svi), "t_TH": pick(t_th),
+               "using": np.asarray(np.atleast_1d(space["using"]))[index[5]],
+               "tanks": pick(tanks)}
+    results.update({
+        "X_SS_BS": pick(x_ss_bs), "X_SS_RS": pick(x_ss_rs),
+        "X_SS_AT": pick(x_ss_at), "q_A": pick(q_a),
+        "A_ST_tot": pick(a_st_tot), "A_ST": pick(a_st)})
+    results["Diameter"] = ((4 * results["A_ST"]) / m.pi) ** (1 / 2)
+    results.update({"h1": np.full(index[0].size, H1_SEC), "h2": pick(h2),
+                    "h3": pick(h3), "h4": pick(h4), "h_tot": pick(h_tot)})
+    results["Ladder"] = (np.ma.getdata(batch_a_st(np.ma.array(
+        results["A_ST_tot"]))[1]) == results["tanks"])
+    return results
@@ -0,0 +1,372 @@
+import asyncio
+import json
+from sweep import *
+from main import *
+
+# Result tables returned for every plant (stage, parameters and units)
+SERVICE_TABLES = {"pri_sed": PRI_SED_UNITS, "sec_sed": SEC_SED_UNITS,
+                  "act_sludge": ACT_SLUDGE_UNITS}
+# Time in s a batch waits for further requests after the first one
+SERVICE_BATCH_WINDOW = 0.002
+# Largest number of plants evaluated together in one vectorized pass
+SERVICE_MAX_BATCH = 1024
+# Largest accepted request body in B
+SERVICE_MAX_BODY = 1024 ** 2
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+                405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        """
+        For initializing a RequestError object of a rejected request
+        :param status: INT of the HTTP status code
+        :param message: STR of the error message sent to the client
+        :return: None
+        """
+        super().__init__(message)
+        self.status = status
+
+
+def plant_scenario(plant, snapshot):
+    """
+    Checks the parameters of one requested plant and completes them
+    :param plant: DICT with input parameters, ActSludge effluent
+    assumptions or SecSed parameters ("rs", "qsv", "SVI" and "t_TH")
+    overriding those of the snapshot and the defaults
+    :param snapshot: ParamSnapshot object with the base parameters
+    :return: DICT with a FLOAT for every parameter
+    :raises RequestError: if a parameter is unknown or not a number
+    """
+    if not isinstance(plant, dict):
+        raise RequestError(400, "A plant must be a JSON object")
+    scenario = dict(snapshot.values, **ACT_SLUDGE_ASSUMPTIONS,
+                    **SEC_SED_DEFAULTS)
+    unknown = [name for name in plant if name not in scenario]
+    if unknown:
+        raise RequestError(400, f"Unknown plant parameters: {unknown}")
+    for name, value in plant.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise RequestError(400, f"Parameter '{name}' must be a number")
+        scenario[name] = float(value)
+    return scenario
+
+
+def design_batch(scenarios, snapshot, use_cache=True):
+    """
+    Designs several plants in one vectorized pass of every stage. With
+    the results cache, only the plants not designed before are evaluated
+    :param scenarios: LIST of DICTS returned by plant_scenario
+    :param snapshot: ParamSnapshot object with the base parameters
+    :param use_cache: FALSE to always evaluate every plant
+    :return: LIST of DICTS, one per plant, with the SERVICE_TABLES as
+    keys and {parameter: {"Results": FLOAT, "Units": STR}} as values,
+    rounded as in main.py. Infeasible results are None. Cached designs
+    are shared and must not be changed
+    """
+    cache = default_cache() if use_cache else None
+    if cache is not None:
+        keys = [result_key("design_batch", scenario)
+                for scenario in scenarios]
+        designs = [cache.get(key) for key in keys]
+        missing = [i for i, design in enumerate(designs) if design is None]
+        if missing:
+            computed = design_batch([scenarios[i] for i in missing],
+                                    snapshot, use_cache=False)
+            cache.put_many([(keys[i], design)
+                            for i, design in zip(missing, computed)])
+            for i, design in zip(missing, computed):
+                designs[i] = design
+        return designs
+    # plain arrays instead of the DATAFRAMES of sweep_chunk, which
+    # would dominate the time of small batches
+    arrays = {name: np.array([scenario[name] for scenario in scenarios])
+              for name in scenarios[0]}
+    sec = sec_sed_batch(arrays)
+    arrays["X_SS_AT"] = sec["X_SS_AT"].filled(np.nan)
+    stages = {"pri_sed": pri_sed_batch(arrays), "sec_sed": sec,
+              "act_sludge": act_sludge_batch(arrays)}
+    designs = [{stage: {} for stage in SERVICE_TABLES} for _ in scenarios]
+    for stage, units in SERVICE_TABLES.items():
+        for name, unit in units.items():
+            values = np.ma.filled(np.ma.array(stages[stage][name],
+                                              dtype=float), np.nan)
+            values = np.broadcast_to(values.round(2), len(scenarios))
+            for design, value in zip(designs, values.tolist()):
+                design[stage][name] = {
+                    "Results": None if value != value else value,
+                    "Units": unit}
+    return designs
+
+
+class DesignBatcher:
+    def __init__(self, snapshot, window=SERVICE_BATCH_WINDOW,
+                 max_batch=SERVICE_MAX_BATCH):
+        """
+        For initializing a DesignBatcher object, which gathers the plants
+        requested concurrently into micro-batches
+        :param snapshot: ParamSnapshot object with the base parameters
+        :param window: FLOAT time in s a batch waits for further plants
+        :param max_batch: INT largest number of plants per batch
+        :return: None
+        """
+        self.snapshot = snapshot
+        self.window = window
+        self.max_batch = max_batch
+        self.queue = None
+        self.task = None
+        self.plants = 0
+        self.batches = 0
+
+    async def start(self):
+        """
+        Starts evaluating the queued plants in the running event loop
+        :return: None
+        """
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """
+        Stops the evaluation of queued plants
+        :return: None
+        """
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+    async def design(self, plant):
+        """
+        Designs one plant in the next batch
+        :param plant: DICT with the plant parameters (see plant_scenario)
+        :return: DICT of design_batch with the result tables
+        :raises RequestError: if a parameter is invalid
+        """
+        scenario = plant_scenario(plant, self.snapshot)
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((scenario, future))
+        return await future
+
+    async def collect(self):
+        """
+        Waits for the first queued plant and for those following it
+        within the batch window
+        :return: LIST of TUPLES with the scenario and the future
+        """
+        jobs = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.window
+        while len(jobs) < self.max_batch:
+            if self.queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    jobs.append(await asyncio.wait_for(self.queue.get(),
+                                                       timeout))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                jobs.append(self.queue.get_nowait())
+        return jobs
+
+    async def run(self):
+        """
+        Evaluates the queued plants batch by batch
+        :return: None
+        """
+        while True:
+            jobs = await self.collect()
+            try:
+                designs = design_batch([job[0] for job in jobs],
+                                       self.snapshot)
+            except Exception as error:
+                for _, future in jobs:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for (_, future), design in zip(jobs, designs):
+                if not future.done():
+                    future.set_result(design)
+            self.plants += len(jobs)
+            self.batches += 1
+
+
+async def read_line(reader):
+    """
+    Reads one line of the request line and the headers
+    :param reader: asyncio.StreamReader object of the connection
+    :return: BYTES of the line
+    :raises RequestError: if the line exceeds the buffer of the reader
+    """
+    try:
+        return await reader.readline()
+    except ValueError:
+        raise RequestError(400, "Request line or header too long")
+
+
+async def read_request(reader):
+    """
+    Reads one HTTP/1.1 request
+    :param reader: asyncio.StreamReader object of the connection
+    :return: TUPLE with the method, the path, the headers (DICT with
+    lower-case names) and the body (BYTES), or None at the end of the
+    connection
+    :raises RequestError: if the request is malformed or too large
+    """
+    line = await read_line(reader)
+    if not line.strip():
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise RequestError(400, "Malformed request line")
+    headers = {}
+    while True:
+        line = (await read_line(reader)).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = headers.get("content-length", "0")
+    # digits only: no sign, no spaces, no other numerals
+    if not (length.isascii() and length.isdigit()):
+        raise RequestError(400, "Invalid Content-Length header")
+    length = int(length)
+    if length > SERVICE_MAX_BODY:
+        raise RequestError(413, f"The body exceeds {SERVICE_MAX_BODY} B")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def write_response(writer, status, payload, keep_alive=True):
+    """
+    Writes one HTTP/1.1 response with a JSON body
+    :param writer: asyncio.StreamWriter object of the connection
+    :param status: INT of the HTTP status code
+    :param payload: JSON-serializable object
+    :param keep_alive: FALSE to close the connection afterwards
+    :return: None
+    """
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n")
+    writer.write(head.encode("latin-1") + body)
+
+
+class DesignService:
+    def __init__(self, snapshot=None, window=SERVICE_BATCH_WINDOW,
+                 max_batch=SERVICE_MAX_BATCH):
+        """
+        For initializing a DesignService object: a long-running local
+        HTTP service keeping the tables, interpolators and base
+        parameters loaded. Endpoints:
+        POST /design with a plant (JSON object) or a LIST of plants,
+        answered with the result tables of design_batch;
+        GET /health with the number of plants and batches evaluated
+        and the statistics of the results cache
+        :param snapshot: ParamSnapshot object with the base parameters
+        (if None, the input file is loaded)
+        :param window: FLOAT time in s a batch waits for further plants
+        :param max_batch: INT largest number of plants per batch
+        :return: None
+        """
+        if snapshot is None:
+            snapshot = load_snapshot()
+        self.batcher = DesignBatcher(snapshot, window, max_batch)
+        # one evaluation before serving, so the first request is as
+        # fast as the others
+        design_batch([plant_scenario({}, snapshot)], snapshot,
+                     use_cache=False)
+
+    async def route(self, method, path, body):
+        """
+        Answers one request
+        :param method: STR of the HTTP method
+        :param path: STR of the requested path
+        :param body: BYTES of the request body
+        :return: TUPLE with the INT status code and the JSON payload
+        """
+        if path == "/health":
+            if method != "GET":
+                raise RequestError(405, "Use GET for /health")
+            cache = default_cache()
+            return 200, {"status": "ok", "plants": self.batcher.plants,
+                         "batches": self.batcher.batches,
+                         "cache": cache.stats() if cache else None}
+        if path != "/design":
+            raise RequestError(404, f"Unknown path {path}")
+        if method != "POST":
+            raise RequestError(405, "Use POST for /design")
+        try:
+            plants = json.loads(body or b"{}")
+        except ValueError as error:
+            raise RequestError(400, f"Invalid JSON: {error}")
+        if isinstance(plants, list):
+            return 200, list(await asyncio.gather(
+                *(self.batcher.design(plant) for plant in plants)))
+        return 200, await self.batcher.design(plants)
+
+    async def handle(self, reader, writer):
+        """
+        Serves the requests of one (persistent) connection
+        :param reader: asyncio.StreamReader object of the connection
+        :param writer: asyncio.StreamWriter object of the connection
+        :return: None
+        """
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = (headers.get("connection", "").lower()
+                                  != "close")
+                    status, payload = await self.route(method, path, body)
+                except RequestError as error:
+                    # the rest of a rejected request cannot be trusted
+                    status, payload = error.status, {"error": str(error)}
+                    keep_alive = False
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8765, unix=None):
+        """
+        Starts serving in the running event loop
+        :param host: STR of the local address to listen on
+        :param port: INT of the TCP port
+        :param unix: STR of a Unix socket path used instead of host and
+        port (optional)
+        :return: asyncio.Server object
+        """
+        await self.batcher.start()
+        if unix is not None:
+            return await asyncio.start_unix_server(self.handle, unix)
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def serve(self, host="127.0.0.1", port=8765, unix=None):
+        """
+        Serves until the task is cancelled (e.g. with Ctrl+C)
+        :param host: STR of the local address to listen on
+        :param port: INT of the TCP port
+        :param unix: STR of a Unix socket path (optional)
+        :return: None
+        """
+        server = await self.start(host, port, unix)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
@@ -0,0 +1,258 @@
+from enum import IntEnum
+import numpy as np
+
+# Every standard table is stored as read-only NumPy arrays indexed by
+# the IntEnum keys below, which is what the design formulas read. This
+# module only needs NumPy; the pandas DataFrames of config.py are built
+# from the same arrays and are only meant for reporting.
+
+
+def read_only(values):
+    """
+    Copies values into a FLOAT array that cannot be modified
+    :param values: ARRAY-like
+    :return: read-only FLOAT array
+    """
+    array = np.array(values, dtype=float)
+    array.flags.writeable = False
+    return array
+
+
+# Parameters for Primary Sedimentation according
+# to DIN EN 12255-6
+class PriMethod(IntEnum):
+    ACT_SLUDGE = 0
+    ACT_SLUDGE_EXCESS_SLUDGE = 1
+    TRICKLING_FILTER = 2
+
+
+PRI_METHOD_LABELS = [
+    "PS combined with activated sludge process (without excess sludge)",
+    "PS combined with activated sludge process (with excess sludge)",
+    "PS combined with trickling filter or rotating contactors"
+    " (with / without excess sludge)"
+]
+# surface overflow rate range (min, max) in m/h, retention time in min
+# and depth in m
+PRI_Q_A = read_only([[6, 6], [2, 3], [3, 3]])
+PRI_T = read_only([15, 45, 30])
+PRI_DEPTH = read_only([1.5, 2.0, 1.5])
+
+
+# Standard values for the sludge volume index according
+# to ATV-DVWK-A 131E
+class TreatmentTarget(IntEnum):
+    WITHOUT_NITRIFICATION = 0
+    NITRIFICATION_DENITRIFICATION = 1
+    SLUDGE_STABILIZATION = 2
+
+
+SVI_TARGET_LABELS = [
+    "Without nitrification",
+    "Nitrification and denitrification",
+    "Sludge stabilization"
+]
+# (min, max) ranges in mL/g
+SVI_FAVOURABLE = read_only([[100, 150], [100, 150], [75, 120]])
+SVI_UNFAVOURABLE = read_only([[120, 180], [120, 180], [100, 150]])
+
+
+# Recommended thickening time in dependence on the degree of wastewater
+# treatment according to ATV-DVWK-A 131E
+class WwtpType(IntEnum):
+    WITHOUT_NITRIFICATION = 0
+    WITH_NITRIFICATION = 1
+    WITH_DENITRIFICATION = 2
+
+
+WWTP_TYPE_LABELS = [
+    "Activated sludge plants without nitrification",
+    "Activated sludge plants with nitrification",
+    "Activated sludge plants with denitrification"
+]
+# (min, max) ranges in h
+TTH_RANGES = read_only([[1.5, 2.0], [1.0, 1.5], [2.0, 2.5]])
+
+# Standard values for dimensioning of denitrification for dry weather
+# at temperatures from 10° to 12° C and common conditions (kg nitrate
+# nitrogen to be denitrified per kg influent BOD5) according to
+# ATV-DVWK-A 131E
+VD_VAT = read_only([0.2, 0.3, 0.4, 0.5])
+S_NO3_D_C_BOD_PRE = read_only([0.11, 0.13, 0.14, 0.15])
+S_NO3_D_C_BOD_SIM = read_only([0.06, 0.09, 0.12, 0.15])
+
+
+# Dimensioning sludge age in days dependent on the treatment target and
+# the temperature as well as the plant size (intermediate values are to
+# be estimated) according to ATV-DVWK-A 131E
+class SludgeAgeTarget(IntEnum):
+    WITHOUT_NITRIFICATION = 0
+    WITH_NITRIFICATION = 1
+    DENITRIFICATION_VD_VAT_02 = 2
+    DENITRIFICATION_VD_VAT_03 = 3
+    DENITRIFICATION_VD_VAT_04 = 4
+    DENITRIFICATION_VD_VAT_05 = 5
+    SLUDGE_STABILIZATION = 6
+
+
+class SludgeAgeColumn(IntEnum):
+    T10_UP_TO_1200 = 0
+    T12_UP_TO_1200 = 1
+    T10_OVER_6000 = 2
+    T12_OVER_6000 = 3
+
+
+SLUDGE_AGE_TARGET_LABELS = [
+    "Without nitrification",
+    "With nitrification",
+    "Nitrification and denitrification",
+    "Nitrification and denitrification",
+    "Nitrification and denitrification",
+    "Nitrification and denitrification",
+    "Sludge stabilization including nitrogen removal"
+]
+SLUDGE_AGE_COLUMN_LABELS = [
+    "10 °C - up to 1200 kg/d", "12 °C - up to 1200 kg/d",
+    "10 °C - over 6000 kg/d", "12 °C - over 6000 kg/d"
+]
+T_SS_DIM_VD_VAT = read_only([np.nan, np.nan, 0.2, 0.3, 0.4, 0.5, np.nan])
+T_SS_DIM_VALUES = read_only([
+    [5.0, 5.0, 4.0, 4.0],
+    [10.0, 8.2, 8.0, 6.6],
+    [12.5, 10.3, 10.0, 8.3],
+    [14.3, 11.7, 11.4, 9.4],
+    [16.7, 13.7, 13.3, 11.0],
+    [20.0, 16.4, 16.0, 13.2],
+    [25.0, 25.0, np.nan, np.nan]
+])
+# Rows for nitrification and denitrification (one per Vd/Vat value)
+T_SS_DIM_DEN_ROWS = slice(SludgeAgeTarget.DENITRIFICATION_VD_VAT_02,
+                          SludgeAgeTarget.DENITRIFICATION_VD_VAT_05 + 1)
+
+
+# Plant size bands of the sludge age table (and of the safety factor):
+# up to 1200 kgBOD5/d or 20000 PE, over 6000 kgBOD5/d or 100000 PE
+class SizeBand(IntEnum):
+    UP_TO_1200 = 0
+    OVER_6000 = 1
+
+
+# Inhabitant-specific loads in g/(I·d), which are undercut on 85 % of
+# the days, without taking into account sludge liquor according to
+# ATV-DVWK-A 131E
+class InhParam(IntEnum):
+    BOD5 = 0
+    COD = 1
+    SS = 2
+    TKN = 3
+    P = 4
+
+
+class Retention(IntEnum):
+    RAW = 0
+    H_05_TO_10 = 1
+    H_15_TO_20 = 2
+
+
+INH_PARAM_LABELS = ["BOD5", "COD", "SS", "TKN", "P"]
+RETENTION_LABELS = ["Raw wastewater", "0.5 to 1.0 h of retention time",
+                    "1.5 to 2.0 h of retention time"]
+INH_B_VALUES = read_only([
+    [60, 45, 40],
+    [120, 90, 80],
+    [70, 35, 25],
+    [11, 10, 10],
+    [1.8, 1.6, 1.6]
+])
+
+# Specific sludge production SPC,BOD [kg SS/kg BOD5] at 10° to 12° C
+# according to ATV-DVWK-A 131E, by X_ss_iat/C_bod_iat (rows) and
+# sludge age in days (columns)
+SP_C_BOD_RATIOS = read_only([0.4, 0.6, 0.8, 1.0, 1.2])
+SP_C_BOD_T_SS = read_only([4, 8, 10, 15, 20, 25])
+SP_C_BOD_VALUES = read_only([
+    [0.79, 0.69, 0.65, 0.59, 0.56, 0.53],
+    [0.91, 0.81, 0.77, 0.71, 0.68, 0.65],
+    [1.03, 0.93, 0.89, 0.83, 0.80, 0.77],
+    [1.15, 1.05, 1.01, 0.95, 0.92, 0.89],
+    [1.27, 1.17, 1.13, 1.07, 1.04, 1.01]
+])
+
+
+# Treatment requirements on wastewater for the discharge point depend in
+# Germany on the size class of the wastewater treatment plant according
+# to the German Wastewater Ordinance (AbwV) Appendix 1
+class SizeClass(IntEnum):
+    CLASS_1 = 0
+    CLASS_2 = 1
+    CLASS_3 = 2
+    CLASS_4 = 3
+    CLASS_5 = 4
+
+
+class EffluentParam(IntEnum):
+    COD = 0
+    BOD = 1
+    NH4_N = 2
+    NTOT = 3
+    PTOT = 4
+
+
+SIZE_CLASS_LABELS = [
+    "1 (< 60 kgBOD5/d in raw water)",
+    "2 (60 - 300 kgBOD5/d in raw water)",
+    "3 (300 - 600 kgBOD5/d in raw water)",
+    "4 (600 - 6000 kgBOD5/d in raw water)",
+    "5 (> 6000 kgBOD5/d in raw water"
+]
+EFFLUENT_PARAM_LABELS = ["COD", "BOD", "NH4-N", "Ntot", "Ptot"]
+# limits of the size classes in kgBOD5/d in raw water
+SIZE_CLASS_BOD5 = read_only([60, 300, 600, 6000])
+CLE_REQ_VALUES = read_only([
+    [150, 40, np.nan, np.nan, np.nan],
+    [110, 25, np.nan, np.nan, np.nan],
+    [90, 20, 10, np.nan, np.nan],
+    [90, 20, 10, 18, 2],
+    [75, 15, 10, 13, 1]
+])
+
+
+# Peak factors for the oxygen uptake rate (to cover the 2 h peaks
+# compared with the 24 h average, if no measurements are available)
+# according to ATV-DVWK-A 131E, by sludge age in days (columns)
+class PeakFactor(IntEnum):
+    FC = 0
+    FN_UP_TO_1200 = 1
+    FN_OVER_6000 = 2
+
+
+PEAK_FACTOR_LABELS = ["fc", "fn for <= 1200 kgBOD5/d",
+                      "fn for >= 6000 kgBOD5/d"]
+FC_FN_T_SS = read_only([4, 6, 8, 10, 15, 25])
+FC_FN_VALUES = read_only([
+    [1.30, 1.25, 1.20, 1.20, 1.15, 1.10],
+    [np.nan, np.nan, np.nan, 2.50, 2.00, 1.50],
+    [np.nan, np.nan, 2.00, 1.80, 1.50, np.nan]
+])
+
+# Derived constants of the design chain: primary sedimentation
+# combined with activated sludge process (with excess sludge), mean
+# favourable SVI, shortest thickening time for denitrification,
+# suspended solids load after primary sedimentation and phosphorus
+# effluent requirement by size class
+Q_A_PRI = PRI_Q_A[PriMethod.ACT_SLUDGE_EXCESS_SLUDGE, 1]
+DEPTH_PRI = PRI_DEPTH[PriMethod.ACT_SLUDGE_EXCESS_SLUDGE]
+SVI_DIM = SVI_FAVOURABLE[TreatmentTarget.NITRIFICATION_DENITRIFICATION].mean()
+T_TH_DIM = TTH_RANGES[WwtpType.WITH_DENITRIFICATION, 0]
+B_SS_INH = INH_B_VALUES[InhParam.SS, Retention.H_05_TO_10]
+C_P_ER = CLE_REQ_VALUES[:, EffluentParam.PTOT]
+
+# Ratio of the return sludge to the bottom sludge concentration
+# depending on the sludge removal facilities
+X_SS_RS_FACTORS = {"scraper facilities": 0.7, "suction facilities": 0.6}
+# Secondary sedimentation: return sludge ratio (dimensionless), max
+# sludge volume loading rate for horizontal flow in L/(m²*h) and
+# minimum depth of the clean water and return flow zone in m
+RS_SEC = 0.75
+QSV_SEC = 500
+H1_SEC = 0.5
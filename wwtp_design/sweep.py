@@ -0,0 +1,249 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from batch import *
+from data import *
+from cache import *
+from feasibility import *
+from output import *
+
+# Number of grid points evaluated together in one vectorized pass
+SWEEP_CHUNK_SIZE = 5000
+# Default memory ceiling in B of the chunks held by an out-of-core
+# sweep (on top of the interpreter and the loaded libraries)
+SWEEP_MEMORY_LIMIT = 256 * 1024 ** 2
+# Estimated bytes per value of a chunk, including the temporaries of
+# the batch functions and the DATAFRAME copies
+SWEEP_BYTES_PER_VALUE = 32
+# Number of result columns of a chunk (results of the three stages)
+SWEEP_RESULT_COLUMNS = 58
+
+
+def grid_values(spec):
+    """
+    Expands the values of one swept parameter
+    :param spec: LIST of values or DICT with "start", "stop" and either
+    "num" (evenly spaced values including stop) or "step"
+    :return: one-dimensional FLOAT array
+    """
+    if isinstance(spec, dict):
+        if "num" in spec:
+            return np.linspace(spec["start"], spec["stop"], spec["num"])
+        return np.arange(spec["start"], spec["stop"], spec["step"])
+    return np.atleast_1d(np.asarray(spec, dtype=float))
+
+
+def expand_grid(grid):
+    """
+    Builds every combination of the values of the swept parameters
+    :param grid: DICT with parameter names as keys and grid_values
+    specifications as values
+    :return: DATAFRAME with one row per grid point
+    """
+    axes = [grid_values(spec) for spec in grid.values()]
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return pd.DataFrame({name: values.ravel()
+                         for name, values in zip(grid, mesh)})
+
+
+def grid_chunks(grid, chunk_size=SWEEP_CHUNK_SIZE):
+    """
+    Generates the rows of expand_grid lazily, one chunk at a time, so
+    that the grid is never held as a whole
+    :param grid: DICT with parameter names as keys and grid_values
+    specifications as values
+    :param chunk_size: INT number of grid points per chunk
+    :return: generator of DATAFRAMES with the grid points of each chunk,
+    indexed by their position in the grid
+    """
+    axes = [grid_values(spec) for spec in grid.values()]
+    shape = tuple(axis.size for axis in axes)
+    size = int(np.prod(shape))
+    for start in range(0, size, chunk_size):
+        stop = min(start + chunk_size, size)
+        position = np.unravel_index(np.arange(start, stop), shape)
+        yield pd.DataFrame({name: axis[i] for name, axis, i
+                            in zip(grid, axes, position)},
+                           index=pd.RangeIndex(start, stop))
+
+
+def bounded_map(pool, fun, *iterables, window=2):
+    """
+    Ordered map over a process pool that only keeps a few tasks
+    submitted, so the arguments are drawn lazily and finished results
+    do not pile up while the caller consumes them
+    :param pool: ProcessPoolExecutor object
+    :param fun: function of one item of each iterable
+    :param iterables: iterables of the arguments
+    :param window: INT largest number of pending tasks
+    :return: generator of the results in order
+    """
+    pending = []
+    for args in zip(*iterables):
+        pending.append(pool.submit(fun, *args))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+def sweep_chunk(points, base, use_cache=False, prefilter=False):
+    """
+    Evaluates all the design stages for a chunk of grid points, or
+    takes them from the results cache if use_cache is set and the same
+    chunk was evaluated before
+    :param points: DATAFRAME with one row per grid point
+    :param base: ParamSnapshot object with the parameters not swept
+    :param use_cache: TRUE to look the chunk up in the results cache
+    (off by default: the chunks are large and rarely repeated)
+    :param prefilter: TRUE to check the feasibility first and only
+    evaluate the feasible grid points (the results of the others are
+    NaN and their reasons are in the ("check", "Infeasible") column)
+    :return: DATAFRAME with (stage, parameter) columns
+    """
+    cache = default_cache() if use_cache else None
+    if cache is not None:
+        key = result_key("sweep_chunk", {
+            "base": dict(base.values), "index": points.index.to_numpy(),
+            "points": {name: points[name].to_numpy() for name in points},
+            "prefilter": prefilter})
+        return cache.get_or_compute(key, lambda: sweep_chunk(
+            points, base, use_cache=False, prefilter=prefilter)).copy()
+    scenarios = dict(base.values)
+    scenarios.update({name: points[name].to_numpy() for name in points})
+    keep = slice(None)
+    if prefilter:
+        codes = feasibility(scenarios)
+        keep = feasible_mask(codes)
+        scenarios = {name: np.broadcast_to(value, len(points))[keep]
+                     for name, value in scenarios.items()}
+    sec = sec_sed_batch(scenarios)
+    scenarios["X_SS_AT"] = sec["X_SS_AT"].filled(np.nan)
+    stages = {
+        "pri_sed": pri_sed_batch(scenarios),
+        "sec_sed": sec,
+        "act_sludge": act_sludge_batch(scenarios)
+    }
+    columns = {("input", name): points[name].to_numpy() for name in points}
+    for stage, results in stages.items():
+        for name, values in results.items():
+            values = np.ma.filled(np.ma.array(values, dtype=float), np.nan)
+            column = np.full(len(points), np.nan)
+            column[keep] = np.broadcast_to(values, column[keep].shape)
+            columns[(stage, name)] = column
+    if prefilter:
+        columns[("check", "Infeasible")] = codes
+    return pd.DataFrame(columns, index=points.index)
+
+
+def sweep_chunks(grid, snapshot=None, workers=None,
+                 chunk_size=SWEEP_CHUNK_SIZE, prefilter=False,
+                 use_cache=False):
+    """
+    Parameter sweep over every combination of the given grid, spread
+    over a process pool in vectorized chunks that are yielded in order,
+    so that large sweeps can be written without holding every result
+    :param grid: DICT with the swept parameters (any input parameter,
+    the ActSludge effluent assumptions or the SecSed parameters "rs",
+    "qsv", "SVI" and "t_TH") as keys and grid_values specifications
+    as values
+    :param snapshot: ParamSnapshot object with the parameters not swept
+    (if None, the input file is loaded)
+    :param workers: INT number of worker processes (None for one per
+    CPU, 1 to run in the calling process)
+    :param chunk_size: INT number of grid points per chunk
+    :param prefilter: TRUE to skip the infeasible grid points before
+    the design stages (see sweep_chunk)
+    :param use_cache: TRUE to look the chunks up in the results cache
+    :return: generator of DATAFRAMES with one row per grid point and
+    (stage, parameter) columns for the inputs and the results of the
+    primary sedimentation, secondary sedimentation and activated sludge
+    tank. Infeasible results are NaN
+    """
+    if snapshot is None:
+        snapshot = load_snapshot()
+    known = (set(snapshot.values) | set(ACT_SLUDGE_ASSUMPTIONS)
+             | set(SEC_SED_DEFAULTS))
+    unknown = [name for name in grid if name not in known]
+    if unknown:
+        raise KeyError(f"Unknown sweep parameters: {unknown}")
+    size = int(np.prod([grid_values(spec).size for spec in grid.values()]))
+    args = (grid_chunks(grid, chunk_size), repeat(snapshot),
+            repeat(use_cache), repeat(prefilter))
+    if workers == 1 or size <= chunk_size:
+        yield from map(sweep_chunk, *args)
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from bounded_map(pool, sweep_chunk, *args,
+                                   window=2 * workers)
+
+
+def sweep(grid, snapshot=None, workers=None, chunk_size=SWEEP_CHUNK_SIZE,
+          prefilter=False):
+    """
+    Parameter sweep over every combination of the given grid, see
+    sweep_chunks
+    :param grid: DICT with the swept parameters and grid_values
+    specifications
+    :param snapshot: ParamSnapshot object with the parameters not swept
+    :param workers: INT number of worker processes
+    :param chunk_size: INT number of grid points per chunk
+    :param prefilter: TRUE to skip the infeasible grid points
+    :return: DATAFRAME with all the chunks of sweep_chunks
+    """
+    return pd.concat(list(sweep_chunks(grid, snapshot, workers,
+                                       chunk_size, prefilter)))
+
+
+def memory_chunk_size(grid, memory_limit, workers=1):
+    """
+    Largest chunk size whose chunks fit into a memory ceiling, with one
+    chunk per worker being evaluated and the pending results of
+    bounded_map held at the same time
+    :param grid: DICT with the swept parameters
+    :param memory_limit: INT memory ceiling in B
+    :param workers: INT number of worker processes
+    :return: INT number of grid points per chunk (at least 1)
+    """
+    columns = len(grid) + SWEEP_RESULT_COLUMNS + 1
+    # evaluated and written chunks, plus the pending ones of a pool
+    chunks = 2 if workers == 1 else 3 * workers + 1
+    return max(1, int(memory_limit
+                      // (chunks * columns * SWEEP_BYTES_PER_VALUE)))
+
+
+def sweep_to_disk(grid, path, snapshot=None, workers=None,
+                  memory_limit=SWEEP_MEMORY_LIMIT, file_format="npy",
+                  prefilter=False):
+    """
+    Out-of-core sweep: the grid points are generated lazily, evaluated
+    in chunks sized to the memory ceiling and every chunk is written to
+    its own partition and released, so the peak memory does not grow
+    with the number of grid points
+    :param grid: DICT with the swept parameters and grid_values
+    specifications (see sweep_chunks)
+    :param path: STR of the output directory of the partitions
+    :param snapshot: ParamSnapshot object with the parameters not swept
+    (if None, the input file is loaded)
+    :param workers: INT number of worker processes (None for one per
+    CPU, 1 to run in the calling process)
+    :param memory_limit: INT memory ceiling in B of the chunks held at
+    the same time
+    :param file_format: STR "npy" or "parquet" (see
+    PartitionedResultWriter)
+    :param prefilter: TRUE to skip the infeasible grid points
+    :return: DICT with the number of "points", "partitions" and the
+    "chunk_size"
+    """
+    chunk_size = memory_chunk_size(grid, memory_limit,
+                                   workers or os.cpu_count() or 1)
+    points = 0
+    with PartitionedResultWriter(path, file_format) as writer:
+        for results in sweep_chunks(grid, snapshot, workers, chunk_size,
+                                    prefilter):
+            results.columns = [".".join(c) for c in results.columns]
+            writer.write(results)
+            points += len(results)
+        partitions = writer.parts
+    return {"points": points, "partitions": partitions,
+            "chunk_size": chunk_size}
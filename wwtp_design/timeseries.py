@@ -0,0 +1,240 @@
+from batch import *
+from data import *
+from output import *
+
+# Columns of an hourly influent series: flow in m³/h, loads in kg/h
+# and (optional) wastewater temperature in °C
+TS_COLUMNS = {"Q": "m3/h", "B BOD5": "kg/h", "B Ntot": "kg/h",
+              "B NO3-N": "kg/h", "T": "°C"}
+# Results evaluated per time step
+TS_RESULTS = ["OU_d_C", "OU_d_N", "OU_d_D", "OU_h"]
+# Number of time steps read and evaluated together
+TS_CHUNK_SIZE = 50000
+# Number of values per result kept for the percentiles (exact for
+# series up to this length, a uniform random sample beyond)
+TS_RESERVOIR_SIZE = 100000
+TS_PERCENTILES = [50, 95, 99]
+
+
+def read_influent(file_path, chunk_size=TS_CHUNK_SIZE, columns=None,
+                  time_column=None):
+    """
+    Reads an influent series in chunks, so that only one chunk is held
+    in memory at a time. Parquet files need the optional pyarrow package
+    :param file_path: STR of a .csv or .parquet file
+    :param chunk_size: INT number of time steps per chunk
+    :param columns: DICT renaming the columns of the file to TS_COLUMNS
+    :param time_column: STR of the column with the time stamps, used as
+    index of the chunks (if None, the row numbers are used)
+    :return: generator of DATAFRAMES with the TS_COLUMNS found in the file
+    """
+    if file_path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet influent series requires "
+                              "pyarrow (pip install pyarrow)")
+        batches = (batch.to_pandas() for batch in
+                   pq.ParquetFile(file_path).iter_batches(chunk_size))
+    else:
+        batches = pd.read_csv(file_path, chunksize=chunk_size)
+    start = 0
+    for chunk in batches:
+        chunk = chunk.rename(columns=columns or {})
+        if time_column is not None:
+            chunk = chunk.set_index(time_column)
+        else:
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield chunk[[name for name in TS_COLUMNS if name in chunk]]
+
+
+def design_quantities(snapshot=None, **assumptions):
+    """
+    Design quantities of the activated sludge tank that stay fixed
+    while the influent varies: dimensioning sludge age, peak factors,
+    dimensioning temperature and effluent assumptions
+    :param snapshot: ParamSnapshot object with the plant parameters
+    (if None, the input file is loaded)
+    :param assumptions: FLOATS overriding the ACT_SLUDGE_ASSUMPTIONS
+    :return: DICT with FLOATS
+    :raises ValueError: if the design is infeasible
+    """
+    if snapshot is None:
+        snapshot = load_snapshot()
+    results = act_sludge_batch(snapshot.values, **assumptions)
+    names = ["t_SS_dim", "f_C", "f_N", "T"] + list(ACT_SLUDGE_ASSUMPTIONS)
+    if any(results[name].mask.any() for name in names):
+        raise ValueError("The activated sludge tank design is infeasible "
+                         "for the plant parameters")
+    return {name: float(results[name][0]) for name in names}
+
+
+def oxygen_uptake_chunk(chunk, design, peak_factors=True):
+    """
+    Vectorized oxygen uptake of the activated sludge tank for each time
+    step of an influent chunk, with the formulas of ActSludge applied to
+    the hourly flows and loads expressed as daily rates
+    :param chunk: DATAFRAME with the TS_COLUMNS ("T" is optional, the
+    dimensioning temperature is used without it)
+    :param design: DICT returned by design_quantities
+    :param peak_factors: TRUE to apply fc and fn to OU_h as in
+    ActSludge.ou_h, FALSE for the uptake rate of the time step itself
+    :return: DATAFRAME with the TS_RESULTS per time step
+    """
+    q_d = chunk["Q"].to_numpy(dtype=float) * 24
+    b_bod5 = chunk["B BOD5"].to_numpy(dtype=float) * 24
+    c_bod5_iat = b_bod5 / q_d * (10 ** 6 / 1000)
+    c_n_iat = chunk["B Ntot"].to_numpy(dtype=float) * 24 / q_d * 1000
+    s_no3_iat = chunk["B NO3-N"].to_numpy(dtype=float) * 24 / q_d * 1000
+    t = (chunk["T"].to_numpy(dtype=float) if "T" in chunk
+         else design["T"])
+    f_t = 1.072 ** (t - 15)
+    t_ss_dim = design["t_SS_dim"]
+    # nitrogen balance
+    s_no3_d = (c_n_iat - design["S_orgN_EST"] - design["S_NH4_EST"]
+               - 0.05 * c_bod5_iat - design["S_NO3_EST"])
+    ou_d_c = b_bod5 * (0.56 + ((0.15 * t_ss_dim * f_t)
+                               / (1 + 0.17 * t_ss_dim * f_t)))
+    ou_d_n = q_d * 4.3 * (s_no3_d - s_no3_iat + design["S_NO3_EST"]) / 1000
+    ou_d_d = q_d * 2.9 * s_no3_d / 1000
+    f_c, f_n = (design["f_C"], design["f_N"]) if peak_factors else (1, 1)
+    ou_h = (f_c * (ou_d_c - ou_d_d) + f_n * ou_d_n) / 24
+    return pd.DataFrame({"OU_d_C": ou_d_c, "OU_d_N": ou_d_n,
+                         "OU_d_D": ou_d_d, "OU_h": ou_h}, index=chunk.index)
+
+
+class StreamStats:
+    def __init__(self, names, reservoir_size=TS_RESERVOIR_SIZE, seed=0):
+        """
+        For initializing a StreamStats object with running statistics
+        of streamed results in bounded memory
+        :param names: LIST of STR with the result names
+        :param reservoir_size: INT number of values per result kept
+        for the percentiles
+        :param seed: INT seed of the reservoir sampling
+        :return: None
+        """
+        self.names = list(names)
+        self.count = 0
+        # number of finite values of each result (NaN time steps, e.g.
+        # of an infeasible design, are left out of the statistics)
+        self.finite = dict.fromkeys(self.names, 0)
+        self.total = dict.fromkeys(self.names, 0.0)
+        self.peak = dict.fromkeys(self.names, -np.inf)
+        self.peak_at = dict.fromkeys(self.names)
+        self.reservoir_size = reservoir_size
+        self.reservoir = {name: np.empty(0) for name in self.names}
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, results):
+        """
+        Adds a chunk of results to the statistics, ignoring the values
+        that are not finite
+        :param results: DATAFRAME with the result names as columns
+        :return: None
+        """
+        for name in self.names:
+            values = results[name].to_numpy(dtype=float)
+            index = np.flatnonzero(np.isfinite(values))
+            values = values[index]
+            n = values.size
+            if n == 0:
+                continue
+            self.total[name] += values.sum()
+            i = np.argmax(values)
+            if values[i] > self.peak[name]:
+                self.peak[name] = values[i]
+                self.peak_at[name] = results.index[index[i]]
+            # reservoir slots replaced by each new value (Algorithm R)
+            seen = self.finite[name] + np.arange(n)
+            slots = np.where(seen < self.reservoir_size, seen,
+                             self.rng.integers(0, seen + 1))
+            keep = slots < self.reservoir_size
+            reservoir = self.reservoir[name]
+            size = min(self.reservoir_size, self.finite[name] + n)
+            if reservoir.size < size:
+                reservoir = np.resize(reservoir, size)
+            reservoir[slots[keep]] = values[keep]
+            self.reservoir[name] = reservoir
+            self.finite[name] += n
+        self.count += len(results)
+
+    def summary(self, percentiles=None):
+        """
+        Summarizes the statistics of the streamed results
+        :param percentiles: LIST of FLOATS with the percentiles to
+        report (default TS_PERCENTILES)
+        :return: DATAFRAME with the result names as index and the
+        number of finite values, the mean, the peak, its time step and
+        the percentiles as columns
+        """
+        if percentiles is None:
+            percentiles = TS_PERCENTILES
+        rows = {}
+        for name in self.names:
+            finite = self.finite[name]
+            row = {"Count": finite,
+                   "Mean": self.total[name] / finite if finite else np.nan,
+                   "Peak": self.peak[name] if finite else np.nan,
+                   "Peak at": self.peak_at[name]}
+            for q in percentiles:
+                row[f"P{q:g}"] = (np.percentile(self.reservoir[name], q)
+                                  if finite else np.nan)
+            rows[name] = row
+        df = pd.DataFrame.from_dict(rows, orient="index")
+        df.attrs["Time steps"] = self.count
+        return df
+
+
+def oxygen_uptake_stream(chunks, design, stats=None, peak_factors=True):
+    """
+    Evaluates the oxygen uptake of a stream of influent chunks
+    :param chunks: iterable of DATAFRAMES (e.g. from read_influent)
+    :param design: DICT returned by design_quantities
+    :param stats: StreamStats object updated with every chunk (optional)
+    :param peak_factors: TRUE to apply fc and fn to OU_h
+    :return: generator of DATAFRAMES with the TS_RESULTS per time step
+    """
+    for chunk in chunks:
+        results = oxygen_uptake_chunk(chunk, design, peak_factors)
+        if stats is not None:
+            stats.update(results)
+        yield results
+
+
+def oxygen_uptake_series(file_path, output=None, snapshot=None,
+                         chunk_size=TS_CHUNK_SIZE, columns=None,
+                         time_column=None, peak_factors=True,
+                         percentiles=None, **assumptions):
+    """
+    Oxygen uptake of the activated sludge tank along an hourly influent
+    series, streamed chunk by chunk so that the whole record is never
+    loaded
+    :param file_path: STR of the .csv or .parquet influent series
+    :param output: STR of a .csv, .parquet, .jsonl or .xlsx file for
+    the results per time step (optional; if None, only the statistics
+    are kept)
+    :param snapshot: ParamSnapshot object with the plant parameters
+    (if None, the input file is loaded)
+    :param chunk_size: INT number of time steps per chunk
+    :param columns: DICT renaming the columns of the file to TS_COLUMNS
+    :param time_column: STR of the column with the time stamps
+    :param peak_factors: TRUE to apply fc and fn to OU_h as in
+    ActSludge.ou_h, FALSE for the uptake rate of each time step itself
+    :param percentiles: LIST of FLOATS with the percentiles to report
+    :param assumptions: FLOATS overriding the ACT_SLUDGE_ASSUMPTIONS
+    :return: DATAFRAME returned by StreamStats.summary
+    """
+    design = design_quantities(snapshot, **assumptions)
+    stats = StreamStats(TS_RESULTS)
+    chunks = read_influent(file_path, chunk_size, columns, time_column)
+    results = oxygen_uptake_stream(chunks, design, stats, peak_factors)
+    if output is None:
+        for _ in results:
+            pass
+    else:
+        with result_writer(output) as writer:
+            for chunk in results:
+                writer.write(chunk)
+    return stats.summary(percentiles)